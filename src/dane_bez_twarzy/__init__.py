@@ -8,6 +8,7 @@ __author__ = "Your Name"
 from dane_bez_twarzy.core.anonymizer import Anonymizer
 from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType, AnonymizationMethod
 from dane_bez_twarzy.core.detector import EntityDetector
+from dane_bez_twarzy.core.result import AnonymizationResult
 
 __all__ = [
     "Anonymizer",
@@ -15,4 +16,5 @@ __all__ = [
     "EntityType",
     "AnonymizationMethod",
     "EntityDetector",
+    "AnonymizationResult",
 ]
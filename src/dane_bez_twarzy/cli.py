@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 from typing import Optional
 
-from dane_bez_twarzy import Anonymizer, AnonymizationConfig
+from dane_bez_twarzy import Anonymizer, AnonymizationConfig, AnonymizationMethod
 
 
 def main() -> None:
@@ -73,6 +73,14 @@ def main() -> None:
     detect_parser.add_argument('--llm-model', type=str, help='Nazwa modelu LLM')
     detect_parser.add_argument('-v', '--verbose', action='store_true', help='Tryb szczegółowy')
     
+    # Komenda: decrypt
+    decrypt_parser = subparsers.add_parser('decrypt', help='Odszyfruj plik zanonimizowany metodą encrypt')
+    decrypt_parser.add_argument('input', type=str, help='Ścieżka do zaszyfrowanego pliku')
+    decrypt_parser.add_argument('-o', '--output', type=str, help='Ścieżka do pliku wyjściowego')
+    decrypt_parser.add_argument('-c', '--config', type=str, required=True,
+                                help='Plik konfiguracyjny JSON z encryption_key')
+    decrypt_parser.add_argument('--sidecar', type=str, help='Plik tokenów (domyślnie <input>.enc.json)')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -87,6 +95,8 @@ def main() -> None:
             anonymize_directory(args)
         elif args.command == 'detect':
             detect_entities(args)
+        elif args.command == 'decrypt':
+            decrypt_file(args)
     except Exception as e:
         print(f"Błąd: {e}", file=sys.stderr)
         sys.exit(1)
@@ -139,74 +149,73 @@ def anonymize_file(args) -> None:
         llm_kwargs['use_llm'] = False
     # Jeśli brak flag, użyje domyślnej wartości z config.py (False)
     
-    anonymizer = Anonymizer(config, **llm_kwargs)
-    
-    input_path = Path(args.input)
-    output_path = Path(args.output) if args.output else None
-    
-    import time
-    
-    # Zmierz czas wykonania
-    start_time = time.time()
-    result_path = anonymizer.anonymize_file(input_path, output_path)
-    execution_time = time.time() - start_time
-    
-    print(f"✓ Plik zanonimizowany: {result_path}")
-    print(f"  Czas wykonania: {execution_time:.3f} sekund")
-    
-    # Wygeneruj raport jeśli flaga --add-report została użyta
-    if hasattr(args, 'add_report') and args.add_report:
-        # Wczytaj oryginalny tekst do analizy
-        with open(input_path, 'r', encoding='utf-8') as f:
-            text = f.read()
+    with Anonymizer(config, **llm_kwargs) as anonymizer:
+        input_path = Path(args.input)
+        output_path = Path(args.output) if args.output else None
         
-        report_path = Path(args.add_report)
-        report_format = getattr(args, 'report_format', 'json')
+        import time
         
-        # Generuj raport JSON
-        if report_format in ['json', 'all']:
-            json_path = report_path if report_format == 'json' else report_path.with_suffix('.json')
-            report = anonymizer.generate_report(
-                text, 
-                json_path, 
-                execution_time=execution_time,
-                input_filename=str(input_path.name)
-            )
-            print(f"\n✓ Raport JSON: {json_path}")
-        else:
-            # Generuj raport bez zapisu (potrzebny do HTML/PDF)
-            report = anonymizer.generate_report(
-                text, 
-                None, 
-                execution_time=execution_time,
-                input_filename=str(input_path.name)
-            )
+        add_report = hasattr(args, 'add_report') and args.add_report
         
-        # Generuj raport HTML
-        if report_format in ['html', 'all']:
-            from dane_bez_twarzy.reporting import generate_html_report
-            html_path = report_path.with_suffix('.html')
-            generate_html_report(report, html_path)
-            print(f"✓ Raport HTML: {html_path}")
+        # Zmierz czas wykonania
+        start_time = time.time()
+        # Z raportem: encje z anonimizacji są zwracane razem z wynikiem (bez ponownej detekcji)
+        result = anonymizer.anonymize_file(input_path, output_path, return_result=bool(add_report))
+        execution_time = time.time() - start_time
         
-        # Generuj raport PDF
-        if report_format in ['pdf', 'all']:
-            try:
-                from dane_bez_twarzy.reporting import generate_pdf_report
-                pdf_path = report_path.with_suffix('.pdf')
-                generate_pdf_report(report, pdf_path)
-                print(f"✓ Raport PDF: {pdf_path}")
-            except ImportError:
-                print(f"⚠️  Raport PDF wymaga matplotlib. Zainstaluj: pip install matplotlib")
+        result_path = result.output_path if add_report else result
+        print(f"✓ Plik zanonimizowany: {result_path}")
+        print(f"  Czas wykonania: {execution_time:.3f} sekund")
         
-        # Pokaż statystyki
-        print(f"\n📊 Statystyki:")
-        print(f"  - Plik wejściowy: {report['file_stats']['filename']}")
-        print(f"  - Znaków w pliku: {report['file_stats']['character_count']:,}")
-        print(f"  - Linii w pliku: {report['file_stats']['line_count']:,}")
-        print(f"  - Wykrytych encji: {report['total_entities']:,}")
-        for entity_type, count in report['entities_by_type'].items():
-            print(f"    • {entity_type}: {count}")
+        # Wygeneruj raport jeśli flaga --add-report została użyta
+        if add_report:
+            report_path = Path(args.add_report)
+            report_format = getattr(args, 'report_format', 'json')
+            
+            # Generuj raport JSON
+            if report_format in ['json', 'all']:
+                json_path = report_path if report_format == 'json' else report_path.with_suffix('.json')
+                report = anonymizer.report_from_result(
+                    result,
+                    json_path,
+                    execution_time=execution_time,
+                    input_filename=str(input_path.name)
+                )
+                print(f"\n✓ Raport JSON: {json_path}")
+            else:
+                # Generuj raport bez zapisu (potrzebny do HTML/PDF)
+                report = anonymizer.report_from_result(
+                    result,
+                    None,
+                    execution_time=execution_time,
+                    input_filename=str(input_path.name)
+                )
+            
+            # Generuj raport HTML
+            if report_format in ['html', 'all']:
+                from dane_bez_twarzy.reporting import generate_html_report
+                html_path = report_path.with_suffix('.html')
+                generate_html_report(report, html_path)
+                print(f"✓ Raport HTML: {html_path}")
+            
+            # Generuj raport PDF
+            if report_format in ['pdf', 'all']:
+                try:
+                    from dane_bez_twarzy.reporting import generate_pdf_report
+                    pdf_path = report_path.with_suffix('.pdf')
+                    generate_pdf_report(report, pdf_path)
+                    print(f"✓ Raport PDF: {pdf_path}")
+                except ImportError:
+                    print(f"⚠️  Raport PDF wymaga matplotlib. Zainstaluj: pip install matplotlib")
+            
+            # Pokaż statystyki
+            print(f"\n📊 Statystyki:")
+            print(f"  - Plik wejściowy: {report['file_stats']['filename']}")
+            print(f"  - Znaków w pliku: {report['file_stats']['character_count']:,}")
+            print(f"  - Linii w pliku: {report['file_stats']['line_count']:,}")
+            print(f"  - Wykrytych encji: {report['total_entities']:,}")
+            for entity_type, count in report['entities_by_type'].items():
+                print(f"    • {entity_type}: {count}")
 
 
 def anonymize_directory(args) -> None:
@@ -224,20 +233,34 @@ def anonymize_directory(args) -> None:
         if hasattr(args, 'llm_model') and args.llm_model:
             llm_kwargs['llm_model_name'] = args.llm_model
     
-    anonymizer = Anonymizer(config, **llm_kwargs)
-    
-    input_dir = Path(args.input_dir)
-    output_dir = Path(args.output_dir)
-    
-    results = anonymizer.anonymize_directory(
-        input_dir=input_dir,
-        output_dir=output_dir,
-        recursive=args.recursive,
-        file_patterns=args.patterns
-    )
+    with Anonymizer(config, **llm_kwargs) as anonymizer:
+        input_dir = Path(args.input_dir)
+        output_dir = Path(args.output_dir)
+        
+        results = anonymizer.anonymize_directory(
+            input_dir=input_dir,
+            output_dir=output_dir,
+            recursive=args.recursive,
+            file_patterns=args.patterns
+        )
+        
+        print(f"✓ Przetworzono {len(results)} plików")
+        print(f"✓ Wyniki zapisane w: {output_dir}")
+
+
+def decrypt_file(args) -> None:
+    """Odszyfrowuje plik zanonimizowany metodą encrypt."""
+    config = load_config(args.config, args)
+    config.method = AnonymizationMethod.ENCRYPT
     
-    print(f"✓ Przetworzono {len(results)} plików")
-    print(f"✓ Wyniki zapisane w: {output_dir}")
+    with Anonymizer(config) as anonymizer:
+        result_path = anonymizer.decrypt_file(
+            Path(args.input),
+            Path(args.output) if args.output else None,
+            sidecar_path=args.sidecar
+        )
+        
+        print(f"✓ Plik odszyfrowany: {result_path}")
 
 
 def detect_entities(args) -> None:
@@ -255,26 +278,25 @@ def detect_entities(args) -> None:
         if hasattr(args, 'llm_model') and args.llm_model:
             llm_kwargs['llm_model_name'] = args.llm_model
     
-    anonymizer = Anonymizer(config, **llm_kwargs)
-    
-    input_path = Path(args.input)
-    
-    # Wczytaj tekst
-    with open(input_path, 'r', encoding='utf-8') as f:
-        text = f.read()
-    
-    # Wygeneruj raport
-    report_path = Path(args.report) if args.report else None
-    report = anonymizer.generate_report(text, report_path)
-    
-    # Wyświetl statystyki
-    print(f"✓ Znaleziono {report['total_entities']} encji")
-    print("\nStatystyki według typu:")
-    for entity_type, count in report['entities_by_type'].items():
-        print(f"  - {entity_type}: {count}")
-    
-    if report_path:
-        print(f"\n✓ Raport zapisany: {report_path}")
+    with Anonymizer(config, **llm_kwargs) as anonymizer:
+        input_path = Path(args.input)
+        
+        # Wczytaj tekst
+        with open(input_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        # Wygeneruj raport
+        report_path = Path(args.report) if args.report else None
+        report = anonymizer.generate_report(text, report_path)
+        
+        # Wyświetl statystyki
+        print(f"✓ Znaleziono {report['total_entities']} encji")
+        print("\nStatystyki według typu:")
+        for entity_type, count in report['entities_by_type'].items():
+            print(f"  - {entity_type}: {count}")
+        
+        if report_path:
+            print(f"\n✓ Raport zapisany: {report_path}")
 
 
 if __name__ == '__main__':
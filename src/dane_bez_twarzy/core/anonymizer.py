@@ -4,14 +4,19 @@ Główny moduł anonimizacji danych.
 
 import logging
 from pathlib import Path
-from typing import Union, List, Optional, Dict, Any
+from typing import TYPE_CHECKING, Union, List, Optional, Dict, Any, Iterable, Iterator, Sequence, Tuple
 
-from dane_bez_twarzy.core.config import AnonymizationConfig
-from dane_bez_twarzy.core.detector import EntityDetector
-from dane_bez_twarzy.strategies import get_strategy
+from dane_bez_twarzy.core.config import AnonymizationConfig, AnonymizationMethod, EntityType
+from dane_bez_twarzy.core.detector import Entity, EntityDetector
+from dane_bez_twarzy.core.result import AnonymizationResult
+from dane_bez_twarzy.core.spans import LineIndex
+from dane_bez_twarzy.strategies import EncryptStrategy, StrategyPlan, get_strategy
 from dane_bez_twarzy.processors import get_processor
 from dane_bez_twarzy.utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from dane_bez_twarzy.core.profile import ColumnProfile
+
 
 class Anonymizer:
     """
@@ -23,6 +28,12 @@ class Anonymizer:
         >>> result = anonymizer.anonymize_text("Jan Kowalski, tel: 123-456-789")
         >>> print(result)
         '*** ********, tel: ***********'
+    
+    Przy parallel_detectors i pseudonym_vault anonimizer trzyma pulę
+    wątków/procesów i połączenie z bazą - należy go zamknąć (close) albo
+    użyć jako menedżera kontekstu:
+        >>> with Anonymizer(config) as anonymizer:
+        ...     anonymizer.anonymize_file("akta.txt")
     """
     
     def __init__(self, config: Optional[AnonymizationConfig] = None, 
@@ -48,6 +59,17 @@ class Anonymizer:
         # Przechowywanie informacji o aktualnie przetwarzanym pliku
         self._current_file = None
         
+        # Zapisy detekcji plików (config.detection_store): odtwarzany i nagrywany
+        self.detection_store = None
+        if self.config.detection_store:
+            from dane_bez_twarzy.core.sidecar import DetectionStore
+            self.detection_store = DetectionStore(self.config.detection_store)
+        self._replay = None
+        self._recording = None
+        
+        # Segmenty zbierane dla AnonymizationResult (return_result=True)
+        self._collected = None
+        
         # Inicjalizacja detektora encji
         self.detector = EntityDetector(
             self.config,
@@ -64,22 +86,55 @@ class Anonymizer:
         if use_llm:
             self.logger.info("Detektor LLM włączony")
     
-    def anonymize_text(self, text: str, log_prefix: str = "") -> str:
+    def close(self) -> None:
+        """Zwalnia zasoby detektora (pulę wątków/procesów) i strategii (magazyn pseudonimów)."""
+        self.detector.close()
+        self.strategy.close()
+    
+    def __enter__(self) -> "Anonymizer":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def anonymize_text(
+        self,
+        text: str,
+        log_prefix: str = "",
+        return_result: bool = False
+    ) -> Union[str, AnonymizationResult]:
         """
         Anonimizuje tekst.
         
         Args:
             text: Tekst do anonimizacji.
             log_prefix: Prefiks dla logów (np. nazwa pliku).
+            return_result: Zwróć AnonymizationResult (tekst wraz z wykrytymi encjami).
             
         Returns:
-            Zanonimizowany tekst.
+            Zanonimizowany tekst lub AnonymizationResult.
         """
+        if not return_result:
+            return self._anonymize(text, log_prefix)
+        
+        collected, self._collected = self._collected, AnonymizationResult()
+        try:
+            result = self._collected
+            result.text = self._anonymize(text, log_prefix)
+            return result
+        finally:
+            self._collected = collected
+    
+    def _anonymize(self, text: str, log_prefix: str = "") -> str:
+        """Anonimizuje tekst, dopisując segment do zbieranego wyniku."""
         if not text:
             return text
         
         # Wykryj encje
-        entities = self.detector.detect(text)
+        entities = self._detect(text)
+        
+        if self._collected is not None:
+            self._collected.add(text, entities)
         
         if not entities:
             self.logger.debug("Nie znaleziono encji do anonimizacji")
@@ -95,6 +150,298 @@ class Anonymizer:
         
         return anonymized_text
     
+    def anonymize_batch(
+        self,
+        texts: Sequence[str],
+        counts: Optional[Sequence[int]] = None,
+        log_prefix: str = "",
+        entity_type: Optional[EntityType] = None
+    ) -> List[str]:
+        """
+        Anonimizuje partię tekstów (np. unikalne wartości kolumny tabeli).
+        
+        Encje są wykrywane osobno dla każdego tekstu, ale zamienniki są
+        wyznaczane raz dla całej partii (strategy.replacer) - haszowanie,
+        szyfrowanie i zapytania do magazynu pseudonimów idą jednym wsadem.
+        Wynik jest taki sam jak przy anonymize_text wywołanym po kolei.
+        
+        Args:
+            texts: Teksty do anonimizacji.
+            counts: Liczby wystąpień tekstów w źródle (np. wierszy z daną
+                wartością) - w wyniku (return_result) każdy tekst jest
+                liczony tyle razy, ile wystąpił. Domyślnie po jednym.
+            log_prefix: Prefiks dla logów.
+            entity_type: Typ encji, którą są w całości teksty (kolumna UNIFORM
+                z core.profile) - tekst pasujący w całości do wzorca tego typu
+                (z walidacją) nie przechodzi przez pozostałe detektory.
+            
+        Returns:
+            Zanonimizowane teksty w kolejności wejścia.
+        """
+        from dane_bez_twarzy.core.spans import replace_spans
+        
+        detected = [self._detect_value(text, entity_type) if text else [] for text in texts]
+        
+        if self._collected is not None:
+            for i, (text, entities) in enumerate(zip(texts, detected)):
+                for _ in range(1 if counts is None else int(counts[i])):
+                    self._collected.add(text, entities)
+        
+        found = [entity for entities in detected for entity in entities]
+        if not found:
+            return list(texts)
+        
+        self.logger.info(f"Znaleziono {len(found)} encji do anonimizacji w {len(texts)} tekstach")
+        for text, entities in zip(texts, detected):
+            if entities:
+                self._log_entity_details(text, entities, log_prefix)
+        
+        replacement_for = self.strategy.replacer(found)
+        return [
+            replace_spans(text, ((e.start, e.end, replacement_for(e)) for e in entities))
+            if entities else text
+            for text, entities in zip(texts, detected)
+        ]
+    
+    def _detect_value(self, text: str, entity_type: Optional[EntityType]) -> List[Entity]:
+        """Wykrywa encje w wartości, która zwykle w całości jest encją danego typu."""
+        # Zapis detekcji działa na pełnych wynikach detektorów
+        if entity_type is not None and self._replay is None and self._recording is None:
+            entity = self.detector.regex_detector.match_whole(text)
+            if entity is not None and entity.type == entity_type:
+                return self.detector.finalize([entity])
+        
+        return self._detect(text)
+    
+    def add_column_profiles(self, profiles: Iterable["ColumnProfile"]) -> None:
+        """
+        Loguje profile kolumn tabeli i dołącza je do zbieranego wyniku (raportu).
+        
+        Args:
+            profiles: Profile wyznaczone przez core.profile.profile_column.
+        """
+        for profile in profiles:
+            self.logger.info(
+                f"Profil kolumny '{profile.column}': {profile.kind} "
+                f"({profile.with_entities}/{profile.sampled} wartości z encjami"
+                + (f", typ {profile.entity_type.value})" if profile.entity_type else ")")
+            )
+            if self._collected is not None:
+                self._collected.column_profiles.append(profile)
+    
+    def anonymize_stream(self, chunks: Iterable[str], log_prefix: str = "") -> Iterator[str]:
+        """
+        Anonimizuje tekst podawany kolejnymi fragmentami (stała pamięć).
+        
+        Fragmenty są łączone w okna, które zachodzą na siebie o
+        config.stream_overlap znaków z obu stron: z lewej - kontekst już
+        zanonimizowanego tekstu, z prawej - tekst, który zostanie
+        zanonimizowany w następnym oknie. Każda encja należy do dokładnie
+        jednego okna (tego, w którego części własnej się zaczyna), więc
+        encje na styku okien nie są dublowane ani gubione, o ile nie są
+        dłuższe niż zakładka. Pozycje encji w wyniku (return_result) są
+        globalne.
+        
+        Args:
+            chunks: Kolejne fragmenty tekstu (np. bloki czytane z pliku).
+            log_prefix: Prefiks dla logów.
+            
+        Yields:
+            Kolejne fragmenty zanonimizowanego tekstu.
+        """
+        overlap = self.config.stream_overlap
+        context, pending, offset = "", "", 0
+        
+        for chunk in chunks:
+            pending += chunk
+            # Okno musi mieć część własną i pełną prawą zakładkę
+            if len(pending) <= 2 * overlap:
+                continue
+            
+            piece, context, pending, offset = self._anonymize_window(
+                context, pending, offset, final=False, log_prefix=log_prefix
+            )
+            yield piece
+        
+        if pending:
+            piece, _, _, _ = self._anonymize_window(
+                context, pending, offset, final=True, log_prefix=log_prefix
+            )
+            yield piece
+    
+    def _anonymize_window(
+        self,
+        context: str,
+        pending: str,
+        offset: int,
+        final: bool,
+        log_prefix: str = ""
+    ) -> Tuple[str, str, str, int]:
+        """
+        Anonimizuje część własną jednego okna strumienia.
+        
+        Args:
+            context: Lewy kontekst (koniec już zanonimizowanego tekstu).
+            pending: Tekst jeszcze niezanonimizowany.
+            offset: Pozycja globalna początku pending.
+            final: Ostatnie okno - cały pending jest częścią własną.
+            log_prefix: Prefiks dla logów.
+            
+        Returns:
+            Krotka (zanonimizowana część własna, nowy kontekst, nowy pending, nowy offset).
+        """
+        overlap = self.config.stream_overlap
+        window = context + pending
+        skip = len(context)
+        
+        # Cięcie przed prawą zakładką, najlepiej na końcu linii
+        cut = len(window)
+        if not final:
+            cut -= overlap
+            newline = window.rfind("\n", max(skip, cut - overlap), cut)
+            if newline != -1:
+                cut = newline + 1
+        
+        owned = []
+        # Okna się nie powtarzają - bez cache detekcji
+        for entity in self._detect(window, use_cache=False):
+            # Encje z lewego kontekstu należą do poprzedniego okna, a te za cięciem - do następnego
+            if entity.start < skip or entity.start >= cut:
+                continue
+            owned.append(Entity(
+                text=entity.text,
+                type=entity.type,
+                start=entity.start - skip,
+                end=entity.end - skip,
+                confidence=entity.confidence,
+                metadata=entity.metadata
+            ))
+            # Encja przecinająca cięcie zostaje w całości w tym oknie
+            cut = max(cut, entity.end)
+        
+        text = window[skip:cut]
+        if self._collected is not None:
+            self._collected.add(text, owned, offset)
+        
+        if owned:
+            self.logger.debug(f"{log_prefix}Okno {offset}-{offset + len(text)}: {len(owned)} encji")
+            text = self.strategy.anonymize(text, owned)
+        
+        return text, window[max(0, cut - overlap):cut], window[cut:], offset + cut - skip
+    
+    def anonymize_mapped(self, data: bytes, log_prefix: str = "") -> Iterator[bytes]:
+        """
+        Anonimizuje tekst UTF-8 podany jako bajty (np. plik zmapowany przez mmap).
+        
+        Okna i zakładki jak w anonymize_stream, ale liczone w bajtach.
+        Wbudowane wzorce skanują bajty bezpośrednio, a do str dekodowane są
+        tylko trafienia i linie potrzebne pozostałym detektorom (patrz
+        core.mapped - tam też ograniczenia tego trybu). Bajty między
+        encjami trafiają do wyniku bez zmian.
+        
+        Args:
+            data: Tekst w UTF-8 (bytes lub mmap).
+            log_prefix: Prefiks dla logów.
+            
+        Yields:
+            Kolejne fragmenty zanonimizowanego tekstu (UTF-8).
+            
+        Raises:
+            ValueError: Gdy konfiguracja wymaga dekodowania całego tekstu
+                (patrz core.mapped.unsupported_reason).
+        """
+        from dane_bez_twarzy.core.mapped import MappedScanner, char_length, char_start
+        from dane_bez_twarzy.core.spans import replace_spans
+        
+        scanner = MappedScanner(self.detector)
+        window_size = self.config.stream_window_size
+        overlap = self.config.stream_overlap
+        size = len(data)
+        
+        # Początek części własnej okna: pozycja bajtowa i znakowa
+        skip, offset = 0, 0
+        
+        while skip < size:
+            left = char_start(data, max(0, skip - overlap))
+            end = skip + window_size + overlap
+            if end >= size:
+                end = cut = size
+            else:
+                end = char_start(data, end)
+                # Cięcie przed prawą zakładką, najlepiej na końcu linii
+                cut = end - overlap
+                newline = data.rfind(b"\n", max(skip, cut - overlap), cut)
+                cut = newline + 1 if newline != -1 else char_start(data, cut)
+                if cut <= skip:
+                    # Okno węższe niż znak - część własna to co najmniej jeden znak
+                    cut = skip + 1
+                    while cut < size and 0x80 <= data[cut] < 0xC0:
+                        cut += 1
+                    end = max(end, cut)
+            
+            owned = []
+            for entity in scanner.detect(data[left:end]):
+                # Jak w _anonymize_window - encja należy do okna, w którego części własnej się zaczyna
+                if entity.start + left < skip or entity.start + left >= cut:
+                    continue
+                owned.append(entity)
+                cut = max(cut, entity.end + left)
+            
+            chunk = data[skip:cut]
+            
+            # Pozycje znakowe encji względem części własnej (liczone narastająco)
+            entities, spans = [], []
+            chars, pos = 0, 0
+            for entity in owned:
+                byte_start = entity.start + left - skip
+                chars += char_length(chunk, pos, byte_start)
+                pos = byte_start
+                spans.append((byte_start, entity.end + left - skip))
+                entities.append(Entity(
+                    text=entity.text,
+                    type=entity.type,
+                    start=chars,
+                    end=chars + len(entity.text),
+                    confidence=entity.confidence,
+                    metadata=entity.metadata
+                ))
+            
+            if self._collected is not None:
+                self._collected.add(chunk.decode("utf-8", errors="surrogateescape"), entities, offset)
+            
+            if entities:
+                self.logger.debug(f"{log_prefix}Okno {skip}-{cut} (bajty): {len(entities)} encji")
+                replacement_for = self.strategy.replacer(entities)
+                chunk = replace_spans(chunk, (
+                    (byte_start, byte_end, replacement_for(entity).encode("utf-8"))
+                    for (byte_start, byte_end), entity in zip(spans, entities)
+                ))
+            
+            yield chunk
+            offset += chars + char_length(data[skip + pos:cut])
+            skip = cut
+    
+    def _detect(self, text: str, use_cache: bool = True) -> List:
+        """
+        Wykrywa encje, korzystając z zapisu detekcji przetwarzanego pliku.
+        
+        Przy odtwarzaniu encje są brane z zapisu i przechodzą filtry
+        detektora (typy, pewność, wykluczenia); przy nagrywaniu wynik
+        detekcji jest dopisywany do zapisu.
+        """
+        if self._replay is not None:
+            entities = self._replay.entities_for(text)
+            if entities is not None:
+                return self.detector.finalize(entities)
+            self.logger.debug("Fragmentu nie ma w zapisie detekcji - wykrywanie od nowa")
+        
+        entities = self.detector.detect(text, use_cache=use_cache)
+        
+        if self._recording is not None:
+            self._recording.record(text, entities)
+        
+        return entities
+    
     def _log_entity_details(self, text: str, entities: List, log_prefix: str = "") -> None:
         """
         Loguje szczegółowe informacje o wykrytych encjach.
@@ -111,9 +458,10 @@ class Anonymizer:
         if self._current_file and not log_prefix:
             log_prefix = f"[{self._current_file}] "
         
-        # Oblicz numery linii i kolumn dla każdej encji
+        # Oblicz numery linii i kolumn dla każdej encji (indeks budowany raz na tekst)
+        line_index = LineIndex(text)
         for entity in entities:
-            line_num, col_num = self._get_position(text, entity.start)
+            line_num, col_num = line_index.position(entity.start)
             
             detector_info = entity.metadata.get('detector', 'unknown') if entity.metadata else 'unknown'
             
@@ -141,27 +489,27 @@ class Anonymizer:
         Returns:
             Tuple (numer_linii, numer_kolumny) - numeracja od 1.
         """
-        lines = text[:offset].split('\n')
-        line_num = len(lines)
-        col_num = len(lines[-1]) + 1 if lines else 1
-        return line_num, col_num
+        return LineIndex(text).position(offset)
     
     def anonymize_file(
         self,
         input_path: Union[str, Path],
         output_path: Optional[Union[str, Path]] = None,
+        return_result: bool = False,
         **kwargs: Any
-    ) -> Path:
+    ) -> Union[Path, AnonymizationResult]:
         """
         Anonimizuje plik.
         
         Args:
             input_path: Ścieżka do pliku wejściowego.
             output_path: Ścieżka do pliku wyjściowego. Jeśli None, użyje nazwy z sufiksem.
+            return_result: Zwróć AnonymizationResult (ścieżki wraz z wykrytymi encjami),
+                z którego można zbudować raport bez ponownej detekcji.
             **kwargs: Dodatkowe argumenty dla processora.
             
         Returns:
-            Ścieżka do zanonimizowanego pliku.
+            Ścieżka do zanonimizowanego pliku lub AnonymizationResult.
         """
         input_path = Path(input_path)
         
@@ -182,17 +530,109 @@ class Anonymizer:
         # Zapisz nazwę pliku dla logowania
         self._current_file = str(input_path.name)
         
+        # Szyfrowanie: osobny zestaw tokenów dla każdego dokumentu
+        encryptor = self._encryptor()
+        if encryptor is not None:
+            encryptor.reset()
+        
+        # Wykryj raz, renderuj wielokrotnie: użyj zapisu detekcji tego pliku lub go utwórz
+        if self.detection_store is not None:
+            self._start_detection_sidecar(input_path)
+        
+        # Zbieraj encje dla wyniku (processory wywołują anonymize_text per fragment)
+        result = AnonymizationResult(input_path=input_path, output_path=output_path)
+        if return_result:
+            self._collected = result
+        
         # Przetwórz plik
+        try:
+            processor.process(
+                input_path=input_path,
+                output_path=output_path,
+                anonymizer=self,
+                **kwargs
+            )
+            
+            if self._recording is not None:
+                sidecar_path = self.detection_store.save(self._recording)
+                self.logger.info(f"Zapis detekcji: {sidecar_path}")
+        finally:
+            self._current_file = None
+            self._replay = None
+            self._recording = None
+            self._collected = None
+        
+        if encryptor is not None:
+            sidecar_path = encryptor.save_sidecar(self._sidecar_path(output_path))
+            self.logger.info(f"Tokeny szyfrowania zapisane: {sidecar_path}")
+        
+        self.logger.info(f"Plik zanonimizowany: {output_path}")
+        return result if return_result else output_path
+    
+    def _start_detection_sidecar(self, input_path: Path) -> None:
+        """Ustawia odtwarzanie (gdy zapis istnieje) lub nagrywanie detekcji pliku."""
+        from dane_bez_twarzy.core.sidecar import DetectionSidecar, file_sha256
+        
+        source_hash = file_sha256(input_path)
+        fingerprint = self.detector.fingerprint
+        self._replay = self.detection_store.load(source_hash, fingerprint)
+        
+        if self._replay is not None:
+            self.logger.info(f"Renderowanie z zapisanych detekcji ({source_hash[:12]}...)")
+        else:
+            self._recording = DetectionSidecar(source_hash, fingerprint)
+    
+    def _encryptor(self) -> Optional[EncryptStrategy]:
+        """Zwraca strategię szyfrowania (także z planu strategii per typ) lub None."""
+        if isinstance(self.strategy, EncryptStrategy):
+            return self.strategy
+        if isinstance(self.strategy, StrategyPlan):
+            return self.strategy.strategies.get(AnonymizationMethod.ENCRYPT)
+        return None
+    
+    @staticmethod
+    def _sidecar_path(output_path: Path) -> Path:
+        """Zwraca ścieżkę pliku tokenów dla zaszyfrowanego dokumentu."""
+        return output_path.with_name(output_path.name + ".enc.json")
+    
+    def decrypt_file(
+        self,
+        input_path: Union[str, Path],
+        output_path: Optional[Union[str, Path]] = None,
+        sidecar_path: Optional[Union[str, Path]] = None
+    ) -> Path:
+        """
+        Odtwarza dokument zaszyfrowany metodą ENCRYPT.
+        
+        Args:
+            input_path: Zaszyfrowany plik.
+            output_path: Ścieżka wyjściowa. Jeśli None, użyje nazwy z sufiksem.
+            sidecar_path: Plik tokenów. Jeśli None, <input_path>.enc.json.
+            
+        Returns:
+            Ścieżka do odszyfrowanego pliku.
+        """
+        encryptor = self._encryptor()
+        if encryptor is None:
+            raise ValueError("decrypt_file wymaga metody ENCRYPT")
+        
+        input_path = Path(input_path)
+        if output_path is None:
+            output_path = input_path.parent / f"{input_path.stem}_odszyfrowany{input_path.suffix}"
+        else:
+            output_path = Path(output_path)
+        
+        tokens = EncryptStrategy.load_sidecar(sidecar_path or self._sidecar_path(input_path))
+        
+        # Processory wywołują tylko anonymize_text - podstawiamy deszyfrowanie
+        processor = get_processor(input_path.suffix)
         processor.process(
             input_path=input_path,
             output_path=output_path,
-            anonymizer=self,
-            **kwargs
+            anonymizer=_Decryptor(encryptor, tokens)
         )
         
-        self._current_file = None
-        
-        self.logger.info(f"Plik zanonimizowany: {output_path}")
+        self.logger.info(f"Plik odszyfrowany: {output_path}")
         return output_path
     
     def anonymize_directory(
@@ -265,18 +705,23 @@ class Anonymizer:
             text: Tekst do analizy.
             
         Returns:
-            Lista wykrytych encji z informacjami.
+            Lista wykrytych encji z informacjami (także linia i kolumna początku).
         """
         entities = self.detector.detect(text)
+        line_index = LineIndex(text)
         return [
             {
                 "text": entity.text,
                 "type": entity.type.value,
                 "start": entity.start,
                 "end": entity.end,
+                "line": line,
+                "column": column,
                 "confidence": entity.confidence
             }
-            for entity in entities
+            for entity, (line, column) in zip(
+                entities, line_index.positions(entity.start for entity in entities)
+            )
         ]
     
     def generate_report(self, text: str, output_path: Optional[Union[str, Path]] = None, execution_time: Optional[float] = None, input_filename: Optional[str] = None) -> Dict[str, Any]:
@@ -294,16 +739,63 @@ class Anonymizer:
         """
         entities = self.detect_entities(text)
         
+        # Statystyki pliku
+        line_count = text.count('\n') + 1 if text else 0
+        char_count = len(text)
+        
+        return self._build_report(
+            entities, line_count, char_count, output_path, execution_time, input_filename
+        )
+    
+    def report_from_result(
+        self,
+        result: AnonymizationResult,
+        output_path: Optional[Union[str, Path]] = None,
+        execution_time: Optional[float] = None,
+        input_filename: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generuje raport z wyniku anonimizacji - bez ponownej detekcji i odczytu pliku.
+        
+        Args:
+            result: Wynik anonymize_file/anonymize_text z return_result=True.
+            output_path: Opcjonalna ścieżka do zapisu raportu.
+            execution_time: Opcjonalny czas wykonania anonimizacji (w sekundach).
+            input_filename: Nazwa pliku wejściowego (domyślnie z result.input_path).
+            
+        Returns:
+            Słownik z raportem (format jak generate_report).
+        """
+        if input_filename is None and result.input_path is not None:
+            input_filename = result.input_path.name
+        
+        return self._build_report(
+            result.entity_records(),
+            result.line_count,
+            result.character_count,
+            output_path,
+            execution_time,
+            input_filename,
+            [profile.to_dict() for profile in result.column_profiles]
+        )
+    
+    def _build_report(
+        self,
+        entities: List[Dict[str, Any]],
+        line_count: int,
+        char_count: int,
+        output_path: Optional[Union[str, Path]],
+        execution_time: Optional[float],
+        input_filename: Optional[str],
+        column_profiles: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Buduje (i opcjonalnie zapisuje) raport z listy encji i statystyk tekstu."""
         # Statystyki encji
         stats = {}
         for entity in entities:
             entity_type = entity["type"]
             stats[entity_type] = stats.get(entity_type, 0) + 1
         
-        # Statystyki pliku
-        line_count = text.count('\n') + 1 if text else 0
-        char_count = len(text)
-        
         # Budowa raportu z confgiem i czasem na początku
         report = {
             "config": {
@@ -327,6 +819,8 @@ class Anonymizer:
         }
         report["total_entities"] = len(entities)
         report["entities_by_type"] = stats
+        if column_profiles:
+            report["column_profiles"] = column_profiles
         report["entities"] = entities
         
         # Zapis do pliku
@@ -337,3 +831,14 @@ class Anonymizer:
             self.logger.info(f"Raport zapisany: {output_path}")
         
         return report
+
+
+class _Decryptor:
+    """Adapter przekazywany processorom zamiast Anonymizera przy deszyfrowaniu."""
+    
+    def __init__(self, strategy: EncryptStrategy, tokens: Dict[str, str]):
+        self.strategy = strategy
+        self.tokens = tokens
+    
+    def anonymize_text(self, text: str, log_prefix: str = "") -> str:
+        return self.strategy.decrypt(text, self.tokens)
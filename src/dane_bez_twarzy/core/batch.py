@@ -0,0 +1,231 @@
+"""
+Zwarta, tablicowa reprezentacja wielu encji jednego tekstu.
+"""
+
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from dane_bez_twarzy.core.config import EntityType
+from dane_bez_twarzy.core.detector import Entity
+
+
+# Kody typów encji (indeks w krotce) - jeden bajt zamiast referencji na encję
+TYPE_CODES = tuple(EntityType)
+_TYPE_INDEX = {entity_type: code for code, entity_type in enumerate(TYPE_CODES)}
+
+
+class EntityBatch:
+    """
+    Encje jednego tekstu przechowywane w równoległych tablicach.
+    
+    Zamiast obiektu na encję batch trzyma tablice array: początki, końce,
+    kody typów, pewności, identyfikatory detektorów i metadanych. Tekst
+    encji nie jest kopiowany - jest wycinany ze źródła dopiero przy odczycie.
+    Metadane są internowane: encje o identycznych metadanych (np. wszystkie
+    trafienia wzorca "email") współdzielą jeden słownik.
+    
+    Iteracja i indeksowanie zwracają widoki Entity, więc batch można
+    przekazać wszędzie tam, gdzie oczekiwana jest lista encji.
+    
+    Przykład użycia:
+        >>> batch = EntityBatch.from_entities(text, entities)
+        >>> batch = batch.resolve_overlaps()
+        >>> [entity.text for entity in batch]
+        ['Jan Kowalski', 'jan@example.com']
+    """
+    
+    def __init__(self, source: str):
+        """
+        Inicjalizacja pustego batcha.
+        
+        Args:
+            source: Tekst, z którego pochodzą encje.
+        """
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.types = array("B")
+        self.confidences = array("d")
+        self.detectors = array("B")
+        self.metadata_ids = array("I")
+        
+        # Tablice internowania (współdzielone przez batche pochodne)
+        self._detector_names: List[Optional[str]] = [None]
+        self._detector_index: Dict[Optional[str], int] = {None: 0}
+        self._metadata: List[Optional[dict]] = [None]
+        self._metadata_index: Dict[tuple, int] = {}
+        
+        # Teksty encji różniące się od source[start:end] (rzadkie)
+        self._texts: Dict[int, str] = {}
+    
+    @classmethod
+    def from_entities(cls, source: str, entities: Iterable[Entity]) -> "EntityBatch":
+        """
+        Tworzy batch z listy encji.
+        
+        Args:
+            source: Tekst, w którym wykryto encje.
+            entities: Encje do zapisania.
+        
+        Returns:
+            Nowy batch.
+        """
+        batch = cls(source)
+        batch.extend(entities)
+        return batch
+    
+    def append(self, start: int, end: int, entity_type: EntityType,
+               confidence: float = 1.0, metadata: Optional[dict] = None,
+               text: Optional[str] = None) -> None:
+        """
+        Dodaje encję bez tworzenia obiektu Entity.
+        
+        Args:
+            start: Początek encji w source.
+            end: Koniec encji w source.
+            entity_type: Typ encji.
+            confidence: Pewność wykrycia.
+            metadata: Metadane encji (internowane).
+            text: Tekst encji - tylko gdy różni się od source[start:end].
+        """
+        if text is not None and text != self.source[start:end]:
+            self._texts[len(self.starts)] = text
+        
+        self.starts.append(start)
+        self.ends.append(end)
+        self.types.append(_TYPE_INDEX[entity_type])
+        self.confidences.append(confidence)
+        self.detectors.append(self._intern_detector(metadata))
+        self.metadata_ids.append(self._intern_metadata(metadata))
+    
+    def extend(self, entities: Iterable[Entity]) -> None:
+        """Dodaje encje z listy obiektów Entity."""
+        for entity in entities:
+            self.append(
+                entity.start, entity.end, entity.type,
+                entity.confidence, entity.metadata, entity.text
+            )
+    
+    def _intern_detector(self, metadata: Optional[dict]) -> int:
+        """Zwraca identyfikator detektora zapisanego w metadanych."""
+        name = metadata.get("detector") if metadata else None
+        code = self._detector_index.get(name)
+        if code is None:
+            code = len(self._detector_names)
+            self._detector_names.append(name)
+            self._detector_index[name] = code
+        return code
+    
+    def _intern_metadata(self, metadata: Optional[dict]) -> int:
+        """Zwraca identyfikator metadanych, współdzieląc identyczne słowniki."""
+        if not metadata:
+            return 0
+        
+        try:
+            key = tuple(sorted(metadata.items()))
+            hash(key)
+        except TypeError:
+            # Niehaszowalne wartości - słownik przechowywany osobno
+            self._metadata.append(metadata)
+            return len(self._metadata) - 1
+        
+        code = self._metadata_index.get(key)
+        if code is None:
+            code = len(self._metadata)
+            self._metadata.append(metadata)
+            self._metadata_index[key] = code
+        return code
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+    
+    def __iter__(self) -> Iterator[Entity]:
+        for i in range(len(self.starts)):
+            yield self[i]
+    
+    def __getitem__(self, i: int) -> Entity:
+        """Zwraca widok Entity dla i-tej encji (tekst wycinany ze źródła)."""
+        if i < 0:
+            i += len(self.starts)
+        return Entity(
+            text=self.text(i),
+            type=TYPE_CODES[self.types[i]],
+            start=self.starts[i],
+            end=self.ends[i],
+            confidence=self.confidences[i],
+            metadata=self._metadata[self.metadata_ids[i]]
+        )
+    
+    def text(self, i: int) -> str:
+        """Zwraca tekst i-tej encji."""
+        text = self._texts.get(i)
+        if text is None:
+            text = self.source[self.starts[i]:self.ends[i]]
+        return text
+    
+    def type(self, i: int) -> EntityType:
+        """Zwraca typ i-tej encji."""
+        return TYPE_CODES[self.types[i]]
+    
+    def detector(self, i: int) -> Optional[str]:
+        """Zwraca nazwę detektora i-tej encji."""
+        return self._detector_names[self.detectors[i]]
+    
+    def to_entities(self) -> List[Entity]:
+        """Zwraca encje jako listę obiektów Entity (widok zgodności)."""
+        return list(self)
+    
+    def select(self, indices: Sequence[int]) -> "EntityBatch":
+        """
+        Tworzy batch z wybranych encji (w podanej kolejności).
+        
+        Args:
+            indices: Indeksy encji do zachowania.
+        
+        Returns:
+            Nowy batch współdzielący źródło i tablice internowania.
+        """
+        batch = EntityBatch.__new__(EntityBatch)
+        batch.source = self.source
+        batch.starts = array("q", (self.starts[i] for i in indices))
+        batch.ends = array("q", (self.ends[i] for i in indices))
+        batch.types = array("B", (self.types[i] for i in indices))
+        batch.confidences = array("d", (self.confidences[i] for i in indices))
+        batch.detectors = array("B", (self.detectors[i] for i in indices))
+        batch.metadata_ids = array("I", (self.metadata_ids[i] for i in indices))
+        batch._detector_names = self._detector_names
+        batch._detector_index = self._detector_index
+        batch._metadata = self._metadata
+        batch._metadata_index = self._metadata_index
+        batch._texts = {
+            new: self._texts[old]
+            for new, old in enumerate(indices)
+            if old in self._texts
+        }
+        return batch
+    
+    def where(self, predicate: Callable[[int], bool]) -> "EntityBatch":
+        """Zwraca batch z encjami, dla których predicate(indeks) jest prawdziwy."""
+        return self.select([i for i in range(len(self.starts)) if predicate(i)])
+    
+    def sorted_by_start(self) -> "EntityBatch":
+        """Zwraca batch posortowany po początku encji (stabilnie)."""
+        starts = self.starts
+        return self.select(sorted(range(len(starts)), key=starts.__getitem__))
+    
+    def resolve_overlaps(self) -> "EntityBatch":
+        """
+        Usuwa nakładające się encje, zachowując te o wyższej pewności.
+        
+        Ten sam algorytm co core.spans.resolve_overlaps, liczony bezpośrednio
+        na tablicach batcha.
+        
+        Returns:
+            Batch nienakładających się encji posortowany po pozycji.
+        """
+        from dane_bez_twarzy.core.spans import resolve_overlap_indices
+        
+        return self.select(resolve_overlap_indices(self.starts, self.ends, self.confidences))
@@ -0,0 +1,138 @@
+"""
+Cache wyników detekcji adresowany treścią tekstu.
+"""
+
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Przybliżony narzut pamięci na wpis i na encję (obiekt, słownik metadanych, klucz)
+_ENTRY_OVERHEAD = 200
+_ENTITY_OVERHEAD = 400
+
+
+def text_digest(text: str) -> bytes:
+    """
+    Zwraca skrót treści tekstu używany jako część klucza cache.
+    
+    Args:
+        text: Tekst do zahaszowania.
+    
+    Returns:
+        16-bajtowy skrót BLAKE2b.
+    """
+    return blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def estimate_size(entities: List) -> int:
+    """Szacuje pamięć zajmowaną przez listę encji (w bajtach)."""
+    return _ENTRY_OVERHEAD + sum(
+        _ENTITY_OVERHEAD + 2 * len(entity.text) for entity in entities
+    )
+
+
+class DetectionCache:
+    """
+    Cache LRU list encji ograniczony liczbą wpisów i przybliżoną pamięcią.
+    
+    Klucze są dowolnymi wartościami haszowalnymi - EntityDetector używa
+    krotek (odcisk konfiguracji, grupa detektorów, skrót tekstu). Przy
+    przekroczeniu któregokolwiek limitu usuwane są najdawniej używane wpisy.
+    
+    Przykład użycia:
+        >>> cache = DetectionCache(max_entries=1000)
+        >>> cache.put(key, entities)
+        >>> cache.get(key)
+        [Entity(...), ...]
+    """
+    
+    def __init__(self, max_entries: int = 4096, max_bytes: Optional[int] = None):
+        """
+        Inicjalizacja cache.
+        
+        Args:
+            max_entries: Maksymalna liczba wpisów.
+            max_bytes: Przybliżony limit pamięci (None = bez limitu).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        self._entries: "OrderedDict[Hashable, Tuple[List, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable) -> Optional[List]:
+        """
+        Zwraca zapamiętaną listę encji lub None.
+        
+        Args:
+            key: Klucz wpisu.
+        
+        Returns:
+            Kopia zapamiętanej listy (encje są współdzielone) albo None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+    
+    def put(self, key: Hashable, entities: List) -> None:
+        """
+        Zapamiętuje listę encji, usuwając najstarsze wpisy ponad limity.
+        
+        Args:
+            key: Klucz wpisu.
+            entities: Lista encji do zapamiętania.
+        """
+        size = estimate_size(entities)
+        if self.max_entries <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            
+            self._entries[key] = (list(entities), size)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Usuwa wszystkie wpisy (liczniki pozostają)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Zwraca statystyki cache.
+        
+        Returns:
+            Słownik z licznikami hits, misses, evictions, entries, bytes.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
@@ -4,6 +4,8 @@ Moduł konfiguracji dla biblioteki anonimizacji danych.
 
 from dataclasses import dataclass, field
 from enum import Enum
+import hashlib
+import json
 from typing import List, Optional, Dict
 
 
@@ -70,14 +72,25 @@ class AnonymizationConfig:
     # Parametry pseudonimizacji
     seed: Optional[int] = None  # Seed dla powtarzalnych pseudonimów
     pseudonym_prefix: str = "Osoba"
+    pseudonym_vault: Optional[str] = None  # Plik SQLite z pseudonimami (trwałe, współdzielone między procesami)
+    pseudonym_cache_size: int = 100_000  # Maks. liczba pseudonimów w pamięci przy pseudonym_vault
+    pseudonym_mode: str = "counter"  # counter ([PERSON_1]), hmac (Osoba_XXXXXXXX, bez wspólnego stanu)
+    pseudonym_key: Optional[str] = None  # Klucz HMAC dla pseudonym_mode="hmac" (domyślnie seed)
+    pseudonym_hash_length: int = 8  # Liczba znaków kodu pseudonimów HMAC
     
     # Parametry haszowania
-    hash_algorithm: str = "sha256"
+    hash_algorithm: str = "sha256"  # sha256, sha512, md5, blake2b, hmac-sha256
     hash_salt: Optional[str] = None
+    hash_key: Optional[str] = None  # Klucz dla blake2b (opcjonalny) i hmac-sha256 (wymagany)
+    hash_cache_size: int = 65536  # Liczba zapamiętanych skrótów (LRU)
     
     # Parametry szyfrowania
     encryption_key: Optional[str] = None
     
+    # Metody dla wybranych typów encji, np. {"EMAIL": "hash", "PERSON": "pseudonymize"}
+    # (pozostałe typy używają method; wszystkie zamieniane w jednym przebiegu)
+    strategy_plan: Dict[EntityType, AnonymizationMethod] = field(default_factory=dict)
+    
     # Własne wzorce regex
     custom_patterns: Dict[str, str] = field(default_factory=dict)
     
@@ -88,6 +101,7 @@ class AnonymizationConfig:
     case_sensitive: bool = False
     detect_context: bool = True  # Użyj kontekstu do lepszego wykrywania
     min_confidence: float = 0.7  # Minimalna pewność wykrycia (0-1)
+    use_prefilter: bool = True  # Pomijaj wzorce, które nie mogą pasować (np. brak "@" = brak emaili)
     
     # Opcje dla NLP
     use_nlp: bool = False  # Domyślnie wyłączone (szybsze, bez limitu rozmiaru)
@@ -98,6 +112,30 @@ class AnonymizationConfig:
     llm_chunk_size: int = 3000  # Maksymalny rozmiar fragmentu tekstu dla LLM (w znakach) - ~750 tokenów
     llm_chunk_overlap: int = 200  # Nakładanie się fragmentów (w znakach)
     
+    # Równoległe uruchamianie detektorów (czas = najwolniejszy detektor zamiast sumy)
+    parallel_detectors: bool = False
+    detector_executor: str = "thread"  # thread, process
+    detector_workers: Optional[int] = None  # None = po jednym wątku/procesie na detektor
+    
+    # Cache wyników detekcji (powtarzające się komórki arkuszy, tabele DOCX)
+    detection_cache_size: int = 4096  # Maksymalna liczba wpisów (0 = wyłączony)
+    detection_cache_max_bytes: Optional[int] = 64 * 1024 * 1024  # Przybliżony limit pamięci
+    cache_nlp_results: bool = False  # Cache'uj także wyniki NLP
+    cache_llm_results: bool = False  # Cache'uj także wyniki LLM
+    detection_store: Optional[str] = None  # Katalog zapisów detekcji plików (wykryj raz, renderuj wielokrotnie)
+    
+    # Strumieniowe przetwarzanie dużych plików tekstowych (stała pamięć)
+    stream_threshold: Optional[int] = 64 * 1024 * 1024  # Pliki .txt i .csv większe niż tyle bajtów są czytane fragmentami (None = nigdy)
+    stream_window_size: int = 1024 * 1024  # Rozmiar czytanego bloku (znaki)
+    stream_overlap: int = 4096  # Zakładka między oknami (znaki) - musi być dłuższa niż najdłuższa encja
+    mmap_input: bool = False  # Duże pliki .txt przez mmap - wbudowane wzorce skanowane na bajtach (core.mapped)
+    stream_csv_rows: int = 100_000  # Liczba wierszy w jednym fragmencie dużego pliku CSV
+    
+    # Profilowanie kolumn plików tabelarycznych (core.profile): kolumny bez encji
+    # w próbce są pomijane, a jednorodne sprawdzane tylko wzorcem swojego typu
+    profile_columns: bool = False
+    profile_sample_rows: int = 1000  # Liczba wierszy próbki na kolumnę
+    
     # Raportowanie
     generate_report: bool = True
     report_format: str = "json"  # json, html, txt
@@ -120,8 +158,87 @@ class AnonymizationConfig:
             for e in self.entities
         ]
         
+        # Konwersja planu strategii (np. z pliku JSON) na typy wyliczeniowe
+        self.strategy_plan = {
+            EntityType(entity_type): AnonymizationMethod(method)
+            for entity_type, method in (self.strategy_plan or {}).items()
+        }
+        
         if not 0 <= self.min_confidence <= 1:
             raise ValueError("min_confidence musi być w zakresie 0-1")
         
-        if self.method == AnonymizationMethod.ENCRYPT and not self.encryption_key:
+        if self.detector_executor not in ("thread", "process"):
+            raise ValueError("detector_executor musi mieć wartość 'thread' lub 'process'")
+        
+        if self.hash_algorithm == "hmac-sha256" and not self.hash_key:
+            raise ValueError("hash_algorithm='hmac-sha256' wymaga hash_key")
+        
+        if self.hash_algorithm == "blake2b" and self.hash_key and len(self.hash_key.encode()) > 64:
+            raise ValueError("hash_key dla blake2b może mieć maksymalnie 64 bajty")
+        
+        if self.pseudonym_mode not in ("counter", "hmac"):
+            raise ValueError("pseudonym_mode musi mieć wartość 'counter' lub 'hmac'")
+        
+        if self.pseudonym_mode == "hmac":
+            if self.pseudonym_key is None and self.seed is None:
+                raise ValueError("pseudonym_mode='hmac' wymaga pseudonym_key lub seed")
+            if self.pseudonym_vault:
+                raise ValueError("pseudonym_vault nie jest używany w trybie pseudonym_mode='hmac'")
+        
+        if self.stream_window_size <= 0 or self.stream_overlap < 0:
+            raise ValueError("stream_window_size musi być dodatni, a stream_overlap nieujemny")
+        
+        if self.stream_csv_rows <= 0:
+            raise ValueError("stream_csv_rows musi być dodatni")
+        
+        if self.profile_sample_rows <= 0:
+            raise ValueError("profile_sample_rows musi być dodatni")
+        
+        if self.detection_cache_size < 0:
+            raise ValueError("detection_cache_size nie może być ujemny")
+        
+        methods = {self.method, *self.strategy_plan.values()}
+        if AnonymizationMethod.ENCRYPT in methods and not self.encryption_key:
             raise ValueError("encryption_key jest wymagany dla metody ENCRYPT")
+    
+    def detection_fingerprint(
+        self,
+        use_llm: Optional[bool] = None,
+        llm_model_name: Optional[str] = None,
+        llm_base_url: Optional[str] = None
+    ) -> str:
+        """
+        Zwraca odcisk opcji wpływających na wynik detekcji.
+        
+        Dwie konfiguracje o tym samym odcisku wykrywają w danym tekście
+        te same encje, niezależnie od metody anonimizacji czy raportowania.
+        
+        Args:
+            use_llm: Faktyczne użycie detektora LLM (EntityDetector.use_llm),
+                domyślnie pole konfiguracji.
+            llm_model_name: Model LLM detektora.
+            llm_base_url: URL bazowy API LLM detektora.
+        
+        Returns:
+            Skrót SHA-256 (hex) opcji detekcji.
+        """
+        options = {
+            "language": self.language,
+            # Kolejność typów i wzorców wyznacza priorytet przy nakładaniu się encji
+            "entities": [e.value for e in self.entities],
+            "custom_patterns": list(self.custom_patterns.items()),
+            "exclusions": list(self.exclusions),
+            "case_sensitive": self.case_sensitive,
+            "detect_context": self.detect_context,
+            "min_confidence": self.min_confidence,
+            "use_prefilter": self.use_prefilter,
+            "use_nlp": self.use_nlp,
+            "nlp_model": self.nlp_model,
+            "use_llm": self.use_llm if use_llm is None else use_llm,
+            "llm_model_name": llm_model_name,
+            "llm_base_url": llm_base_url,
+            "llm_chunk_size": self.llm_chunk_size,
+            "llm_chunk_overlap": self.llm_chunk_overlap,
+        }
+        payload = json.dumps(options, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -2,23 +2,84 @@
 Moduł wykrywania encji (PII) w tekście.
 """
 
-from dataclasses import dataclass
-from typing import List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import logging
 
+from dane_bez_twarzy.core.cache import DetectionCache, text_digest
 from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
 
+if TYPE_CHECKING:
+    from dane_bez_twarzy.core.batch import EntityBatch
+
 
-@dataclass
 class Entity:
-    """Reprezentacja wykrytej encji."""
-    
-    text: str
-    type: EntityType
-    start: int
-    end: int
-    confidence: float = 1.0
-    metadata: Optional[dict] = None
+    """
+    Reprezentacja wykrytej encji.
+    
+    Klasa używa __slots__ (bez słownika na instancję), bo na dużych plikach
+    powstają miliony encji. Dla jeszcze zwartszej reprezentacji zobacz
+    core.batch.EntityBatch.
+    """
+    
+    __slots__ = ("text", "type", "start", "end", "confidence", "metadata")
+    
+    def __init__(self, text: str, type: EntityType, start: int, end: int,
+                 confidence: float = 1.0, metadata: Optional[dict] = None):
+        self.text = text
+        self.type = type
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+        self.metadata = metadata
+    
+    def _astuple(self) -> tuple:
+        return (self.text, self.type, self.start, self.end, self.confidence, self.metadata)
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+    
+    # Jak w @dataclass z eq=True - encje są mutowalne, więc nie są haszowalne
+    __hash__ = None  # type: ignore[assignment]
+    
+    def __repr__(self) -> str:
+        return (
+            f"Entity(text={self.text!r}, type={self.type!r}, start={self.start!r}, "
+            f"end={self.end!r}, confidence={self.confidence!r}, metadata={self.metadata!r})"
+        )
+
+
+# Kolejność detektorów - wyniki są zawsze łączone w tej kolejności,
+# niezależnie od tego, który detektor skończy pierwszy
+DETECTOR_ORDER = ("placeholder", "regex", "polish", "nlp", "llm")
+
+# Grupy detektorów cache'owane razem (kolejność zgodna z DETECTOR_ORDER)
+CACHE_GROUPS = {
+    "base": ("placeholder", "regex", "polish"),
+    "nlp": ("nlp",),
+    "llm": ("llm",),
+}
+
+# Detektor używany przez proces roboczy w trybie detector_executor="process"
+_process_detector: Optional["EntityDetector"] = None
+
+
+def _init_process_worker(config: AnonymizationConfig, llm_kwargs: Dict[str, Any]) -> None:
+    """Tworzy detektor w procesie roboczym (modele ładowane raz na proces)."""
+    global _process_detector
+    _process_detector = EntityDetector(
+        replace(config, parallel_detectors=False),
+        **llm_kwargs
+    )
+
+
+def _detect_in_process(name: str, text: str) -> List["Entity"]:
+    """Uruchamia pojedynczy detektor w procesie roboczym."""
+    detector = getattr(_process_detector, f"{name}_detector")
+    return detector.detect(text) if detector else []
 
 
 class EntityDetector:
@@ -55,6 +116,29 @@ class EntityDetector:
         self._polish_detector = None
         self._placeholder_detector = None
         self._llm_detector = None
+        self._exclusion_matcher = None
+        
+        # Pula wątków/procesów dla trybu równoległego (tworzona przy pierwszym użyciu)
+        self._executor: Optional[Executor] = None
+        
+        # Cache wyników detekcji - klucz zawiera odcisk konfiguracji, więc
+        # wpisy nie mieszają się między różnymi ustawieniami detekcji
+        self.detection_cache: Optional[DetectionCache] = None
+        if config.detection_cache_size > 0:
+            self.detection_cache = DetectionCache(
+                max_entries=config.detection_cache_size,
+                max_bytes=config.detection_cache_max_bytes
+            )
+        self._fingerprint = config.detection_fingerprint(
+            use_llm=use_llm,
+            llm_model_name=llm_model_name,
+            llm_base_url=llm_base_url
+        )
+    
+    @property
+    def fingerprint(self) -> str:
+        """Odcisk faktycznych ustawień detekcji (konfiguracja i parametry LLM detektora)."""
+        return self._fingerprint
     
     @property
     def regex_detector(self):
@@ -107,12 +191,14 @@ class EntityDetector:
                 self.logger.warning("LLM detector niedostępny. Zainstaluj langchain-openai.")
         return self._llm_detector
     
-    def detect(self, text: str) -> List[Entity]:
+    def detect(self, text: str, use_cache: bool = True) -> List[Entity]:
         """
         Wykrywa wszystkie encje w tekście.
         
         Args:
             text: Tekst do analizy.
+            use_cache: Korzystaj z cache detekcji (False dla tekstów, które się
+                nie powtórzą, np. okien przetwarzania strumieniowego).
             
         Returns:
             Lista wykrytych encji.
@@ -120,26 +206,22 @@ class EntityDetector:
         if not text:
             return []
         
-        entities = []
-        
-        # Wykrywanie placeholderów (najszybsze, najwyższa pewność)
-        entities.extend(self.placeholder_detector.detect(text))
-        
-        # Wykrywanie przez regex (szybkie)
-        entities.extend(self.regex_detector.detect(text))
-        
-        # Wykrywanie polskich wzorców
-        if self.polish_detector:
-            entities.extend(self.polish_detector.detect(text))
-        
-        # Wykrywanie przez NLP (wolniejsze, ale bardziej precyzyjne)
-        if self.nlp_detector and self.config.use_nlp:
-            entities.extend(self.nlp_detector.detect(text))
+        return self.finalize(self._collect(text, use_cache))
+    
+    def finalize(self, entities: List[Entity]) -> List[Entity]:
+        """
+        Łączy surowe wyniki detektorów w wynik detekcji.
         
-        # Wykrywanie przez LLM (bardzo dokładne, ale kosztowne)
-        if self.llm_detector and self.use_llm:
-            entities.extend(self.llm_detector.detect(text))
+        Usuwa nakładające się encje, stosuje filtry pewności, typów i
+        wykluczeń oraz sortuje wynik po pozycji. Kolejność wejścia ma
+        znaczenie przy remisach - jak w _collect (DETECTOR_ORDER).
         
+        Args:
+            entities: Surowe encje wszystkich detektorów.
+            
+        Returns:
+            Lista wykrytych encji.
+        """
         # Usuń duplikaty i zachowaj te o wyższej pewności
         entities = self._deduplicate_entities(entities)
         
@@ -167,6 +249,218 @@ class EntityDetector:
         
         return entities
     
+    def detect_batch(self, text: str) -> "EntityBatch":
+        """
+        Wykrywa encje i zwraca je w zwartej postaci EntityBatch.
+        
+        Deduplikacja i filtry działają bezpośrednio na tablicach batcha.
+        Wynik jest taki sam jak z detect(), ale zajmuje znacznie mniej
+        pamięci przy dużej liczbie encji.
+        
+        Args:
+            text: Tekst do analizy.
+            
+        Returns:
+            Batch wykrytych encji posortowany po pozycji.
+        """
+        from dane_bez_twarzy.core.batch import TYPE_CODES, EntityBatch
+        
+        if not text:
+            return EntityBatch(text)
+        
+        batch = EntityBatch.from_entities(text, self._collect(text)).resolve_overlaps()
+        
+        min_confidence = self.config.min_confidence
+        allowed = {code for code, t in enumerate(TYPE_CODES) if t in self.config.entities}
+        exclusions = self.config.exclusions
+        
+        return batch.where(
+            lambda i: batch.confidences[i] >= min_confidence
+            and batch.types[i] in allowed
+            and not (exclusions and self._is_excluded(batch.text(i)))
+        )
+    
+    def _collect(self, text: str, use_cache: bool = True) -> List[Entity]:
+        """Zbiera surowe wyniki wszystkich detektorów (w kolejności DETECTOR_ORDER)."""
+        if use_cache and self.detection_cache is not None:
+            return self._run_detectors_cached(text)
+        
+        results = self._dispatch(text, self._active_detector_names())
+        return [e for name in DETECTOR_ORDER for e in results.get(name, [])]
+    
+    def _active_detector_names(self) -> List[str]:
+        """
+        Zwraca nazwy detektorów włączonych w konfiguracji.
+        
+        Kolejność odpowiada DETECTOR_ORDER:
+        - placeholder (najszybszy, najwyższa pewność)
+        - regex (szybki)
+        - polish (polskie wzorce)
+        - nlp (wolniejszy, ale bardziej precyzyjny)
+        - llm (bardzo dokładny, ale kosztowny)
+        """
+        enabled = {
+            "placeholder": True,
+            "regex": True,
+            "polish": self.config.language == "pl",
+            "nlp": self.config.use_nlp,
+            "llm": self.use_llm,
+        }
+        return [name for name in DETECTOR_ORDER if enabled[name]]
+    
+    def _dispatch(self, text: str, names: List[str]) -> Dict[str, List[Entity]]:
+        """Uruchamia wskazane detektory sekwencyjnie lub równolegle (wg konfiguracji)."""
+        if not names:
+            return {}
+        if self.config.parallel_detectors:
+            return self._run_detectors_concurrently(text, names)
+        return self._run_detectors(text, names)
+    
+    def _run_detectors_cached(self, text: str) -> List[Entity]:
+        """
+        Uruchamia detektory, korzystając z cache wyników.
+        
+        Wyniki są zapamiętywane osobno dla grup detektorów z CACHE_GROUPS.
+        Grupa "base" (placeholder, regex, polish) jest cache'owana zawsze,
+        NLP i LLM tylko po włączeniu cache_nlp_results / cache_llm_results.
+        Trafienie zwraca zapamiętane encje bez ponownego uruchamiania detektorów.
+        """
+        cache = self.detection_cache
+        digest = text_digest(text)
+        active = set(self._active_detector_names())
+        
+        cached: Dict[str, List[Entity]] = {}
+        to_run: List[str] = []
+        for group, members in CACHE_GROUPS.items():
+            names = [name for name in members if name in active]
+            if not names:
+                continue
+            
+            hit = None
+            if self._is_cacheable(group):
+                hit = cache.get((self._fingerprint, group, digest))
+            if hit is None:
+                to_run.extend(names)
+            else:
+                cached[group] = hit
+        
+        results = self._dispatch(text, to_run)
+        
+        entities: List[Entity] = []
+        for group, members in CACHE_GROUPS.items():
+            if group in cached:
+                entities.extend(cached[group])
+                continue
+            
+            group_entities = [e for name in members for e in results.get(name, [])]
+            if any(name in active for name in members) and self._is_cacheable(group):
+                cache.put((self._fingerprint, group, digest), group_entities)
+            entities.extend(group_entities)
+        
+        return entities
+    
+    def _is_cacheable(self, group: str) -> bool:
+        """Sprawdza czy wyniki danej grupy detektorów mogą trafić do cache."""
+        if group == "nlp":
+            return self.config.cache_nlp_results
+        if group == "llm":
+            return self.config.cache_llm_results
+        return True
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Zwraca statystyki cache detekcji.
+        
+        Returns:
+            Słownik {hits, misses, evictions, entries, bytes} (pusty gdy cache wyłączony).
+        """
+        if self.detection_cache is None:
+            return {}
+        return self.detection_cache.stats()
+    
+    def _run_detectors(self, text: str, names: List[str]) -> Dict[str, List[Entity]]:
+        """Uruchamia detektory jeden po drugim."""
+        results = {}
+        
+        for name in names:
+            detector = getattr(self, f"{name}_detector")
+            if detector:
+                results[name] = detector.detect(text)
+        
+        return results
+    
+    def _run_detectors_concurrently(self, text: str, names: List[str]) -> Dict[str, List[Entity]]:
+        """
+        Uruchamia detektory równolegle w puli wątków lub procesów.
+        
+        Wyniki są łączone w stałej kolejności detektorów, więc deduplikacja
+        daje ten sam wynik co w trybie sekwencyjnym.
+        """
+        executor = self._get_executor(len(self._active_detector_names()))
+        
+        if self.config.detector_executor == "process":
+            futures = {name: executor.submit(_detect_in_process, name, text) for name in names}
+        else:
+            # Inicjalizuj detektory w bieżącym wątku (lazy loading nie jest thread-safe)
+            detectors = {name: getattr(self, f"{name}_detector") for name in names}
+            futures = {
+                name: executor.submit(detector.detect, text)
+                for name, detector in detectors.items()
+                if detector
+            }
+        
+        return {name: future.result() for name, future in futures.items()}
+    
+    def _get_executor(self, num_detectors: int) -> Executor:
+        """Zwraca (tworząc przy pierwszym użyciu) pulę dla trybu równoległego."""
+        if self._executor is None:
+            workers = self.config.detector_workers or num_detectors
+            
+            if self.config.detector_executor == "process":
+                llm_kwargs = {
+                    "use_llm": self.use_llm,
+                    "llm_api_key": self.llm_api_key,
+                    "llm_base_url": self.llm_base_url,
+                    "llm_model_name": self.llm_model_name,
+                }
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_process_worker,
+                    initargs=(self.config, llm_kwargs)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="detector"
+                )
+            
+            self.logger.debug(
+                f"Utworzono pulę detektorów: {self.config.detector_executor}, "
+                f"workers={workers}"
+            )
+        
+        return self._executor
+    
+    def get_prefilter_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Zwraca statystyki filtra wstępnego dla załadowanych detektorów.
+        
+        Returns:
+            Słownik nazwa detektora -> {texts, scans_run, scans_skipped}.
+        """
+        stats = {}
+        for name in ("placeholder", "regex", "polish"):
+            detector = getattr(self, f"_{name}_detector")
+            if detector is not None:
+                stats[name] = detector.prefilter_stats.as_dict()
+        return stats
+    
+    def close(self) -> None:
+        """Zamyka pulę wątków/procesów trybu równoległego."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
     def _deduplicate_entities(self, entities: List[Entity]) -> List[Entity]:
         """
         Usuwa nakładające się encje, zachowując te o wyższej pewności.
@@ -177,26 +471,20 @@ class EntityDetector:
         Returns:
             Lista unikalnych encji.
         """
-        if not entities:
-            return []
-        
-        # Sortuj po pozycji i pewności
-        entities.sort(key=lambda e: (e.start, -e.confidence))
+        from dane_bez_twarzy.core.spans import resolve_overlaps
         
-        result = []
-        last_end = -1
-        
-        for entity in entities:
-            # Sprawdź czy encja się nie nakłada
-            if entity.start >= last_end:
-                result.append(entity)
-                last_end = entity.end
-            elif entity.confidence > result[-1].confidence:
-                # Zastąp poprzednią encję, jeśli nowa ma wyższą pewność
-                result[-1] = entity
-                last_end = entity.end
-        
-        return result
+        return resolve_overlaps(entities)
+    
+    @property
+    def exclusion_matcher(self):
+        """Lazy loading automatu wykluczeń (budowany raz na konfigurację)."""
+        if self._exclusion_matcher is None:
+            from dane_bez_twarzy.utils.exclusions import ExclusionMatcher
+            self._exclusion_matcher = ExclusionMatcher(
+                self.config.exclusions,
+                case_sensitive=self.config.case_sensitive
+            )
+        return self._exclusion_matcher
     
     def _is_excluded(self, text: str) -> bool:
         """
@@ -211,11 +499,4 @@ class EntityDetector:
         if not self.config.exclusions:
             return False
         
-        text_lower = text.lower() if not self.config.case_sensitive else text
-        
-        for exclusion in self.config.exclusions:
-            exclusion_cmp = exclusion.lower() if not self.config.case_sensitive else exclusion
-            if exclusion_cmp in text_lower or text_lower in exclusion_cmp:
-                return True
-        
-        return False
+        return self.exclusion_matcher.is_excluded(text)
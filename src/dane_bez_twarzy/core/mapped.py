@@ -0,0 +1,186 @@
+"""
+Detekcja encji w tekście UTF-8 bez dekodowania całości (pliki mapowane przez mmap).
+
+Wbudowane wzorce regex są zapisane w ASCII, więc skanują bajty pliku
+bezpośrednio (RegexDetector.detect_bytes). Do str dekodowane są tylko
+trafienia oraz linie potrzebne detektorom, które wymagają tekstu -
+placeholderom (linie z "[") i adresom (linie ze słowami ul., ulica, ...).
+Pozycje bajtowe są zamieniane na znakowe tylko tam, gdzie są potrzebne,
+przez zliczanie bajtów niebędących kontynuacją znaku UTF-8.
+
+Ograniczenia względem detekcji na str:
+- \\d, \\s i \\w w bajtach obejmują tylko ASCII - trafienia przy znakach
+  spoza ASCII są sprawdzane ponownie wzorcami str, ale numery z
+  separatorami spoza ASCII (np. twarda spacja) nie są znajdowane,
+- placeholder lub adres musi kończyć się najpóźniej w linii następnej
+  po tej, w której się zaczyna,
+- bajty poza encjami są kopiowane bez zmian (końce linii "\\r\\n" nie są
+  zamieniane na "\\n", plik nie jest walidowany jako UTF-8).
+"""
+
+from typing import Dict, List, Optional, Tuple
+import re
+
+from dane_bez_twarzy.core.detector import DETECTOR_ORDER, Entity, EntityDetector
+from dane_bez_twarzy.utils.prefilter import ADDRESS_TRIGGER, BRACKET_TRIGGER
+
+# Bajty kontynuacji znaku UTF-8 (10xxxxxx)
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# Detektory pracujące na wycinkach linii i bajty, od których zależą
+# (wyzwalacze FEATURE_BRACKET i FEATURE_ADDRESS z utils.prefilter)
+LINE_TRIGGERS: Dict[str, re.Pattern] = {
+    "placeholder": re.compile(re.escape(BRACKET_TRIGGER).encode("ascii")),
+    "polish": re.compile(ADDRESS_TRIGGER.encode("ascii"), re.IGNORECASE),
+}
+
+
+def char_length(data: bytes, start: int = 0, end: Optional[int] = None) -> int:
+    """
+    Zwraca liczbę znaków UTF-8 w data[start:end] bez dekodowania.
+    
+    Args:
+        data: Tekst w UTF-8.
+        start: Początek (bajty).
+        end: Koniec (bajty, domyślnie koniec danych).
+    
+    Returns:
+        Liczba znaków.
+    """
+    return len(data[start:end].translate(None, CONTINUATION_BYTES))
+
+
+def char_start(data: bytes, pos: int) -> int:
+    """Cofa pozycję bajtową do początku znaku UTF-8, w którym się znajduje."""
+    while 0 < pos < len(data) and 0x80 <= data[pos] < 0xC0:
+        pos -= 1
+    return pos
+
+
+def unsupported_reason(detector: EntityDetector) -> Optional[str]:
+    """
+    Sprawdza czy konfigurację detektora da się obsłużyć na bajtach.
+    
+    Args:
+        detector: Detektor encji.
+    
+    Returns:
+        Powód, dla którego tekst trzeba zdekodować w całości, albo None.
+    """
+    config = detector.config
+    if config.use_nlp or detector.use_llm:
+        return "detektory NLP/LLM wymagają całego tekstu"
+    if config.custom_patterns:
+        return "własne wzorce działają tylko na str"
+    return None
+
+
+class MappedScanner:
+    """
+    Wykrywa encje w oknie tekstu UTF-8 podanym jako bajty.
+    
+    Wynik jest taki, jak EntityDetector.detect na zdekodowanym oknie
+    (z ograniczeniami opisanymi w module), ale z pozycjami bajtowymi.
+    
+    Przykład użycia:
+        >>> scanner = MappedScanner(anonymizer.detector)
+        >>> scanner.detect("tel. 123-456-789".encode("utf-8"))
+        [Entity(text='123-456-789', ..., start=5, end=16, ...)]
+    """
+    
+    def __init__(self, detector: EntityDetector):
+        """
+        Inicjalizacja skanera.
+        
+        Args:
+            detector: Detektor encji (bez NLP, LLM i własnych wzorców -
+                patrz unsupported_reason).
+        
+        Raises:
+            ValueError: Gdy konfiguracja wymaga dekodowania całego tekstu.
+        """
+        reason = unsupported_reason(detector)
+        if reason is not None:
+            raise ValueError(f"Detekcja na bajtach niedostępna: {reason}")
+        
+        self.detector = detector
+        self.line_detectors = []
+        for name, trigger in LINE_TRIGGERS.items():
+            # polish_detector jest None dla języków innych niż polski
+            line_detector = getattr(detector, f"{name}_detector")
+            if line_detector is not None:
+                self.line_detectors.append((name, trigger, line_detector))
+    
+    def detect(self, data: bytes) -> List[Entity]:
+        """
+        Wykrywa encje w tekście zakodowanym w UTF-8.
+        
+        Args:
+            data: Okno tekstu w UTF-8.
+        
+        Returns:
+            Lista encji posortowana po pozycji, z pozycjami bajtowymi.
+        """
+        if not data:
+            return []
+        
+        results = {"regex": self.detector.regex_detector.detect_bytes(data)}
+        for name, trigger, detector in self.line_detectors:
+            results[name] = self._detect_lines(data, trigger, detector)
+        
+        return self.detector.finalize(
+            [e for name in DETECTOR_ORDER for e in results.get(name, [])]
+        )
+    
+    @staticmethod
+    def _detect_lines(data: bytes, trigger: re.Pattern, detector) -> List[Entity]:
+        """Uruchamia detektor tekstowy tylko na liniach z bajtami wyzwalającymi."""
+        entities = []
+        
+        for start, end in _trigger_lines(data, trigger):
+            text = data[start:end].decode("utf-8", errors="surrogateescape")
+            
+            # Encje są w kolejności pozycji - przesunięcia bajtowe liczone narastająco
+            char_pos, byte_pos = 0, start
+            for entity in detector.detect(text):
+                byte_pos += len(text[char_pos:entity.start].encode("utf-8", errors="surrogateescape"))
+                char_pos = entity.start
+                entity.start = byte_pos
+                entity.end = byte_pos + len(entity.text.encode("utf-8", errors="surrogateescape"))
+                entities.append(entity)
+        
+        return entities
+
+
+def _trigger_lines(data: bytes, trigger: re.Pattern) -> List[Tuple[int, int]]:
+    """
+    Zwraca przedziały bajtowe linii z bajtami wyzwalającymi.
+    
+    Każdy przedział to linia z wyzwalaczem i linia po niej (encja może
+    przechodzić przez koniec linii); nakładające się przedziały są łączone.
+    """
+    spans: List[Tuple[int, int]] = []
+    pos = 0
+    
+    while True:
+        match = trigger.search(data, pos)
+        if match is None:
+            break
+        
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        line_end = data.find(b"\n", match.end())
+        if line_end == -1:
+            line_end = len(data)
+        end = data.find(b"\n", line_end + 1)
+        if end == -1:
+            end = len(data)
+        
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+        
+        # Kolejne wyzwalacze w tej samej linii niczego nie zmieniają
+        pos = line_end + 1
+    
+    return spans
@@ -0,0 +1,104 @@
+"""
+Profilowanie kolumn plików tabelarycznych na próbce wierszy.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from dane_bez_twarzy.core.config import EntityType
+from dane_bez_twarzy.core.detector import EntityDetector
+
+# Rodzaje kolumn
+PII_FREE = "pii_free"  # W próbce brak encji - kolumna jest pomijana
+UNIFORM = "uniform"  # Każda wartość to w całości encja jednego typu (wzorzec + walidator)
+FREE_TEXT = "free_text"  # Tekst wymagający pełnej detekcji
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Profil kolumny wyznaczony z próbki wierszy.
+    
+    Kolumny PII_FREE są pomijane w pełnym przebiegu, wartości kolumn
+    UNIFORM są sprawdzane tylko wzorcem i walidatorem swojego typu
+    (wartości, które do niego nie pasują, przechodzą pełną detekcję),
+    a kolumny FREE_TEXT przechodzą pełną detekcję.
+    
+    Profil opiera się na próbce - encje w wierszach spoza próbki kolumny
+    PII_FREE nie zostaną wykryte.
+    """
+    
+    column: str
+    kind: str
+    
+    # Niepuste wartości w próbce i liczba tych, w których wykryto encje
+    sampled: int = 0
+    with_entities: int = 0
+    
+    # Typ wartości kolumny UNIFORM
+    entity_type: Optional[EntityType] = None
+    
+    # Liczby encji w próbce wg typu
+    entity_counts: Dict[str, int] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwraca profil w formacie raportu."""
+        return {
+            "column": self.column,
+            "kind": self.kind,
+            "sampled": self.sampled,
+            "with_entities": self.with_entities,
+            "entity_type": self.entity_type.value if self.entity_type else None,
+            "entity_counts": self.entity_counts,
+        }
+
+
+def profile_column(column: str, values: Iterable[str], detector: EntityDetector) -> ColumnProfile:
+    """
+    Klasyfikuje kolumnę na podstawie encji wykrytych w próbce jej wartości.
+    
+    Kolumna jest UNIFORM, gdy w każdej wartości próbki detektor regex
+    znalazł dokładnie jedną encję pokrywającą całą wartość i wszystkie
+    te encje mają ten sam typ.
+    
+    Args:
+        column: Nazwa kolumny.
+        values: Niepuste wartości z próbki wierszy.
+        detector: Detektor encji.
+    
+    Returns:
+        Profil kolumny.
+    """
+    profile = ColumnProfile(column=str(column), kind=PII_FREE)
+    whole_types = set()
+    uniform = True
+    
+    for value in values:
+        entities = detector.detect(value)
+        profile.sampled += 1
+        if not entities:
+            uniform = False
+            continue
+        
+        profile.with_entities += 1
+        for entity in entities:
+            profile.entity_counts[entity.type.value] = profile.entity_counts.get(entity.type.value, 0) + 1
+        
+        if uniform:
+            entity = entities[0]
+            uniform = (
+                len(entities) == 1
+                and entity.start == 0
+                and entity.end == len(value)
+                and (entity.metadata or {}).get("detector") == "regex"
+            )
+            whole_types.add(entity.type)
+    
+    if profile.with_entities:
+        if uniform and len(whole_types) == 1:
+            profile.kind = UNIFORM
+            profile.entity_type = whole_types.pop()
+        else:
+            profile.kind = FREE_TEXT
+    
+    return profile
@@ -0,0 +1,134 @@
+"""
+Wynik anonimizacji razem z wykrytymi encjami.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from dane_bez_twarzy.core.detector import Entity
+from dane_bez_twarzy.core.spans import LineIndex
+
+if TYPE_CHECKING:
+    from dane_bez_twarzy.core.profile import ColumnProfile
+
+
+@dataclass
+class AnonymizationResult:
+    """
+    Wynik anonimizacji tekstu lub pliku.
+    
+    Przechowuje encje wykryte podczas anonimizacji, więc raport można
+    zbudować bez ponownego czytania pliku i bez ponownej detekcji
+    (Anonymizer.report_from_result). Processory anonimizują pliki
+    fragmentami (akapity, komórki, strony) - każdy fragment to osobny
+    segment, a pozycje encji są liczone względem jego segmentu. Tekst
+    przetwarzany strumieniowo to jeden segment składany z kolejnych okien,
+    z pozycjami globalnymi.
+    
+    Sam tekst nie jest przechowywany - przy dodawaniu fragmentu zapisywane
+    są tylko encje, ich linie i kolumny oraz liczby znaków i linii.
+    
+    Przykład użycia:
+        >>> result = anonymizer.anonymize_file("akta.txt", return_result=True)
+        >>> result.output_path, len(result.entities)
+        (PosixPath('akta_anonimizowany.txt'), 12)
+    """
+    
+    # Zanonimizowany tekst (anonymize_text)
+    text: Optional[str] = None
+    
+    # Pliki wejściowy i wynikowy (anonymize_file)
+    input_path: Optional[Path] = None
+    output_path: Optional[Path] = None
+    
+    # Encje (pozycje względem segmentu) i ich położenie: (segment, linia, kolumna)
+    entities: List[Entity] = field(default_factory=list)
+    positions: List[Tuple[int, int, int]] = field(default_factory=list)
+    
+    # Statystyki przetworzonego tekstu
+    segment_count: int = 0
+    character_count: int = 0
+    line_count: int = 0
+    
+    # Profile kolumn plików tabelarycznych (config.profile_columns)
+    column_profiles: List["ColumnProfile"] = field(default_factory=list)
+    
+    # Stan bieżącego segmentu: pełne linie i znaki od ostatniego "\n"
+    _lines: int = field(default=0, init=False, repr=False)
+    _column: int = field(default=0, init=False, repr=False)
+    
+    def add(self, text: str, entities: List[Entity], offset: int = 0) -> None:
+        """
+        Dodaje fragment tekstu z wykrytymi encjami.
+        
+        Args:
+            text: Fragment źródłowy.
+            entities: Encje z pozycjami względem fragmentu.
+            offset: Pozycja fragmentu w segmencie - 0 rozpoczyna nowy
+                segment, wartość dodatnia kontynuuje bieżący (kolejne okno
+                przetwarzania strumieniowego).
+        """
+        if not text:
+            return
+        
+        if offset == 0:
+            self.segment_count += 1
+            self.line_count += 1
+            self._lines = self._column = 0
+        
+        segment = self.segment_count - 1
+        line_index = LineIndex(text)
+        
+        for entity in entities:
+            line, column = line_index.position(entity.start)
+            if line == 1:
+                column += self._column
+            
+            if offset:
+                entity = Entity(
+                    text=entity.text,
+                    type=entity.type,
+                    start=entity.start + offset,
+                    end=entity.end + offset,
+                    confidence=entity.confidence,
+                    metadata=entity.metadata
+                )
+            self.entities.append(entity)
+            self.positions.append((segment, self._lines + line, column))
+        
+        newlines = line_index.line_count - 1
+        self.character_count += len(text)
+        self.line_count += newlines
+        self._lines += newlines
+        if newlines:
+            self._column = len(text) - line_index.starts[-1]
+        else:
+            self._column += len(text)
+    
+    def entity_records(self) -> List[Dict[str, Any]]:
+        """
+        Zwraca encje w formacie raportu (jak Anonymizer.detect_entities).
+        
+        Returns:
+            Lista słowników z tekstem, typem, pozycją, linią i kolumną;
+            przy wielu segmentach także numerem segmentu.
+        """
+        numbered = self.segment_count > 1
+        records = []
+        
+        for entity, (segment, line, column) in zip(self.entities, self.positions):
+            record = {
+                "text": entity.text,
+                "type": entity.type.value,
+                "start": entity.start,
+                "end": entity.end,
+                "line": line,
+                "column": column,
+                "confidence": entity.confidence
+            }
+            if numbered:
+                record["segment"] = segment
+            records.append(record)
+        
+        return records
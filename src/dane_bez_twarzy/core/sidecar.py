@@ -0,0 +1,238 @@
+"""
+Zapis wykrytych encji do pliku towarzyszącego (wykryj raz, renderuj wielokrotnie).
+"""
+
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import json
+import os
+
+from dane_bez_twarzy.core.cache import text_digest
+from dane_bez_twarzy.core.config import EntityType
+from dane_bez_twarzy.core.detector import Entity
+
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Zwraca skrót SHA-256 zawartości pliku (czytanej blokami).
+    
+    Args:
+        path: Ścieżka do pliku.
+        chunk_size: Rozmiar bloku odczytu.
+    
+    Returns:
+        Skrót hex.
+    """
+    digest = sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DetectionSidecar:
+    """
+    Wykryte encje jednego pliku źródłowego.
+    
+    Processory anonimizują plik fragmentami (akapity, komórki, strony),
+    więc encje są zapisywane per fragment, pod skrótem jego treści.
+    Każda encja to wiersz [start, end, typ, pewność, detektor, metadane],
+    gdzie typ, detektor i metadane są indeksami w tablicach internowania.
+    Identyczne fragmenty (np. powtarzające się komórki) są zapisywane raz.
+    
+    Przykład użycia:
+        >>> sidecar = DetectionSidecar(file_sha256("akta.docx"))
+        >>> sidecar.record(text, entities)
+        >>> sidecar.save("akta.detections.json")
+        >>> DetectionSidecar.load("akta.detections.json").entities_for(text)
+        [Entity(...), ...]
+    """
+    
+    FORMAT = "dane_bez_twarzy.detections"
+    VERSION = 1
+    
+    def __init__(self, source_hash: str, fingerprint: Optional[str] = None):
+        """
+        Inicjalizacja pustego zapisu.
+        
+        Args:
+            source_hash: Skrót SHA-256 pliku źródłowego.
+            fingerprint: Odcisk ustawień detekcji (EntityDetector.fingerprint) -
+                część klucza zapisu w DetectionStore.
+        """
+        self.source_hash = source_hash
+        self.fingerprint = fingerprint
+        self.segments: Dict[str, List[list]] = {}
+        
+        self._types: List[str] = []
+        self._detectors: List[Optional[str]] = []
+        self._metadata: List[Optional[dict]] = []
+        self._indexes: Dict[str, Dict] = {"types": {}, "detectors": {}, "metadata": {}}
+    
+    def __len__(self) -> int:
+        return len(self.segments)
+    
+    def _intern(self, table: List, name: str, value, key=None) -> int:
+        """Zwraca indeks wartości w tablicy internowania (dodając ją w razie potrzeby)."""
+        index = self._indexes[name]
+        key = value if key is None else key
+        code = index.get(key)
+        if code is None:
+            code = len(table)
+            table.append(value)
+            index[key] = code
+        return code
+    
+    def record(self, text: str, entities: List[Entity]) -> None:
+        """
+        Zapisuje encje wykryte w fragmencie tekstu.
+        
+        Args:
+            text: Fragment przekazany do detekcji.
+            entities: Encje wykryte w fragmencie.
+        """
+        rows = []
+        for entity in entities:
+            detector = entity.metadata.get("detector") if entity.metadata else None
+            metadata_key = json.dumps(entity.metadata, sort_keys=True, default=str)
+            rows.append([
+                entity.start,
+                entity.end,
+                self._intern(self._types, "types", entity.type.value),
+                entity.confidence,
+                self._intern(self._detectors, "detectors", detector),
+                self._intern(self._metadata, "metadata", entity.metadata, metadata_key),
+            ])
+        self.segments[text_digest(text).hex()] = rows
+    
+    def entities_for(self, text: str) -> Optional[List[Entity]]:
+        """
+        Odtwarza encje fragmentu bez ponownej detekcji.
+        
+        Args:
+            text: Fragment tekstu (ten sam, który został zapisany).
+        
+        Returns:
+            Lista encji albo None, jeśli fragmentu nie ma w zapisie.
+        """
+        rows = self.segments.get(text_digest(text).hex())
+        if rows is None:
+            return None
+        
+        return [
+            Entity(
+                text=text[start:end],
+                type=EntityType(self._types[type_id]),
+                start=start,
+                end=end,
+                confidence=confidence,
+                metadata=self._metadata[metadata_id]
+            )
+            for start, end, type_id, confidence, _, metadata_id in rows
+        ]
+    
+    def save(self, path: Union[str, Path]) -> Path:
+        """
+        Zapisuje encje do pliku JSON (bez wcięć).
+        
+        Args:
+            path: Ścieżka pliku.
+        
+        Returns:
+            Ścieżka zapisanego pliku.
+        """
+        path = Path(path)
+        payload = {
+            "format": self.FORMAT,
+            "version": self.VERSION,
+            "source_sha256": self.source_hash,
+            "fingerprint": self.fingerprint,
+            "types": self._types,
+            "detectors": self._detectors,
+            "metadata": self._metadata,
+            "segments": self.segments,
+        }
+        # Zapis przez plik tymczasowy - równoległe procesy nie widzą połowy pliku
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str),
+            encoding="utf-8"
+        )
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DetectionSidecar":
+        """
+        Wczytuje encje zapisane przez save().
+        
+        Args:
+            path: Ścieżka pliku.
+        
+        Returns:
+            Odtworzony zapis.
+        """
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("format") != cls.FORMAT or payload.get("version") != cls.VERSION:
+            raise ValueError(f"Nieobsługiwany plik detekcji: {path}")
+        
+        sidecar = cls(payload["source_sha256"], payload.get("fingerprint"))
+        sidecar._types = payload["types"]
+        sidecar._detectors = payload["detectors"]
+        sidecar._metadata = payload["metadata"]
+        sidecar.segments = payload["segments"]
+        sidecar._indexes = {
+            "types": {value: i for i, value in enumerate(sidecar._types)},
+            "detectors": {value: i for i, value in enumerate(sidecar._detectors)},
+            "metadata": {
+                json.dumps(value, sort_keys=True, default=str): i
+                for i, value in enumerate(sidecar._metadata)
+            },
+        }
+        return sidecar
+
+
+class DetectionStore:
+    """
+    Katalog plików detekcji adresowanych skrótem treści pliku źródłowego
+    i odciskiem konfiguracji detekcji.
+    
+    Ten sam plik (niezależnie od nazwy i położenia) ma zawsze ten sam
+    zapis, więc kolejne przebiegi z innymi metodami anonimizacji
+    pomijają detekcję. Zmiana opcji detekcji (typy encji, wykluczenia,
+    własne wzorce, detektory) zmienia odcisk - plik jest wtedy wykrywany
+    od nowa, a nie renderowany z nieaktualnych encji.
+    """
+    
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Inicjalizacja magazynu.
+        
+        Args:
+            directory: Katalog na pliki detekcji (tworzony w razie potrzeby).
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def path_for(self, source_hash: str, fingerprint: str) -> Path:
+        """Zwraca ścieżkę zapisu dla skrótu pliku źródłowego i odcisku konfiguracji."""
+        return self.directory / f"{source_hash}.{fingerprint[:16]}.detections.json"
+    
+    def load(self, source_hash: str, fingerprint: str) -> Optional[DetectionSidecar]:
+        """Zwraca zapis dla skrótu pliku i odcisku konfiguracji lub None."""
+        path = self.path_for(source_hash, fingerprint)
+        if not path.exists():
+            return None
+        
+        sidecar = DetectionSidecar.load(path)
+        # Nazwa pliku zawiera tylko prefiks odcisku - pełny odcisk musi się zgadzać
+        if sidecar.fingerprint != fingerprint:
+            return None
+        return sidecar
+    
+    def save(self, sidecar: DetectionSidecar) -> Path:
+        """Zapisuje zapis pod skrótem jego pliku źródłowego i odciskiem konfiguracji."""
+        if not sidecar.fingerprint:
+            raise ValueError("Zapis detekcji bez odcisku konfiguracji nie może trafić do magazynu")
+        return sidecar.save(self.path_for(sidecar.source_hash, sidecar.fingerprint))
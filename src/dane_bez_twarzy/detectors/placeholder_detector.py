@@ -3,12 +3,110 @@ Detektor placeholderów w formacie [name], [email], [phone] itp.
 Używany do wykrywania i anonimizacji szablonów dokumentów.
 """
 
-from typing import List
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
 import re
 import logging
 
 from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
 from dane_bez_twarzy.core.detector import Entity
+from dane_bez_twarzy.utils.prefilter import FEATURE_BRACKET, PrefilterStats, compute_features
+
+
+# Mapowanie placeholderów na typy encji
+PLACEHOLDER_MAPPING: Dict[str, EntityType] = {
+    # Dane osobowe
+    r'\[name\]': EntityType.PERSON,
+    r'\[surname\]': EntityType.PERSON,
+    r'\[first[\s_-]?name\]': EntityType.PERSON,
+    r'\[last[\s_-]?name\]': EntityType.PERSON,
+    r'\[full[\s_-]?name\]': EntityType.PERSON,
+    
+    # Kontakt
+    r'\[email\]': EntityType.EMAIL,
+    r'\[e[\s_-]?mail\]': EntityType.EMAIL,
+    r'\[phone\]': EntityType.PHONE,
+    r'\[telephone\]': EntityType.PHONE,
+    r'\[tel\]': EntityType.PHONE,
+    r'\[mobile\]': EntityType.PHONE,
+    r'\[address\]': EntityType.ADDRESS,
+    r'\[city\]': EntityType.LOCATION,
+    r'\[street\]': EntityType.ADDRESS,
+    
+    # Identyfikatory
+    r'\[pesel\]': EntityType.PESEL,
+    r'\[nip\]': EntityType.NIP,
+    r'\[regon\]': EntityType.REGON,
+    r'\[document[\s_-]?number\]': EntityType.ID_CARD,
+    r'\[passport\]': EntityType.PASSPORT,
+    r'\[id[\s_-]?card\]': EntityType.ID_CARD,
+    
+    # Finansowe
+    r'\[bank[\s_-]?account\]': EntityType.BANK_ACCOUNT,
+    r'\[credit[\s_-]?card\]': EntityType.CREDIT_CARD,
+    r'\[credit[\s_-]?card[\s_-]?number\]': EntityType.CREDIT_CARD,
+    r'\[iban\]': EntityType.BANK_ACCOUNT,
+    
+    # Daty
+    r'\[date\]': EntityType.DATE,
+    r'\[birth[\s_-]?date\]': EntityType.DATE_OF_BIRTH,
+    r'\[date[\s_-]?of[\s_-]?birth\]': EntityType.DATE_OF_BIRTH,
+    r'\[dob\]': EntityType.DATE_OF_BIRTH,
+    
+    # Inne
+    r'\[age\]': EntityType.AGE,
+    r'\[sex\]': EntityType.SEX,
+    r'\[gender\]': EntityType.SEX,
+    r'\[username\]': EntityType.USERNAME,
+    r'\[login\]': EntityType.USERNAME,
+    r'\[password\]': EntityType.SECRET,
+    r'\[secret\]': EntityType.SECRET,
+    r'\[company\]': EntityType.ORGANIZATION,
+    r'\[organization\]': EntityType.ORGANIZATION,
+    r'\[job[\s_-]?title\]': EntityType.JOB_TITLE,
+    r'\[license[\s_-]?plate\]': EntityType.LICENSE_PLATE,
+    r'\[vehicle[\s_-]?registration\]': EntityType.LICENSE_PLATE,
+}
+
+
+@lru_cache(maxsize=32)
+def _compile_placeholder_matcher(
+    enabled_types: FrozenSet[EntityType]
+) -> Tuple[Optional[re.Pattern], Dict[int, Tuple[str, EntityType]]]:
+    """
+    Kompiluje jedno wyrażenie dopasowujące wszystkie aktywne placeholdery.
+    
+    Wspólny prefiks "[" i sufiks "]" są wyciągnięte przed alternatywę, więc
+    silnik regex przeskakuje od nawiasu do nawiasu, a typ encji odczytywany
+    jest z numeru dopasowanej grupy. Wynik jest współdzielony przez detektory
+    o tym samym zestawie typów encji.
+    
+    Args:
+        enabled_types: Typy encji włączone w konfiguracji.
+        
+    Returns:
+        Tuple (wyrażenie lub None, mapowanie numer grupy -> (wzorzec, typ)).
+    """
+    active = [
+        (pattern, entity_type)
+        for pattern, entity_type in PLACEHOLDER_MAPPING.items()
+        if entity_type in enabled_types
+    ]
+    if not active:
+        return None, {}
+    
+    # Wzorce mają postać \[...\] - zostaw tylko wnętrze nawiasów
+    inner = [
+        f"(?P<p{i}>{pattern[2:-2]})"
+        for i, (pattern, _) in enumerate(active)
+    ]
+    regex = re.compile(r'\[(?:' + '|'.join(inner) + r')\]', re.IGNORECASE)
+    
+    group_to_pattern = {
+        regex.groupindex[f"p{i}"]: placeholder
+        for i, placeholder in enumerate(active)
+    }
+    return regex, group_to_pattern
 
 
 class PlaceholderDetector:
@@ -28,59 +126,12 @@ class PlaceholderDetector:
         self.logger = logging.getLogger(__name__)
         
         # Mapowanie placeholderów na typy encji
-        self.placeholder_mapping = {
-            # Dane osobowe
-            r'\[name\]': EntityType.PERSON,
-            r'\[surname\]': EntityType.PERSON,
-            r'\[first[\s_-]?name\]': EntityType.PERSON,
-            r'\[last[\s_-]?name\]': EntityType.PERSON,
-            r'\[full[\s_-]?name\]': EntityType.PERSON,
-            
-            # Kontakt
-            r'\[email\]': EntityType.EMAIL,
-            r'\[e[\s_-]?mail\]': EntityType.EMAIL,
-            r'\[phone\]': EntityType.PHONE,
-            r'\[telephone\]': EntityType.PHONE,
-            r'\[tel\]': EntityType.PHONE,
-            r'\[mobile\]': EntityType.PHONE,
-            r'\[address\]': EntityType.ADDRESS,
-            r'\[city\]': EntityType.LOCATION,
-            r'\[street\]': EntityType.ADDRESS,
-            
-            # Identyfikatory
-            r'\[pesel\]': EntityType.PESEL,
-            r'\[nip\]': EntityType.NIP,
-            r'\[regon\]': EntityType.REGON,
-            r'\[document[\s_-]?number\]': EntityType.ID_CARD,
-            r'\[passport\]': EntityType.PASSPORT,
-            r'\[id[\s_-]?card\]': EntityType.ID_CARD,
-            
-            # Finansowe
-            r'\[bank[\s_-]?account\]': EntityType.BANK_ACCOUNT,
-            r'\[credit[\s_-]?card\]': EntityType.CREDIT_CARD,
-            r'\[credit[\s_-]?card[\s_-]?number\]': EntityType.CREDIT_CARD,
-            r'\[iban\]': EntityType.BANK_ACCOUNT,
-            
-            # Daty
-            r'\[date\]': EntityType.DATE,
-            r'\[birth[\s_-]?date\]': EntityType.DATE_OF_BIRTH,
-            r'\[date[\s_-]?of[\s_-]?birth\]': EntityType.DATE_OF_BIRTH,
-            r'\[dob\]': EntityType.DATE_OF_BIRTH,
-            
-            # Inne
-            r'\[age\]': EntityType.AGE,
-            r'\[sex\]': EntityType.SEX,
-            r'\[gender\]': EntityType.SEX,
-            r'\[username\]': EntityType.USERNAME,
-            r'\[login\]': EntityType.USERNAME,
-            r'\[password\]': EntityType.SECRET,
-            r'\[secret\]': EntityType.SECRET,
-            r'\[company\]': EntityType.ORGANIZATION,
-            r'\[organization\]': EntityType.ORGANIZATION,
-            r'\[job[\s_-]?title\]': EntityType.JOB_TITLE,
-            r'\[license[\s_-]?plate\]': EntityType.LICENSE_PLATE,
-            r'\[vehicle[\s_-]?registration\]': EntityType.LICENSE_PLATE,
-        }
+        self.placeholder_mapping = PLACEHOLDER_MAPPING
+        
+        # Dopasowanie wszystkich aktywnych placeholderów jednym wyrażeniem
+        enabled_types = frozenset(self.config.entities)
+        self._regex, self._group_to_pattern = _compile_placeholder_matcher(enabled_types)
+        self.prefilter_stats = PrefilterStats()
     
     def detect(self, text: str) -> List[Entity]:
         """
@@ -94,33 +145,36 @@ class PlaceholderDetector:
         """
         entities = []
         
-        for pattern, entity_type in self.placeholder_mapping.items():
-            # Sprawdź czy ten typ encji jest w konfiguracji
-            if entity_type not in self.config.entities:
-                continue
+        if self._regex is None:
+            return entities
+        
+        # Bez "[" w tekście nie ma placeholderów
+        if self.config.use_prefilter:
+            if not compute_features(text, FEATURE_BRACKET):
+                self.prefilter_stats.record(run=0, skipped=1)
+                return entities
+            self.prefilter_stats.record(run=1, skipped=0)
+        
+        for match in self._regex.finditer(text):
+            pattern, entity_type = self._group_to_pattern[match.lastindex]
             
-            # Kompiluj pattern z flagą case-insensitive
-            regex = re.compile(pattern, re.IGNORECASE)
+            entity = Entity(
+                text=match.group(),
+                type=entity_type,
+                start=match.start(),
+                end=match.end(),
+                confidence=1.0,  # Placeholdery są zawsze pewne
+                metadata={
+                    "detector": "placeholder",
+                    "pattern": pattern,
+                    "placeholder_name": match.group()  # Zachowaj oryginalną nazwę
+                }
+            )
+            entities.append(entity)
             
-            # Szukaj wszystkich wystąpień
-            for match in regex.finditer(text):
-                entity = Entity(
-                    text=match.group(),
-                    type=entity_type,
-                    start=match.start(),
-                    end=match.end(),
-                    confidence=1.0,  # Placeholdery są zawsze pewne
-                    metadata={
-                        "detector": "placeholder",
-                        "pattern": pattern,
-                        "placeholder_name": match.group()  # Zachowaj oryginalną nazwę
-                    }
-                )
-                entities.append(entity)
-                
-                self.logger.debug(
-                    f"Znaleziono placeholder: '{match.group()}' "
-                    f"jako {entity_type.value}"
-                )
+            self.logger.debug(
+                f"Znaleziono placeholder: '{match.group()}' "
+                f"jako {entity_type.value}"
+            )
         
         return entities
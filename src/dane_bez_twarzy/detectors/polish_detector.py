@@ -7,6 +7,7 @@ import logging
 
 from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
 from dane_bez_twarzy.core.detector import Entity
+from dane_bez_twarzy.utils.prefilter import FEATURE_ADDRESS, PrefilterStats, compute_features
 
 
 class PolishDetector:
@@ -34,6 +35,8 @@ class PolishDetector:
             EntityType.EMAIL: ["email", "e-mail", "mail", "adres email"],
             EntityType.ADDRESS: ["ul.", "ulica", "os.", "osiedle", "al.", "aleja", "pla("],
         }
+        
+        self.prefilter_stats = PrefilterStats()
     
     def detect(self, text: str) -> List[Entity]:
         """
@@ -52,7 +55,13 @@ class PolishDetector:
         
         # Przykład: wykrywanie adresów po słowach kluczowych
         if EntityType.ADDRESS in self.config.entities:
-            entities.extend(self._detect_addresses(text))
+            # Bez słów kluczowych (ul., ulica, ...) wzorzec adresu nie może pasować
+            if self.config.use_prefilter and not compute_features(text, FEATURE_ADDRESS):
+                self.prefilter_stats.record(run=0, skipped=1)
+            else:
+                if self.config.use_prefilter:
+                    self.prefilter_stats.record(run=1, skipped=0)
+                entities.extend(self._detect_addresses(text))
         
         return entities
     
@@ -2,21 +2,34 @@
 Detektor używający wyrażeń regularnych.
 """
 
-import re
-from typing import List
+from typing import Dict, List, Optional
 import logging
 
 from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
 from dane_bez_twarzy.core.detector import Entity
 from dane_bez_twarzy.utils.patterns import (
-    get_patterns_for_entity_type,
+    get_pattern_set,
+    PatternMatch,
+    PatternSet,
     ValidationPatterns
 )
+from dane_bez_twarzy.utils.prefilter import PrefilterStats, compute_features
 
 
 class RegexDetector:
     """Wykrywa encje używając wyrażeń regularnych."""
     
+    # Typy walidowane checksumą (patrz ValidationPatterns.validate_batch)
+    BATCH_VALIDATED_TYPES = frozenset({
+        EntityType.PESEL,
+        EntityType.NIP,
+        EntityType.REGON,
+        EntityType.CREDIT_CARD,
+    })
+    
+    # Ile bajtów za trafieniem dekodować przy ponownym sprawdzeniu (_confirm)
+    CONFIRM_SPAN = 4096
+    
     def __init__(self, config: AnonymizationConfig):
         """
         Inicjalizacja detektora regex.
@@ -27,6 +40,20 @@ class RegexDetector:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.validators = ValidationPatterns()
+        
+        # Wszystkie aktywne wzorce (wbudowane + własne) skanowane jednym przebiegiem,
+        # kompilowane raz na konfigurację i współdzielone w procesie
+        self.pattern_set = get_pattern_set(
+            self.config.entities,
+            self.config.custom_patterns
+        )
+        self.prefilter_stats = PrefilterStats()
+        
+        # Wersja bajtowa zestawu (detect_bytes), kompilowana przy pierwszym użyciu
+        self._byte_pattern_set: Optional[PatternSet] = None
+        
+        # Metadane współdzielone przez wszystkie encje danego wzorca
+        self._pattern_metadata: Dict[str, dict] = {}
     
     def detect(self, text: str) -> List[Entity]:
         """
@@ -40,37 +67,170 @@ class RegexDetector:
         """
         entities = []
         
-        for entity_type in self.config.entities:
-            # Pobierz wzorce dla typu encji
-            patterns = get_patterns_for_entity_type(entity_type.value)
+        pattern_set = self.pattern_set
+        if self.config.use_prefilter:
+            # Pomiń rodziny wzorców, którym brakuje cech tekstu (np. "@" dla emaili)
+            features = compute_features(text, pattern_set.required_features)
+            pattern_set = pattern_set.for_features(features)
+            self.prefilter_stats.record(
+                run=len(pattern_set),
+                skipped=len(self.pattern_set) - len(pattern_set)
+            )
+            if not pattern_set:
+                return entities
+        
+        for match in pattern_set.scan(text, self._validate, self._validate_batch):
+            entity = Entity(
+                text=match.text,
+                type=match.entry.entity_type,
+                start=match.start,
+                end=match.end,
+                confidence=1.0,
+                metadata=self._metadata_for(match.entry.name)
+            )
+            entities.append(entity)
+        
+        return entities
+    
+    def match_whole(self, text: str) -> Optional[Entity]:
+        """
+        Rozpoznaje tekst, który w całości jest jedną encją (np. komórka z PESEL).
+        
+        Sprawdza tylko dopasowanie od początku tekstu (z walidacją) - bez
+        skanowania całego tekstu.
+        
+        Args:
+            text: Tekst do sprawdzenia.
             
-            # Dodaj własne wzorce użytkownika
-            if entity_type.value in self.config.custom_patterns:
-                patterns[f"custom_{entity_type.value}"] = re.compile(
-                    self.config.custom_patterns[entity_type.value]
-                )
+        Returns:
+            Encja pokrywająca cały tekst albo None.
+        """
+        match = self.pattern_set.match_at(text, 0, self._validate)
+        if match is None or match.end != len(text):
+            return None
+        
+        return Entity(
+            text=match.text,
+            type=match.entry.entity_type,
+            start=0,
+            end=match.end,
+            confidence=1.0,
+            metadata=self._metadata_for(match.entry.name)
+        )
+    
+    def detect_bytes(self, data: bytes) -> List[Entity]:
+        """
+        Wykrywa encje bezpośrednio w tekście zakodowanym w UTF-8.
+        
+        Wzorce skanują bajty (PatternSet.to_bytes), więc tekst nie jest
+        dekodowany - do str zamieniane są tylko trafienia (zawsze ASCII).
+        Trafienie sąsiadujące z bajtem spoza ASCII jest sprawdzane ponownie
+        wzorcami str na zdekodowanym otoczeniu, bo \\b, \\d i \\s
+        mają tam inne znaczenie niż w bajtach.
+        
+        Args:
+            data: Tekst w UTF-8 (bytes lub wycinek pliku zmapowanego).
+            
+        Returns:
+            Lista encji z pozycjami bajtowymi.
+        """
+        if self._byte_pattern_set is None:
+            self._byte_pattern_set = self.pattern_set.to_bytes()
+        
+        def validate(entity_type: EntityType, text: bytes) -> bool:
+            return self._validate(entity_type, text.decode("ascii"))
+        
+        def validate_batch(matches: List[PatternMatch]) -> List[bool]:
+            return self._validate_batch([m._replace(text=m.text.decode("ascii")) for m in matches])
+        
+        entities = []
+        size = len(data)
+        
+        for match in self._byte_pattern_set.scan(data, validate, validate_batch):
+            if (match.start and data[match.start - 1] >= 0x80) or (
+                match.end < size and data[match.end] >= 0x80
+            ):
+                match = self._confirm(data, match)
+                if match is None:
+                    continue
+            else:
+                match = match._replace(text=match.text.decode("ascii"))
             
-            # Szukaj dopasowań
-            for pattern_name, pattern in patterns.items():
-                for match in pattern.finditer(text):
-                    matched_text = match.group(0)
-                    
-                    # Walidacja (jeśli dostępna)
-                    if not self._validate(entity_type, matched_text):
-                        continue
-                    
-                    entity = Entity(
-                        text=matched_text,
-                        type=entity_type,
-                        start=match.start(),
-                        end=match.end(),
-                        confidence=1.0,
-                        metadata={"detector": "regex", "pattern": pattern_name}
-                    )
-                    entities.append(entity)
+            entities.append(Entity(
+                text=match.text,
+                type=match.entry.entity_type,
+                start=match.start,
+                end=match.end,
+                confidence=1.0,
+                metadata=self._metadata_for(match.entry.name)
+            ))
         
         return entities
     
+    def _confirm(self, data: bytes, match: PatternMatch) -> Optional[PatternMatch]:
+        """
+        Powtarza dopasowanie bajtowe wzorcami str w zdekodowanym otoczeniu.
+        
+        Returns:
+            Dopasowanie z pozycjami bajtowymi i tekstem str albo None, gdy
+            w semantyce str w tej pozycji nic nie pasuje.
+        """
+        # Jeden znak przed trafieniem (dla \b) i reszta linii za nim
+        left = max(match.start - 1, 0)
+        while left and 0x80 <= data[left] < 0xC0:
+            left -= 1
+        right = data.find(b"\n", match.end, match.end + self.CONFIRM_SPAN)
+        if right == -1:
+            right = min(len(data), match.end + self.CONFIRM_SPAN)
+        
+        surrounding = data[left:right].decode("utf-8", errors="surrogateescape")
+        pos = len(data[left:match.start].decode("utf-8", errors="surrogateescape"))
+        found = self.pattern_set.match_at(surrounding, pos, self._validate)
+        if found is None:
+            return None
+        
+        end = match.start + len(surrounding[pos:found.end].encode("utf-8", errors="surrogateescape"))
+        return PatternMatch(found.entry, match.start, end, found.text)
+    
+    def _metadata_for(self, pattern_name: str) -> dict:
+        """Zwraca metadane wzorca - jeden słownik współdzielony przez jego encje."""
+        metadata = self._pattern_metadata.get(pattern_name)
+        if metadata is None:
+            metadata = {"detector": "regex", "pattern": pattern_name}
+            self._pattern_metadata[pattern_name] = metadata
+        return metadata
+    
+    def _validate_batch(self, matches: List[PatternMatch]) -> List[bool]:
+        """
+        Waliduje wszystkie dopasowania naraz (checksumy liczone wektorowo).
+        
+        Args:
+            matches: Dopasowania do walidacji.
+            
+        Returns:
+            Maska logiczna - True dla poprawnych dopasowań.
+        """
+        valid = [True] * len(matches)
+        
+        # Grupuj kandydatów po typie encji - jeden wsad na walidator
+        by_type: Dict[EntityType, List[int]] = {}
+        for i, match in enumerate(matches):
+            if match.entry.entity_type in self.BATCH_VALIDATED_TYPES:
+                by_type.setdefault(match.entry.entity_type, []).append(i)
+        
+        for entity_type, positions in by_type.items():
+            candidates = [matches[i].text for i in positions]
+            try:
+                results = self.validators.validate_batch(entity_type, candidates)
+            except Exception as e:
+                self.logger.debug(f"Błąd walidacji wsadowej {entity_type}: {e}")
+                results = [self._validate(entity_type, text) for text in candidates]
+            
+            for i, is_valid in zip(positions, results):
+                valid[i] = is_valid
+        
+        return valid
+    
     def _validate(self, entity_type: EntityType, text: str) -> bool:
         """
         Waliduje wykryty tekst (np. sprawdza checksumę).
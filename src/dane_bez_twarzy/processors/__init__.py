@@ -4,10 +4,13 @@ Procesory dla różnych formatów plików.
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 if TYPE_CHECKING:
+    import pandas as pd
     from dane_bez_twarzy.core.anonymizer import Anonymizer
+    from dane_bez_twarzy.core.config import EntityType
+    from dane_bez_twarzy.core.profile import ColumnProfile
 
 
 class FileProcessor(ABC):
@@ -44,6 +47,18 @@ class TextProcessor(FileProcessor):
         **kwargs: Any
     ) -> None:
         """Przetwarza plik tekstowy."""
+        # Duże pliki - oknami, ze stałym zużyciem pamięci
+        config = getattr(anonymizer, 'config', None)
+        if (
+            config is not None
+            and config.stream_threshold is not None
+            and input_path.stat().st_size > config.stream_threshold
+        ):
+            if config.mmap_input and self._process_mapped(input_path, output_path, anonymizer):
+                return
+            self._process_stream(input_path, output_path, anonymizer, config.stream_window_size)
+            return
+        
         # Wczytaj tekst
         with open(input_path, 'r', encoding='utf-8') as f:
             text = f.read()
@@ -54,6 +69,49 @@ class TextProcessor(FileProcessor):
         # Zapisz
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(anonymized)
+    
+    def _process_stream(
+        self,
+        input_path: Path,
+        output_path: Path,
+        anonymizer: 'Anonymizer',
+        window_size: int
+    ) -> None:
+        """Przetwarza plik tekstowy blokami, zapisując wynik na bieżąco."""
+        with open(input_path, 'r', encoding='utf-8') as source, \
+                open(output_path, 'w', encoding='utf-8') as target:
+            blocks = iter(lambda: source.read(window_size), '')
+            for piece in anonymizer.anonymize_stream(blocks):
+                target.write(piece)
+    
+    def _process_mapped(
+        self,
+        input_path: Path,
+        output_path: Path,
+        anonymizer: 'Anonymizer'
+    ) -> bool:
+        """
+        Przetwarza plik tekstowy zmapowany do pamięci (mmap), bez dekodowania całości.
+        
+        Returns:
+            False, jeśli konfiguracja wymaga dekodowania całego tekstu -
+            plik trzeba wtedy przetworzyć strumieniowo.
+        """
+        import mmap
+        from dane_bez_twarzy.core.mapped import unsupported_reason
+        
+        reason = unsupported_reason(anonymizer.detector)
+        if reason is None and anonymizer.detection_store is not None:
+            reason = "zapis detekcji (detection_store) działa na tekście"
+        if reason is not None:
+            anonymizer.logger.info(f"Odczyt przez mmap niedostępny ({reason}) - przetwarzanie strumieniowe")
+            return False
+        
+        with open(input_path, 'rb') as source, open(output_path, 'wb') as target:
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for piece in anonymizer.anonymize_mapped(data):
+                    target.write(piece)
+        return True
 
 
 class DocxProcessor(FileProcessor):
@@ -94,7 +152,16 @@ class DocxProcessor(FileProcessor):
 
 
 class ExcelProcessor(FileProcessor):
-    """Processor dla plików Excel (.xlsx, .csv)."""
+    """
+    Processor dla plików Excel (.xlsx, .csv).
+    
+    Kolumny tekstowe są anonimizowane po unikalnych wartościach - detekcja
+    działa raz na wartość, niezależnie od liczby wierszy, w których ona
+    występuje.
+    """
+    
+    # Liczba unikalnych wartości kolumny anonimizowanych w jednej partii
+    BATCH_SIZE = 10_000
     
     def process(
         self,
@@ -109,24 +176,202 @@ class ExcelProcessor(FileProcessor):
         except ImportError:
             raise ImportError("Zainstaluj pandas: pip install pandas openpyxl")
         
+        # Duże pliki CSV - fragmentami, ze stałym zużyciem pamięci
+        config = getattr(anonymizer, 'config', None)
+        if (
+            input_path.suffix == '.csv'
+            and output_path.suffix == '.csv'
+            and config is not None
+            and config.stream_threshold is not None
+            and input_path.stat().st_size > config.stream_threshold
+        ):
+            self._process_csv_chunks(input_path, output_path, anonymizer, config.stream_csv_rows)
+            return
+        
         # Wczytaj plik
         if input_path.suffix == '.csv':
             df = pd.read_csv(input_path)
         else:
             df = pd.read_excel(input_path)
         
-        # Anonimizuj każdą komórkę z tekstem
-        for col in df.columns:
-            if df[col].dtype == 'object':  # Kolumny tekstowe
-                df[col] = df[col].apply(
-                    lambda x: anonymizer.anonymize_text(str(x)) if pd.notna(x) else x
-                )
+        self._anonymize_frame(df, anonymizer, self._profile_frame(df, anonymizer))
         
         # Zapisz
         if output_path.suffix == '.csv':
             df.to_csv(output_path, index=False)
         else:
             df.to_excel(output_path, index=False)
+    
+    def _process_csv_chunks(
+        self,
+        input_path: Path,
+        output_path: Path,
+        anonymizer: 'Anonymizer',
+        chunk_rows: int
+    ) -> None:
+        """
+        Przetwarza plik CSV fragmentami po chunk_rows wierszy.
+        
+        Odczyt następnego fragmentu i zapis poprzedniego odbywają się w tle,
+        podczas anonimizacji bieżącego - w pamięci są naraz najwyżej trzy
+        fragmenty. Pseudonimy i skróty są spójne między fragmentami, bo
+        wszystkie przechodzą przez tę samą strategię anonimizera. Profil
+        kolumn (config.profile_columns) jest wyznaczany z pierwszego fragmentu.
+        
+        Wszystkie kolumny są czytane jako tekst (dtype=str). Typy ustalane
+        osobno dla każdego fragmentu mogłyby się różnić między fragmentami -
+        kolumna PESEL-i lub telefonów zapisanych samymi cyframi byłaby
+        liczbowa (i pominięta) we fragmentach bez innych znaków. Dzięki temu
+        także liczby są zapisywane dokładnie tak, jak w pliku źródłowym.
+        """
+        import pandas as pd
+        from concurrent.futures import ThreadPoolExecutor
+        
+        # Wątki zamykane pierwsze - czekają na zaległy odczyt i zapis przed zamknięciem plików
+        with open(output_path, 'w', encoding='utf-8', newline='') as target, \
+                pd.read_csv(input_path, chunksize=chunk_rows, dtype=str) as chunks, \
+                ThreadPoolExecutor(max_workers=2) as io:
+            reading = io.submit(next, chunks, None)
+            writing = None
+            header = True
+            profiles = None
+            
+            while True:
+                df = reading.result()
+                if df is None:
+                    break
+                reading = io.submit(next, chunks, None)
+                
+                # Profil kolumn z pierwszego fragmentu obowiązuje w całym pliku
+                if profiles is None:
+                    profiles = self._profile_frame(df, anonymizer)
+                self._anonymize_frame(df, anonymizer, profiles)
+                
+                # Fragmenty muszą trafić do pliku po kolei
+                if writing is not None:
+                    writing.result()
+                writing = io.submit(df.to_csv, target, header=header, index=False)
+                header = False
+            
+            if writing is not None:
+                writing.result()
+    
+    def _profile_frame(
+        self,
+        df: 'pd.DataFrame',
+        anonymizer: 'Anonymizer'
+    ) -> Dict[Any, 'ColumnProfile']:
+        """
+        Profiluje kolumny tekstowe na próbce config.profile_sample_rows wierszy.
+        
+        Próbka to wiersze rozłożone równomiernie w ramce (bez pustych
+        komórek). Profile są przekazywane anonimizerowi (log i raport).
+        
+        Returns:
+            Profile kolumn (pusty słownik, gdy profilowanie jest wyłączone).
+        """
+        config = getattr(anonymizer, 'config', None)
+        if config is None or not config.profile_columns:
+            return {}
+        
+        import numpy as np
+        from dane_bez_twarzy.core.profile import profile_column
+        
+        profiles = {}
+        for col in df.columns:
+            if not self._is_text_column(df[col]):
+                continue
+            
+            values = df[col].dropna()
+            if len(values) > config.profile_sample_rows:
+                rows = np.linspace(0, len(values) - 1, config.profile_sample_rows).astype(int)
+                values = values.iloc[rows]
+            
+            profiles[col] = profile_column(col, (str(v) for v in values), anonymizer.detector)
+        
+        anonymizer.add_column_profiles(profiles.values())
+        return profiles
+    
+    def _anonymize_frame(
+        self,
+        df: 'pd.DataFrame',
+        anonymizer: 'Anonymizer',
+        profiles: Optional[Dict[Any, 'ColumnProfile']] = None
+    ) -> None:
+        """Anonimizuje kolumny tekstowe ramki (w miejscu), pomijając kolumny bez encji w profilu."""
+        from dane_bez_twarzy.core.profile import PII_FREE, UNIFORM
+        
+        for col in df.columns:
+            if not self._is_text_column(df[col]):
+                continue
+            
+            profile = (profiles or {}).get(col)
+            if profile is not None and profile.kind == PII_FREE:
+                continue
+            
+            entity_type = profile.entity_type if profile is not None and profile.kind == UNIFORM else None
+            df[col] = self._anonymize_column(df[col], anonymizer, entity_type)
+    
+    @staticmethod
+    def _is_text_column(column: 'pd.Series') -> bool:
+        """Sprawdza czy kolumna zawiera tekst (object lub str w pandas >= 3)."""
+        from pandas.api.types import is_object_dtype, is_string_dtype
+        
+        return is_object_dtype(column.dtype) or is_string_dtype(column.dtype)
+    
+    def _anonymize_column(
+        self,
+        column: 'pd.Series',
+        anonymizer: 'Anonymizer',
+        entity_type: Optional['EntityType'] = None
+    ) -> 'pd.Series':
+        """
+        Anonimizuje kolumnę tekstową, wykrywając encje raz na unikalną wartość.
+        
+        Kolumna jest faktoryzowana na kody wierszy i unikalne wartości
+        (w kolejności pierwszego wystąpienia, więc pseudonimy są numerowane
+        jak przy przetwarzaniu wiersz po wierszu). Kolumny object są
+        faktoryzowane po postaci tekstowej - pd.factorize łączy wartości
+        równe sobie (1, 1.0 i True), które jako tekst są różne. Unikalne wartości są
+        anonimizowane partiami po BATCH_SIZE, a wynik wraca do wierszy przez
+        indeksowanie tablicy kodami. Puste komórki zostają bez zmian.
+        
+        Args:
+            column: Kolumna tekstowa.
+            anonymizer: Instancja anonimizera.
+            entity_type: Typ encji kolumny jednorodnej (z profilu kolumny).
+            
+        Returns:
+            Zanonimizowana kolumna (dtype object).
+        """
+        import numpy as np
+        import pandas as pd
+        from pandas.api.types import is_object_dtype
+        
+        keys = column.map(str, na_action='ignore') if is_object_dtype(column.dtype) else column
+        codes, uniques = pd.factorize(keys)
+        values = column.to_numpy(dtype=object, copy=True)
+        if not len(uniques):
+            return pd.Series(values, index=column.index, name=column.name)
+        
+        texts = [str(value) for value in uniques]
+        present = codes >= 0  # Kod -1 oznacza pustą komórkę
+        counts = np.bincount(codes[present], minlength=len(texts))
+        
+        # Adapter deszyfrowania (_Decryptor) ma tylko anonymize_text
+        anonymize_batch = getattr(anonymizer, 'anonymize_batch', None)
+        anonymized = np.empty(len(texts), dtype=object)
+        for start in range(0, len(texts), self.BATCH_SIZE):
+            batch = texts[start:start + self.BATCH_SIZE]
+            if anonymize_batch is not None:
+                anonymized[start:start + len(batch)] = anonymize_batch(
+                    batch, counts[start:start + len(batch)], entity_type=entity_type
+                )
+            else:
+                anonymized[start:start + len(batch)] = [anonymizer.anonymize_text(t) for t in batch]
+        
+        values[present] = anonymized[codes[present]]
+        return pd.Series(values, index=column.index, name=column.name)
 
 
 class PDFProcessor(FileProcessor):
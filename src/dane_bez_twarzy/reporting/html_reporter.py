@@ -3,10 +3,76 @@ Generator raportów HTML z interaktywnymi wykresami.
 """
 
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 import json
 
 
+def format_position(entity: Dict[str, Any]) -> str:
+    """
+    Formatuje pozycję encji z raportu: zakres znaków i linia:kolumna.
+    
+    Args:
+        entity: Encja z raportu (słownik z detect_entities).
+    
+    Returns:
+        Np. "120-132 (l. 4:17)"; bez linii dla starszych raportów.
+    """
+    position = f"{entity.get('start', 'N/A')}-{entity.get('end', 'N/A')}"
+    if 'line' in entity:
+        position += f" (l. {entity['line']}:{entity.get('column', 1)})"
+    return position
+
+
+# Opisy rodzajów kolumn z core.profile
+COLUMN_KINDS = {
+    "pii_free": "bez danych osobowych (pominięta)",
+    "uniform": "jednorodna (tylko wzorzec i walidator)",
+    "free_text": "tekst (pełna detekcja)",
+}
+
+
+def format_column_profiles(profiles: List[Dict[str, Any]]) -> str:
+    """
+    Formatuje tabelę profili kolumn (raporty plików tabelarycznych).
+    
+    Args:
+        profiles: Profile kolumn z raportu ("column_profiles").
+    
+    Returns:
+        Sekcja HTML albo pusty napis, gdy profili brak.
+    """
+    if not profiles:
+        return ""
+    
+    rows = "".join(
+        f"""                    <tr>
+                        <td>{profile['column']}</td>
+                        <td><span class="badge">{COLUMN_KINDS.get(profile['kind'], profile['kind'])}</span></td>
+                        <td>{profile.get('entity_type') or '-'}</td>
+                        <td>{profile['with_entities']} / {profile['sampled']}</td>
+                    </tr>
+"""
+        for profile in profiles
+    )
+    return f"""
+        <div class="entity-table">
+            <h2 class="chart-title">Profil kolumn (próbka wierszy)</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Kolumna</th>
+                        <th>Rodzaj</th>
+                        <th>Typ encji</th>
+                        <th>Wartości z encjami</th>
+                    </tr>
+                </thead>
+                <tbody>
+{rows}                </tbody>
+            </table>
+        </div>
+"""
+
+
 def generate_html_report(report: Dict[str, Any], output_path: Path) -> None:
     """
     Generuje wizualny raport HTML z wykresami Plotly.
@@ -326,7 +392,7 @@ def generate_html_report(report: Dict[str, Any], output_path: Path) -> None:
                         <td>{i}</td>
                         <td><span class="badge">{entity['type']}</span></td>
                         <td>{entity.get('text', 'N/A')[:50]}</td>
-                        <td>{entity.get('start', 'N/A')}-{entity.get('end', 'N/A')}</td>
+                        <td>{format_position(entity)}</td>
                         <td>
                             <div class="confidence-bar">
                                 <div class="confidence-fill" style="width: {confidence_percent}%"></div>
@@ -341,7 +407,7 @@ def generate_html_report(report: Dict[str, Any], output_path: Path) -> None:
             </table>
             {f'<p style="margin-top: 15px; color: #7f8c8d;">Wyświetlono 50 z {len(report["entities"])} encji</p>' if len(report['entities']) > 50 else ''}
         </div>
-        
+        {format_column_profiles(report.get('column_profiles'))}
         <footer>
             <p>Wygenerowano przez <strong>Dane Bez Twarzy</strong> - Biblioteka anonimizacji danych osobowych</p>
             <p style="margin-top: 5px;">Data: {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
@@ -10,6 +10,8 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import datetime
 
+from .html_reporter import format_position
+
 
 def generate_pdf_report(report: Dict[str, Any], output_path: Path) -> None:
     """
@@ -167,7 +169,7 @@ def generate_pdf_report(report: Dict[str, Any], output_path: Path) -> None:
                         str(i),
                         entity['type'],
                         text,
-                        f"{entity.get('start', 'N/A')}-{entity.get('end', 'N/A')}",
+                        format_position(entity),
                         f"{entity.get('confidence', 1.0):.2f}",
                         entity.get('metadata', {}).get('detector', 'N/A')
                     ])
@@ -3,11 +3,16 @@ Strategie anonimizacji danych.
 """
 
 from abc import ABC, abstractmethod
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
 import hashlib
+import hmac
+import json
+import re
 import secrets
 
-from dane_bez_twarzy.core.config import AnonymizationConfig, AnonymizationMethod
+from dane_bez_twarzy.core.config import AnonymizationConfig, AnonymizationMethod, EntityType
 from dane_bez_twarzy.core.detector import Entity
 
 
@@ -30,67 +35,122 @@ class AnonymizationStrategy(ABC):
         
         Args:
             text: Oryginalny tekst.
-            entities: Lista wykrytych encji.
+            entities: Lista wykrytych encji (lub EntityBatch).
             
         Returns:
             Zanonimizowany tekst.
         """
         pass
     
-    def _replace_entities(self, text: str, entities: List[Entity], replacements: dict) -> str:
+    @abstractmethod
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        """
+        Przygotowuje zamienniki encji i zwraca funkcję encja -> zamiennik.
+        
+        Praca wsadowa (haszowanie, szyfrowanie, zapytania do magazynu
+        pseudonimów) jest wykonywana tutaj, dla wszystkich przekazanych encji.
+        Pozwala to StrategyPlan złożyć zamienniki wielu strategii w jednym
+        przebiegu po tekście.
+        
+        Args:
+            entities: Encje, które zostaną zamienione.
+            
+        Returns:
+            Funkcja zwracająca zamiennik dla encji.
+        """
+        pass
+    
+    def close(self) -> None:
+        """Zwalnia zasoby strategii (np. połączenie z magazynem pseudonimów)."""
+    
+    def _replace_entities(self, text: str, entities: List[Entity],
+                          replacement_for: Callable[[Entity], str]) -> str:
         """
         Pomocnicza metoda do zamiany encji w tekście.
         
+        Zamienniki są wyznaczane dla każdej encji osobno (po pozycji, nie po
+        tekście), a wynik jest budowany jednym przebiegiem przez
+        core.spans.replace_spans.
+        
         Args:
             text: Oryginalny tekst.
             entities: Lista encji do zamiany.
-            replacements: Słownik mapowania encji na ich zamienniki.
+            replacement_for: Funkcja zwracająca zamiennik dla encji.
             
         Returns:
             Tekst z zamienionymi encjami.
         """
-        # Sortuj encje od końca do początku, żeby nie psuć indeksów
-        sorted_entities = sorted(entities, key=lambda e: e.start, reverse=True)
-        
-        result = text
-        for entity in sorted_entities:
-            replacement = replacements.get(entity.text, entity.text)
-            result = result[:entity.start] + replacement + result[entity.end:]
+        from dane_bez_twarzy.core.spans import replace_spans
         
-        return result
+        return replace_spans(
+            text,
+            ((entity.start, entity.end, replacement_for(entity)) for entity in entities)
+        )
 
 
 class MaskStrategy(AnonymizationStrategy):
-    """Strategia maskowania - zamienia znaki na maskę."""
+    """
+    Strategia maskowania - zamienia znaki na maskę.
+    
+    Funkcja maskująca jest budowana raz na konfigurację (mask_char,
+    preserve_length, preserve_structure). Maskowanie ze strukturą to jedno
+    wywołanie str.translate z tablicą znaków alfanumerycznych.
+    """
+    
+    def __init__(self, config: AnonymizationConfig):
+        super().__init__(config)
+        self._mask_table = _MaskTable(config.mask_char)
+        self._masker = self._create_masker()
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Maskuje wykryte encje."""
-        replacements = {}
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        masker = self._masker
+        return lambda entity: masker(entity.text)
+    
+    def _create_masker(self) -> Callable[[str], str]:
+        """Wybiera sposób maskowania dla konfiguracji."""
+        mask_char = self.config.mask_char
         
-        for entity in entities:
-            if self.config.preserve_length:
-                # Zachowaj długość i strukturę
-                if self.config.preserve_structure:
-                    masked = self._mask_with_structure(entity.text)
-                else:
-                    masked = self.config.mask_char * len(entity.text)
-            else:
-                # Stała długość maski
-                masked = self.config.mask_char * 3
-            
-            replacements[entity.text] = masked
+        if self.config.preserve_length:
+            # Zachowaj długość i strukturę
+            if self.config.preserve_structure:
+                return self._mask_with_structure
+            return lambda text: mask_char * len(text)
         
-        return self._replace_entities(text, entities, replacements)
+        # Stała długość maski
+        fixed = mask_char * 3
+        return lambda text: fixed
+    
+    def _mask(self, entity: Entity) -> str:
+        """Zwraca maskę dla encji."""
+        return self._masker(entity.text)
     
     def _mask_with_structure(self, text: str) -> str:
         """Maskuje zachowując strukturę (spacje, myślniki, itp.)."""
-        result = []
-        for char in text:
-            if char.isalnum():
-                result.append(self.config.mask_char)
-            else:
-                result.append(char)
-        return ''.join(result)
+        return text.translate(self._mask_table)
+
+
+class _MaskTable(dict):
+    """
+    Tablica dla str.translate: znaki alfanumeryczne -> mask_char.
+    
+    Znaki ASCII i Latin Extended (w tym polskie litery) są wpisane od razu,
+    pozostałe są klasyfikowane (isalnum) przy pierwszym wystąpieniu.
+    """
+    
+    def __init__(self, mask_char: str):
+        super().__init__()
+        self.mask_char = mask_char
+        for code in range(0x250):
+            self.__missing__(code)
+    
+    def __missing__(self, code: int):
+        value = self.mask_char if chr(code).isalnum() else code
+        self[code] = value
+        return value
 
 
 class EntityStrategy(AnonymizationStrategy):
@@ -98,20 +158,20 @@ class EntityStrategy(AnonymizationStrategy):
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Zamienia wykryte encje na ich typy w nawiasach kwadratowych."""
-        replacements = {}
-        
-        for entity in entities:
-            # Jeśli encja pochodzi z PlaceholderDetector i ma oryginalna nazwę
-            if entity.metadata and 'placeholder_name' in entity.metadata:
-                # Zachowaj oryginalną nazwę placeholdera z pliku (np. [name], [surname])
-                replacement = entity.metadata['placeholder_name']
-            else:
-                # W przeciwnym razie użyj nazwy typu encji
-                replacement = self._entity_type_to_placeholder(entity.type)
-            
-            replacements[entity.text] = replacement
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        return self._placeholder
+    
+    def _placeholder(self, entity: Entity) -> str:
+        """Zwraca placeholder dla encji."""
+        # Jeśli encja pochodzi z PlaceholderDetector i ma oryginalna nazwę
+        if entity.metadata and 'placeholder_name' in entity.metadata:
+            # Zachowaj oryginalną nazwę placeholdera z pliku (np. [name], [surname])
+            return entity.metadata['placeholder_name']
         
-        return self._replace_entities(text, entities, replacements)
+        # W przeciwnym razie użyj nazwy typu encji
+        return self._entity_type_to_placeholder(entity.type)
     
     def _entity_type_to_placeholder(self, entity_type) -> str:
         """
@@ -164,6 +224,27 @@ class PseudonymizeStrategy(AnonymizationStrategy):
         self._pseudonym_map = {}
         self._counter = {}
         
+        # Pseudonimy z HMAC - deterministyczne, bez wspólnego stanu między procesami
+        self.keyed = None
+        if config.pseudonym_mode == "hmac":
+            from dane_bez_twarzy.strategies.deterministic import KeyedPseudonymizer
+            key = config.pseudonym_key if config.pseudonym_key is not None else str(config.seed)
+            self.keyed = KeyedPseudonymizer(
+                key,
+                prefix=config.pseudonym_prefix,
+                length=config.pseudonym_hash_length
+            )
+        
+        # Trwały magazyn pseudonimów (zamiast słownika w pamięci)
+        self.vault = None
+        if config.pseudonym_vault:
+            from dane_bez_twarzy.strategies.vault import PseudonymVault
+            self.vault = PseudonymVault(
+                config.pseudonym_vault,
+                cache_size=config.pseudonym_cache_size,
+                salt=config.hash_salt
+            )
+        
         # Ustaw seed dla powtarzalności
         if config.seed:
             import random
@@ -171,57 +252,119 @@ class PseudonymizeStrategy(AnonymizationStrategy):
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Pseudonimizuje wykryte encje."""
-        replacements = {}
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        if self.keyed is not None:
+            return lambda entity: self.keyed.pseudonym(entity.text, entity.type)
         
-        for entity in entities:
-            if entity.text not in self._pseudonym_map:
-                # Wygeneruj nowy pseudonim
-                entity_type_str = entity.type.value
-                if entity_type_str not in self._counter:
-                    self._counter[entity_type_str] = 0
-                
-                self._counter[entity_type_str] += 1
-                pseudonym = f"[{entity_type_str}_{self._counter[entity_type_str]}]"
-                
-                self._pseudonym_map[entity.text] = pseudonym
+        if self.vault is not None:
+            # Jedno wsadowe zapytanie do magazynu na cały tekst
+            pseudonyms = self.vault.get_or_create(
+                (entity.text, entity.type.value) for entity in entities
+            )
+            return lambda entity: pseudonyms[entity.text]
+        
+        return self._pseudonym
+    
+    def close(self) -> None:
+        """Zamyka magazyn pseudonimów."""
+        if self.vault is not None:
+            self.vault.close()
+    
+    def _pseudonym(self, entity: Entity) -> str:
+        """Zwraca (tworząc przy pierwszym wystąpieniu) pseudonim encji."""
+        if entity.text not in self._pseudonym_map:
+            # Wygeneruj nowy pseudonim
+            entity_type_str = entity.type.value
+            if entity_type_str not in self._counter:
+                self._counter[entity_type_str] = 0
+            
+            self._counter[entity_type_str] += 1
+            pseudonym = f"[{entity_type_str}_{self._counter[entity_type_str]}]"
             
-            replacements[entity.text] = self._pseudonym_map[entity.text]
+            self._pseudonym_map[entity.text] = pseudonym
         
-        return self._replace_entities(text, entities, replacements)
+        return self._pseudonym_map[entity.text]
 
 
 class HashStrategy(AnonymizationStrategy):
-    """Strategia haszowania - nieodwracalna anonimizacja."""
+    """
+    Strategia haszowania - nieodwracalna anonimizacja.
+    
+    Funkcja haszująca jest wybierana raz (przy tworzeniu strategii), a skróty
+    są zapamiętywane w cache LRU - powtarzające się wartości (emaile,
+    telefony w kolumnach) są haszowane tylko raz. Z kluczem hash_key
+    dostępne są tryby z kluczem: BLAKE2b (hash_algorithm="blake2b") i HMAC
+    (hash_algorithm="hmac-sha256").
+    """
+    
+    # Długość zwracanego (skróconego) skrótu w znakach hex
+    DIGEST_LENGTH = 16
+    
+    def __init__(self, config: AnonymizationConfig):
+        super().__init__(config)
+        hasher = self._create_hasher()
+        self._hash_text = lru_cache(maxsize=config.hash_cache_size)(hasher)
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Haszuje wykryte encje."""
-        replacements = {}
-        
-        for entity in entities:
-            hashed = self._hash_text(entity.text)
-            replacements[entity.text] = hashed
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        hashed = self.hash_values(entity.text for entity in entities)
+        return lambda entity: hashed[entity.text]
+    
+    def hash_values(self, values: Iterable[str]) -> Dict[str, str]:
+        """
+        Haszuje wsadowo wartości, każdą unikalną tylko raz.
         
-        return self._replace_entities(text, entities, replacements)
+        Args:
+            values: Wartości do zahaszowania (mogą się powtarzać).
+            
+        Returns:
+            Słownik wartość -> skrót.
+        """
+        hash_text = self._hash_text
+        return {value: hash_text(value) for value in dict.fromkeys(values)}
     
-    def _hash_text(self, text: str) -> str:
-        """Haszuje tekst."""
-        # Dodaj salt jeśli jest skonfigurowany
-        data = text
-        if self.config.hash_salt:
-            data = self.config.hash_salt + text
-        
-        # Użyj wybranego algorytmu
-        if self.config.hash_algorithm == "sha256":
-            hash_obj = hashlib.sha256(data.encode())
-        elif self.config.hash_algorithm == "sha512":
-            hash_obj = hashlib.sha512(data.encode())
-        elif self.config.hash_algorithm == "md5":
-            hash_obj = hashlib.md5(data.encode())
+    def _create_hasher(self) -> Callable[[str], str]:
+        """Buduje funkcję haszującą dla konfiguracji (raz na strategię)."""
+        algorithm = self.config.hash_algorithm
+        length = self.DIGEST_LENGTH
+        key = self.config.hash_key.encode() if self.config.hash_key else None
+        
+        if algorithm == "hmac-sha256":
+            keyed = hmac.new(key, digestmod=hashlib.sha256)
+            
+            def hash_hmac(text: str) -> str:
+                mac = keyed.copy()
+                mac.update(text.encode())
+                return mac.hexdigest()[:length]
+            
+            return hash_hmac
+        
+        if algorithm == "blake2b":
+            # Skrót o długości dokładnie DIGEST_LENGTH znaków hex; klucz wbudowany w BLAKE2
+            base = hashlib.blake2b(digest_size=length // 2, key=key or b"")
         else:
-            hash_obj = hashlib.sha256(data.encode())
+            constructors = {
+                "sha256": hashlib.sha256,
+                "sha512": hashlib.sha512,
+                "md5": hashlib.md5,
+            }
+            base = constructors.get(algorithm, hashlib.sha256)()
+        
+        # Sól jest prefiksem danych - jej stan jest liczony raz i kopiowany
+        if self.config.hash_salt:
+            base.update(self.config.hash_salt.encode())
+        
+        def hash_text(text: str) -> str:
+            hash_obj = base.copy()
+            hash_obj.update(text.encode())
+            return hash_obj.hexdigest()[:length]
         
-        # Zwróć skrócony hash (pierwsze 16 znaków)
-        return hash_obj.hexdigest()[:16]
+        return hash_text
 
 
 class RedactStrategy(AnonymizationStrategy):
@@ -229,12 +372,10 @@ class RedactStrategy(AnonymizationStrategy):
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Usuwa wykryte encje."""
-        replacements = {}
-        
-        for entity in entities:
-            replacements[entity.text] = "[USUNIĘTO]"
-        
-        return self._replace_entities(text, entities, replacements)
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        return lambda entity: "[USUNIĘTO]"
 
 
 class GeneralizeStrategy(AnonymizationStrategy):
@@ -242,13 +383,10 @@ class GeneralizeStrategy(AnonymizationStrategy):
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Generalizuje wykryte encje."""
-        replacements = {}
-        
-        for entity in entities:
-            generalized = self._generalize(entity)
-            replacements[entity.text] = generalized
-        
-        return self._replace_entities(text, entities, replacements)
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        return self._generalize
     
     def _generalize(self, entity: Entity) -> str:
         """Generalizuje encję do ogólniejszej formy."""
@@ -270,44 +408,233 @@ class GeneralizeStrategy(AnonymizationStrategy):
 
 
 class EncryptStrategy(AnonymizationStrategy):
-    """Strategia szyfrowania - odwracalna anonimizacja."""
+    """
+    Strategia szyfrowania - odwracalna anonimizacja.
+    
+    Encje są zastępowane krótkimi identyfikatorami [ENC:000001], a pełne
+    tokeny Fernet trafiają do słownika tokens (id -> token), zapisywanego
+    w pliku towarzyszącym (save_sidecar). Identyczne wartości są szyfrowane
+    raz i dostają ten sam identyfikator. decrypt() odtwarza tekst.
+    """
+    
+    # Identyfikator zaszyfrowanej wartości w zanonimizowanym tekście
+    TOKEN_PATTERN = re.compile(r'\[ENC:([0-9a-f]{6,})\]')
+    
+    SIDECAR_FORMAT = "dane_bez_twarzy.encrypt"
+    
+    def __init__(self, config: AnonymizationConfig):
+        super().__init__(config)
+        self._cipher = self._create_cipher()
+        
+        self.tokens: Dict[str, str] = {}  # id -> pełny token Fernet
+        self._ids: Dict[str, str] = {}  # wartość -> id
+    
+    def _create_cipher(self):
+        """Tworzy szyfr raz na strategię (None gdy brak pakietu cryptography)."""
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            return None
+        
+        # Użyj klucza z konfiguracji lub wygeneruj nowy
+        key = self.config.encryption_key
+        if not key:
+            key = Fernet.generate_key().decode()
+        
+        if isinstance(key, str):
+            key = key.encode()
+        
+        return Fernet(key)
     
     def anonymize(self, text: str, entities: List[Entity]) -> str:
         """Szyfruje wykryte encje."""
-        replacements = {}
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        if self._cipher is None:
+            return lambda entity: "[ZASZYFROWANO]"
         
-        for entity in entities:
-            encrypted = self._encrypt(entity.text)
-            replacements[entity.text] = encrypted
+        ids = self.encrypt_values(entity.text for entity in entities)
+        return lambda entity: f"[ENC:{ids[entity.text]}]"
+    
+    def encrypt_values(self, values: Iterable[str]) -> Dict[str, str]:
+        """
+        Szyfruje wsadowo wartości, każdą unikalną tylko raz.
+        
+        Args:
+            values: Wartości do zaszyfrowania (mogą się powtarzać).
+            
+        Returns:
+            Słownik wartość -> identyfikator tokenu.
+        """
+        encrypt = self._cipher.encrypt
+        ids, tokens = self._ids, self.tokens
+        
+        for value in dict.fromkeys(values):
+            if value not in ids:
+                short_id = f"{len(tokens) + 1:06x}"
+                tokens[short_id] = encrypt(value.encode("utf-8")).decode("ascii")
+                ids[value] = short_id
         
-        return self._replace_entities(text, entities, replacements)
+        return ids
     
     def _encrypt(self, text: str) -> str:
-        """Szyfruje tekst."""
-        try:
-            from cryptography.fernet import Fernet
-            
-            # Użyj klucza z konfiguracji lub wygeneruj nowy
-            key = self.config.encryption_key
-            if not key:
-                key = Fernet.generate_key().decode()
+        """Szyfruje tekst i zwraca jego identyfikator w postaci [ENC:id]."""
+        if self._cipher is None:
+            return "[ZASZYFROWANO]"
+        return f"[ENC:{self.encrypt_values([text])[text]}]"
+    
+    def decrypt(self, encrypted_text: str, tokens: Optional[Dict[str, str]] = None) -> str:
+        """
+        Odszyfrowuje tekst (wymaga oryginalnego klucza).
+        
+        Każdy identyfikator jest odszyfrowywany raz, a tekst składany
+        jednym przebiegiem. Identyfikatory spoza słownika tokenów zostają
+        bez zmian.
+        
+        Args:
+            encrypted_text: Tekst z identyfikatorami [ENC:id].
+            tokens: Słownik id -> token (domyślnie tokeny tej strategii).
             
-            if isinstance(key, str):
-                key = key.encode()
+        Returns:
+            Odtworzony tekst.
+        """
+        if self._cipher is None:
+            raise ImportError("Deszyfrowanie wymaga pakietu cryptography")
+        
+        tokens = self.tokens if tokens is None else tokens
+        decrypt = self._cipher.decrypt
+        
+        plain = {
+            short_id: decrypt(tokens[short_id].encode("ascii")).decode("utf-8")
+            for short_id in set(self.TOKEN_PATTERN.findall(encrypted_text))
+            if short_id in tokens
+        }
+        
+        return self.TOKEN_PATTERN.sub(
+            lambda match: plain.get(match.group(1), match.group(0)),
+            encrypted_text
+        )
+    
+    def reset(self) -> None:
+        """Zaczyna nowy dokument - czyści tokeny i identyfikatory."""
+        self.tokens = {}
+        self._ids = {}
+    
+    def save_sidecar(self, path: Union[str, Path]) -> Path:
+        """
+        Zapisuje tokeny do pliku towarzyszącego (JSON).
+        
+        Args:
+            path: Ścieżka pliku.
             
-            f = Fernet(key)
-            encrypted = f.encrypt(text.encode())
+        Returns:
+            Ścieżka zapisanego pliku.
+        """
+        path = Path(path)
+        payload = {"format": self.SIDECAR_FORMAT, "version": 1, "tokens": self.tokens}
+        path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        return path
+    
+    @classmethod
+    def load_sidecar(cls, path: Union[str, Path]) -> Dict[str, str]:
+        """
+        Wczytuje tokeny z pliku towarzyszącego.
+        
+        Args:
+            path: Ścieżka pliku zapisanego przez save_sidecar.
             
-            # Zwróć jako hex dla czytelności
-            return f"[ENC:{encrypted.hex()[:32]}...]"
+        Returns:
+            Słownik id -> token.
+        """
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("format") != cls.SIDECAR_FORMAT:
+            raise ValueError(f"Nieprawidłowy plik tokenów: {path}")
+        return payload["tokens"]
+
+
+class StrategyPlan(AnonymizationStrategy):
+    """
+    Plan strategii per typ encji - różne metody w jednym przebiegu po tekście.
+    
+    Plan jest kompilowany raz, przy tworzeniu: każda metoda ma jedną
+    instancję strategii, współdzieloną przez wszystkie przypisane do niej
+    typy (wspólne liczniki pseudonimów, cache skrótów, tokeny szyfrowania),
+    a każdy typ encji wskazuje bezpośrednio na swoją strategię. Typy spoza
+    config.strategy_plan używają metody domyślnej.
+    
+    Przykład użycia:
+        >>> config = AnonymizationConfig(
+        ...     method="mask",
+        ...     strategy_plan={"EMAIL": "hash", "PERSON": "pseudonymize"}
+        ... )
+        >>> StrategyPlan(config).anonymize(text, entities)
+    """
+    
+    def __init__(self, config: AnonymizationConfig,
+                 default_method: Optional[AnonymizationMethod] = None):
+        """
+        Kompilacja planu.
         
-        except ImportError:
-            return "[ZASZYFROWANO]"
+        Args:
+            config: Konfiguracja (z planem w config.strategy_plan).
+            default_method: Metoda dla typów spoza planu (domyślnie config.method).
+        """
+        super().__init__(config)
+        self.strategies: Dict[AnonymizationMethod, AnonymizationStrategy] = {}
+        self.default = self._strategy_for(default_method or config.method)
+        self.plan: Dict[EntityType, AnonymizationStrategy] = {
+            entity_type: self._strategy_for(method)
+            for entity_type, method in config.strategy_plan.items()
+        }
+    
+    def _strategy_for(self, method: AnonymizationMethod) -> AnonymizationStrategy:
+        """Zwraca (tworząc przy pierwszym użyciu) strategię metody."""
+        strategy = self.strategies.get(method)
+        if strategy is None:
+            strategy = _create_strategy(method, self.config)
+            self.strategies[method] = strategy
+        return strategy
+    
+    def anonymize(self, text: str, entities: List[Entity]) -> str:
+        """Anonimizuje encje strategiami przypisanymi do ich typów."""
+        return self._replace_entities(text, entities, self.replacer(entities))
+    
+    def replacer(self, entities: List[Entity]) -> Callable[[Entity], str]:
+        plan, default = self.plan, self.default
+        
+        # Każda strategia przygotowuje zamienniki wsadowo dla swoich encji
+        groups: Dict[AnonymizationStrategy, List[Entity]] = {}
+        for entity in entities:
+            groups.setdefault(plan.get(entity.type, default), []).append(entity)
+        
+        replacers = {strategy: strategy.replacer(group) for strategy, group in groups.items()}
+        return lambda entity: replacers[plan.get(entity.type, default)](entity)
+    
+    def close(self) -> None:
+        """Zamyka strategie planu."""
+        for strategy in self.strategies.values():
+            strategy.close()
+
+
+_STRATEGIES = {
+    AnonymizationMethod.MASK: MaskStrategy,
+    AnonymizationMethod.ENTITY: EntityStrategy,
+    AnonymizationMethod.PSEUDONYMIZE: PseudonymizeStrategy,
+    AnonymizationMethod.HASH: HashStrategy,
+    AnonymizationMethod.REDACT: RedactStrategy,
+    AnonymizationMethod.GENERALIZE: GeneralizeStrategy,
+    AnonymizationMethod.ENCRYPT: EncryptStrategy,
+}
+
+
+def _create_strategy(method: AnonymizationMethod, config: AnonymizationConfig) -> AnonymizationStrategy:
+    """Tworzy strategię jednej metody."""
+    strategy_class = _STRATEGIES.get(method)
+    if not strategy_class:
+        raise ValueError(f"Nieznana metoda anonimizacji: {method}")
     
-    def decrypt(self, encrypted_text: str) -> str:
-        """Odszyfrowuje tekst (wymaga oryginalnego klucza)."""
-        # Implementacja deszyfrowania
-        raise NotImplementedError("Deszyfrowanie będzie dodane w przyszłej wersji")
+    return strategy_class(config)
 
 
 def get_strategy(method: AnonymizationMethod, config: AnonymizationConfig) -> AnonymizationStrategy:
@@ -319,20 +646,9 @@ def get_strategy(method: AnonymizationMethod, config: AnonymizationConfig) -> An
         config: Konfiguracja.
         
     Returns:
-        Instancja strategii.
+        Instancja strategii (StrategyPlan, gdy config.strategy_plan jest ustawiony).
     """
-    strategies = {
-        AnonymizationMethod.MASK: MaskStrategy,
-        AnonymizationMethod.ENTITY: EntityStrategy,
-        AnonymizationMethod.PSEUDONYMIZE: PseudonymizeStrategy,
-        AnonymizationMethod.HASH: HashStrategy,
-        AnonymizationMethod.REDACT: RedactStrategy,
-        AnonymizationMethod.GENERALIZE: GeneralizeStrategy,
-        AnonymizationMethod.ENCRYPT: EncryptStrategy,
-    }
-    
-    strategy_class = strategies.get(method)
-    if not strategy_class:
-        raise ValueError(f"Nieznana metoda anonimizacji: {method}")
+    if config.strategy_plan:
+        return StrategyPlan(config, method)
     
-    return strategy_class(config)
+    return _create_strategy(method, config)
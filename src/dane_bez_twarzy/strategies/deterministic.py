@@ -0,0 +1,174 @@
+"""
+Deterministyczne pseudonimy wyliczane z HMAC wartości (bez wspólnego stanu).
+
+Pseudonim jest czystą funkcją (klucz, typ encji, wartość), więc dowolna
+liczba procesów lub maszyn z tym samym kluczem daje identyczny wynik bez
+żadnej synchronizacji.
+
+Polityka kolizji:
+    Kolizje (dwie różne wartości -> ten sam pseudonim) NIE są rozwiązywane -
+    wymagałoby to wspólnego rejestru, którego ten tryb celowo nie ma.
+    Ryzyko jest kontrolowane rozmiarem przestrzeni pseudonimów danego typu
+    (namespace_size) i wynosi w przybliżeniu n^2 / (2 * N) dla n różnych
+    wartości (paradoks urodzin) - patrz collision_probability().
+    - Kody tekstowe (Osoba_XXXXXXXX itp.) mają 5 bitów na znak; domyślna
+      długość 8 daje 2^40 pseudonimów, a każdy dodatkowy znak
+      (pseudonym_hash_length) zmniejsza ryzyko 32-krotnie.
+    - Formaty o stałej strukturze (PESEL, NIP, REGON, telefon) mają
+      przestrzeń ograniczoną formatem (10^8 - 10^9) - przy milionach
+      wartości kolizje są realne; jeśli to niedopuszczalne, użyj trybu
+      licznikowego z pseudonym_vault.
+    - Fałszywy PESEL/NIP/REGON ma poprawną sumę kontrolną, więc może
+      przypadkowo pokrywać się z prawdziwym numerem innej osoby.
+"""
+
+from datetime import date, timedelta
+from typing import Callable, Dict
+import hashlib
+import hmac
+
+from dane_bez_twarzy.core.config import EntityType
+
+# Alfabet Crockforda - bez liter mylonych z cyframi (I, L, O, U)
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Zakres dat urodzenia fałszywych numerów PESEL
+_PESEL_FIRST_DAY = date(1940, 1, 1)
+_PESEL_DAYS = (date(2009, 12, 31) - _PESEL_FIRST_DAY).days + 1
+
+_PESEL_WEIGHTS = (1, 3, 7, 9, 1, 3, 7, 9, 1, 3)
+_NIP_WEIGHTS = (6, 5, 7, 2, 3, 4, 5, 6, 7)
+_REGON_WEIGHTS = (8, 9, 2, 3, 4, 5, 6, 7)
+
+# Przestrzenie formatów o stałej strukturze
+_STRUCTURED_SIZES = {
+    EntityType.PESEL: _PESEL_DAYS * 10_000,
+    EntityType.NIP: 9 * 10 ** 8,
+    EntityType.REGON: 10 ** 8,
+    EntityType.PHONE: 10 ** 8,
+}
+
+
+class KeyedPseudonymizer:
+    """
+    Generator pseudonimów HMAC-SHA256 w czytelnych przestrzeniach per typ.
+    
+    Przykład użycia:
+        >>> pseudonymizer = KeyedPseudonymizer("tajny-klucz")
+        >>> pseudonymizer.pseudonym("Jan Kowalski", EntityType.PERSON)
+        'Osoba_JMEFMCNC'
+        >>> pseudonymizer.pseudonym("44051401359", EntityType.PESEL)
+        '80031804356'
+    """
+    
+    def __init__(self, key: str, prefix: str = "Osoba", length: int = 8):
+        """
+        Inicjalizacja generatora.
+        
+        Args:
+            key: Tajny klucz HMAC (wspólny dla wszystkich procesów).
+            prefix: Prefiks pseudonimów osób.
+            length: Liczba znaków kodu w pseudonimach tekstowych.
+        """
+        self._key = key.encode("utf-8")
+        self.prefix = prefix
+        self.length = length
+        
+        self._formatters: Dict[EntityType, Callable[[int, str], str]] = {
+            EntityType.PERSON: lambda n, code: f"{self.prefix}_{code}",
+            EntityType.ORGANIZATION: lambda n, code: f"Firma_{code}",
+            EntityType.LOCATION: lambda n, code: f"Miejscowosc_{code}",
+            EntityType.EMAIL: lambda n, code: f"{code.lower()}@example.com",
+            EntityType.USERNAME: lambda n, code: f"user_{code.lower()}",
+            EntityType.PESEL: lambda n, code: _fake_pesel(n),
+            EntityType.NIP: lambda n, code: _fake_nip(n),
+            EntityType.REGON: lambda n, code: _fake_regon(n),
+            EntityType.PHONE: lambda n, code: _fake_phone(n),
+        }
+    
+    def digest(self, value: str, entity_type: EntityType) -> int:
+        """Zwraca HMAC (typ, wartość) jako liczbę całkowitą."""
+        message = f"{entity_type.value}\x1f{value}".encode("utf-8")
+        return int.from_bytes(hmac.new(self._key, message, hashlib.sha256).digest(), "big")
+    
+    def pseudonym(self, value: str, entity_type: EntityType) -> str:
+        """
+        Zwraca pseudonim wartości.
+        
+        Args:
+            value: Oryginalna wartość.
+            entity_type: Typ encji (wyznacza przestrzeń pseudonimów).
+        
+        Returns:
+            Pseudonim - ten sam dla tej samej wartości, typu i klucza.
+        """
+        number = self.digest(value, entity_type)
+        code = _encode(number, self.length)
+        
+        formatter = self._formatters.get(entity_type)
+        if formatter is None:
+            return f"[{entity_type.value}_{code}]"
+        return formatter(number, code)
+    
+    def namespace_size(self, entity_type: EntityType) -> int:
+        """Zwraca liczbę możliwych pseudonimów danego typu."""
+        return _STRUCTURED_SIZES.get(entity_type, len(_ALPHABET) ** self.length)
+    
+    def collision_probability(self, count: int, entity_type: EntityType) -> float:
+        """
+        Szacuje prawdopodobieństwo co najmniej jednej kolizji.
+        
+        Args:
+            count: Liczba różnych wartości danego typu.
+            entity_type: Typ encji.
+        
+        Returns:
+            Przybliżenie z paradoksu urodzin (ograniczone do 1.0).
+        """
+        return min(1.0, count * (count - 1) / (2 * self.namespace_size(entity_type)))
+
+
+def _encode(number: int, length: int) -> str:
+    """Koduje najmłodsze bity liczby w alfabecie Crockforda."""
+    chars = []
+    for _ in range(length):
+        number, index = divmod(number, len(_ALPHABET))
+        chars.append(_ALPHABET[index])
+    return "".join(chars)
+
+
+def _fake_pesel(number: int) -> str:
+    """Buduje poprawny (z sumą kontrolną) PESEL z liczby."""
+    number, day = divmod(number, _PESEL_DAYS)
+    serial = number % 10_000
+    
+    born = _PESEL_FIRST_DAY + timedelta(days=day)
+    month = born.month + (20 if born.year >= 2000 else 0)
+    digits = f"{born.year % 100:02d}{month:02d}{born.day:02d}{serial:04d}"
+    
+    checksum = (10 - sum(int(d) * w for d, w in zip(digits, _PESEL_WEIGHTS)) % 10) % 10
+    return digits + str(checksum)
+
+
+def _fake_nip(number: int) -> str:
+    """Buduje poprawny NIP z liczby (pomija kombinacje z sumą kontrolną 10)."""
+    base = number % (9 * 10 ** 8)
+    while True:
+        digits = str(10 ** 8 + base)
+        checksum = sum(int(d) * w for d, w in zip(digits, _NIP_WEIGHTS)) % 11
+        if checksum != 10:
+            return digits + str(checksum)
+        base = (base + 1) % (9 * 10 ** 8)
+
+
+def _fake_regon(number: int) -> str:
+    """Buduje poprawny 9-cyfrowy REGON z liczby."""
+    digits = f"{number % 10 ** 8:08d}"
+    checksum = sum(int(d) * w for d, w in zip(digits, _REGON_WEIGHTS)) % 11
+    return digits + str(0 if checksum == 10 else checksum)
+
+
+def _fake_phone(number: int) -> str:
+    """Buduje numer telefonu komórkowego (prefiks 5xx) z liczby."""
+    digits = f"5{number % 10 ** 8:08d}"
+    return f"{digits[:3]} {digits[3:6]} {digits[6:]}"
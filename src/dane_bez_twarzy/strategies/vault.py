@@ -0,0 +1,205 @@
+"""
+Trwały magazyn pseudonimów (SQLite) współdzielony między uruchomieniami i procesami.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import hashlib
+import sqlite3
+import threading
+
+# Limit parametrów w jednym zapytaniu (SQLITE_MAX_VARIABLE_NUMBER w starszych wersjach)
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pseudonyms (
+    value_hash TEXT PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    pseudonym TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    entity_type TEXT PRIMARY KEY,
+    last INTEGER NOT NULL
+);
+"""
+
+
+class PseudonymVault:
+    """
+    Magazyn mapowań wartość -> pseudonim zapisany w bazie SQLite.
+    
+    Pseudonimy mają postać [TYP_n], gdzie n to kolejny numer w obrębie typu.
+    Ta sama wartość dostaje ten sam pseudonim we wszystkich uruchomieniach
+    i we wszystkich procesach korzystających z tego samego pliku:
+    - odczyty idą wsadowo (jedno zapytanie na maks. 500 wartości),
+    - nowe pseudonimy są przydzielane w transakcji BEGIN IMMEDIATE, więc
+      dwa procesy nie mogą przydzielić tego samego numeru ani dwóch różnych
+      pseudonimów tej samej wartości,
+    - ostatnio używane mapowania są trzymane w ograniczonym cache w pamięci.
+    
+    Baza nie przechowuje oryginalnych wartości - kluczem jest skrót SHA-256
+    (z opcjonalną solą).
+    
+    Przykład użycia:
+        >>> vault = PseudonymVault("pseudonimy.db")
+        >>> vault.get_or_create([("Jan Kowalski", "PERSON")])
+        {'Jan Kowalski': '[PERSON_1]'}
+    """
+    
+    def __init__(self, path: Union[str, Path], cache_size: int = 100_000,
+                 salt: Optional[str] = None, timeout: float = 60.0):
+        """
+        Inicjalizacja magazynu.
+        
+        Args:
+            path: Ścieżka do pliku bazy (tworzony, jeśli nie istnieje).
+            cache_size: Maksymalna liczba mapowań w cache w pamięci.
+            salt: Sól dodawana do wartości przed haszowaniem.
+            timeout: Czas oczekiwania na blokadę zapisu innego procesu (sekundy).
+        """
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self.salt = salt or ""
+        self.timeout = timeout
+        
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Otwiera połączenie i tworzy schemat."""
+        conn = sqlite3.connect(
+            str(self.path),
+            timeout=self.timeout,
+            isolation_level=None,  # Transakcje zarządzane ręcznie
+            check_same_thread=False
+        )
+        # WAL - czytelnicy nie blokują piszącego (i odwrotnie)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+    
+    def _hash(self, value: str) -> str:
+        """Zwraca klucz wartości w bazie."""
+        return hashlib.sha256((self.salt + value).encode("utf-8")).hexdigest()
+    
+    def get_or_create(self, items: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Zwraca pseudonimy wartości, przydzielając brakujące.
+        
+        Args:
+            items: Pary (wartość, typ encji). Nowe numery są przydzielane
+                w kolejności pierwszego wystąpienia.
+        
+        Returns:
+            Słownik wartość -> pseudonim.
+        """
+        result: Dict[str, str] = {}
+        pending: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()  # hash -> (wartość, typ)
+        seen = set()
+        
+        with self._lock:
+            for value, entity_type in items:
+                if value in seen:
+                    continue
+                seen.add(value)
+                
+                pseudonym = self._cache.get(value)
+                if pseudonym is not None:
+                    self._cache.move_to_end(value)
+                    result[value] = pseudonym
+                else:
+                    pending.setdefault(self._hash(value), (value, entity_type))
+            
+            if pending:
+                found = self._fetch(list(pending))
+                missing = [
+                    (value_hash, value, entity_type)
+                    for value_hash, (value, entity_type) in pending.items()
+                    if value_hash not in found
+                ]
+                if missing:
+                    found.update(self._insert(missing))
+                
+                for value_hash, (value, _) in pending.items():
+                    result[value] = found[value_hash]
+                    self._remember(value, found[value_hash])
+        
+        return result
+    
+    def _fetch(self, hashes: List[str]) -> Dict[str, str]:
+        """Odczytuje wsadowo istniejące mapowania."""
+        found = {}
+        for i in range(0, len(hashes), _BATCH_SIZE):
+            chunk = hashes[i:i + _BATCH_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT value_hash, pseudonym FROM pseudonyms WHERE value_hash IN ({placeholders})",
+                chunk
+            )
+            found.update(rows)
+        return found
+    
+    def _insert(self, missing: List[Tuple[str, str, str]]) -> Dict[str, str]:
+        """
+        Przydziela pseudonimy nowym wartościom w jednej transakcji zapisu.
+        
+        Inny proces mógł w międzyczasie dodać część wartości, więc po
+        uzyskaniu blokady są one odczytywane ponownie.
+        """
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            created = self._fetch([value_hash for value_hash, _, _ in missing])
+            counters = dict(conn.execute("SELECT entity_type, last FROM counters"))
+            touched = set()
+            rows = []
+            
+            for value_hash, _, entity_type in missing:
+                if value_hash in created:
+                    continue
+                counters[entity_type] = counters.get(entity_type, 0) + 1
+                touched.add(entity_type)
+                pseudonym = f"[{entity_type}_{counters[entity_type]}]"
+                created[value_hash] = pseudonym
+                rows.append((value_hash, entity_type, pseudonym))
+            
+            conn.executemany("INSERT INTO pseudonyms VALUES (?, ?, ?)", rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO counters VALUES (?, ?)",
+                [(entity_type, counters[entity_type]) for entity_type in touched]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        
+        return created
+    
+    def _remember(self, value: str, pseudonym: str) -> None:
+        """Dodaje mapowanie do cache w pamięci (LRU)."""
+        self._cache[value] = pseudonym
+        self._cache.move_to_end(value)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM pseudonyms").fetchone()[0]
+    
+    def close(self) -> None:
+        """Zamyka połączenie z bazą."""
+        self._conn.close()
+    
+    def __getstate__(self) -> dict:
+        # Połączenia i blokady nie są przenoszone do innych procesów
+        state = self.__dict__.copy()
+        del state["_conn"], state["_lock"]
+        state["_cache"] = OrderedDict()
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
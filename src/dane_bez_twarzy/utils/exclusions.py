@@ -0,0 +1,161 @@
+"""
+Szybkie sprawdzanie wykluczeń (config.exclusions).
+"""
+
+from typing import Dict, Iterable, List
+
+
+# Separator słów w automacie sufiksowym - nie występuje w zwykłym tekście
+_SEPARATOR = "\x00"
+
+
+class ExclusionMatcher:
+    """
+    Sprawdza, czy tekst encji koliduje z listą wykluczeń.
+    
+    Tekst jest wykluczony, jeśli zawiera któreś wykluczenie albo sam jest
+    fragmentem któregoś wykluczenia. Oba warunki są kompilowane raz:
+    - automat Aho-Corasick ze wszystkich wykluczeń ("wykluczenie w tekście"),
+    - automat sufiksowy ich złączenia ("tekst we wykluczeniu").
+    
+    Sprawdzenie encji zajmuje czas proporcjonalny do jej długości,
+    niezależnie od liczby wykluczeń.
+    """
+    
+    def __init__(self, exclusions: Iterable[str], case_sensitive: bool = False):
+        """
+        Inicjalizacja matchera.
+        
+        Args:
+            exclusions: Lista słów/fraz do wykluczenia.
+            case_sensitive: Czy porównanie uwzględnia wielkość liter.
+        """
+        self.case_sensitive = case_sensitive
+        words = [self._normalize(word) for word in exclusions]
+        
+        # Puste wykluczenie jest fragmentem każdego tekstu
+        self._match_all = any(word == "" for word in words)
+        words = [word for word in words if word]
+        
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[bool] = [False]
+        self._build_aho_corasick(words)
+        
+        self._suffix_next: List[Dict[str, int]] = [{}]
+        self._build_suffix_automaton(_SEPARATOR.join(words))
+    
+    def _normalize(self, text: str) -> str:
+        """Normalizuje wielkość liter zgodnie z konfiguracją."""
+        return text if self.case_sensitive else text.lower()
+    
+    def _build_aho_corasick(self, words: List[str]) -> None:
+        """Buduje automat Aho-Corasick (drzewo trie + linki porażki)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        
+        for word in words:
+            state = 0
+            for char in word:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    output.append(False)
+                state = next_state
+            output[state] = True
+        
+        # BFS po stanach - linki porażki rodzica są gotowe przed dziećmi
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] = output[next_state] or output[fail[next_state]]
+    
+    def _build_suffix_automaton(self, text: str) -> None:
+        """Buduje automat sufiksowy rozpoznający wszystkie podciągi tekstu."""
+        next_states = self._suffix_next
+        link: List[int] = [-1]
+        length: List[int] = [0]
+        last = 0
+        
+        for char in text:
+            current = len(next_states)
+            next_states.append({})
+            length.append(length[last] + 1)
+            link.append(0)
+            
+            state = last
+            while state != -1 and char not in next_states[state]:
+                next_states[state][char] = current
+                state = link[state]
+            
+            if state != -1:
+                target = next_states[state][char]
+                if length[state] + 1 == length[target]:
+                    link[current] = target
+                else:
+                    clone = len(next_states)
+                    next_states.append(dict(next_states[target]))
+                    length.append(length[state] + 1)
+                    link.append(link[target])
+                    
+                    while state != -1 and next_states[state].get(char) == target:
+                        next_states[state][char] = clone
+                        state = link[state]
+                    
+                    link[target] = clone
+                    link[current] = clone
+            
+            last = current
+    
+    def contains_exclusion(self, text: str) -> bool:
+        """Sprawdza czy tekst zawiera którekolwiek wykluczenie."""
+        if self._match_all:
+            return True
+        
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+        
+        return False
+    
+    def is_part_of_exclusion(self, text: str) -> bool:
+        """Sprawdza czy tekst jest fragmentem któregoś wykluczenia."""
+        if _SEPARATOR in text:
+            return False
+        
+        next_states = self._suffix_next
+        state = 0
+        
+        for char in text:
+            state = next_states[state].get(char, -1)
+            if state == -1:
+                return False
+        
+        return True
+    
+    def is_excluded(self, text: str) -> bool:
+        """
+        Sprawdza czy tekst jest na liście wykluczeń.
+        
+        Args:
+            text: Tekst do sprawdzenia.
+        
+        Returns:
+            True jeśli tekst powinien być wykluczony.
+        """
+        text = self._normalize(text)
+        return self.contains_exclusion(text) or self.is_part_of_exclusion(text)
@@ -2,8 +2,21 @@
 Wzorce regex dla wykrywania różnych typów danych.
 """
 
+import hashlib
+import json
 import re
-from typing import Dict
+from bisect import bisect_left
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from dane_bez_twarzy.utils.prefilter import PATTERN_REQUIREMENTS
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 
 class PolishPatterns:
@@ -171,6 +184,190 @@ class ValidationPatterns:
             return checksum % 10 == 0
         
         return luhn_checksum(number)
+    
+    @staticmethod
+    def validate_pesel_batch(candidates: Sequence[str]) -> List[bool]:
+        """
+        Wsadowa walidacja numerów PESEL.
+        
+        Args:
+            candidates: Kandydaci do walidacji.
+            
+        Returns:
+            Maska logiczna - True dla poprawnych numerów.
+        """
+        result, groups = _digit_groups(candidates, (11,), ValidationPatterns.validate_pesel)
+        
+        for positions, digits in groups:
+            checksum = (10 - (digits[:, :10] @ _PESEL_WEIGHTS) % 10) % 10
+            _scatter(result, positions, checksum == digits[:, 10])
+        
+        return result
+    
+    @staticmethod
+    def validate_nip_batch(candidates: Sequence[str]) -> List[bool]:
+        """
+        Wsadowa walidacja numerów NIP.
+        
+        Args:
+            candidates: Kandydaci do walidacji (mogą zawierać myślniki i spacje).
+            
+        Returns:
+            Maska logiczna - True dla poprawnych numerów.
+        """
+        result, groups = _digit_groups(
+            candidates, (10,), ValidationPatterns.validate_nip, strip_separators=True
+        )
+        
+        for positions, digits in groups:
+            checksum = (digits[:, :9] @ _NIP_WEIGHTS) % 11
+            _scatter(result, positions, checksum == digits[:, 9])
+        
+        return result
+    
+    @staticmethod
+    def validate_regon_batch(candidates: Sequence[str]) -> List[bool]:
+        """
+        Wsadowa walidacja numerów REGON.
+        
+        Args:
+            candidates: Kandydaci do walidacji.
+            
+        Returns:
+            Maska logiczna - True dla poprawnych numerów.
+        """
+        result, groups = _digit_groups(candidates, (9, 14), ValidationPatterns.validate_regon)
+        
+        for positions, digits in groups:
+            if digits.shape[1] == 14:
+                _scatter(result, positions, np.ones(len(positions), dtype=bool))
+                continue
+            
+            checksum = (digits[:, :8] @ _REGON_WEIGHTS) % 11
+            checksum[checksum == 10] = 0
+            _scatter(result, positions, checksum == digits[:, 8])
+        
+        return result
+    
+    @staticmethod
+    def validate_credit_card_batch(candidates: Sequence[str]) -> List[bool]:
+        """
+        Wsadowa walidacja numerów kart (algorytm Luhna).
+        
+        Args:
+            candidates: Kandydaci do walidacji (mogą zawierać myślniki i spacje).
+            
+        Returns:
+            Maska logiczna - True dla poprawnych numerów.
+        """
+        result, groups = _digit_groups(
+            candidates, tuple(range(13, 20)), ValidationPatterns.validate_credit_card,
+            strip_separators=True
+        )
+        
+        for positions, digits in groups:
+            length = digits.shape[1]
+            
+            # Co druga cyfra od prawej (zaczynając od przedostatniej) jest podwajana
+            doubled = digits[:, length - 2::-2] * 2
+            doubled -= 9 * (doubled > 9)
+            
+            checksum = digits[:, length - 1::-2].sum(axis=1) + doubled.sum(axis=1)
+            _scatter(result, positions, checksum % 10 == 0)
+        
+        return result
+    
+    @classmethod
+    def validate_batch(cls, entity_type: str, candidates: Sequence[str]) -> List[bool]:
+        """
+        Wsadowa walidacja kandydatów danego typu encji.
+        
+        Args:
+            entity_type: Typ encji (z EntityType enum).
+            candidates: Kandydaci do walidacji.
+            
+        Returns:
+            Maska logiczna. Typy bez walidatora są zawsze akceptowane.
+        """
+        batch_validators = {
+            "PESEL": cls.validate_pesel_batch,
+            "NIP": cls.validate_nip_batch,
+            "REGON": cls.validate_regon_batch,
+            "CREDIT_CARD": cls.validate_credit_card_batch,
+        }
+        
+        validator = batch_validators.get(getattr(entity_type, "value", entity_type))
+        if validator is None:
+            return [True] * len(candidates)
+        
+        return validator(candidates)
+
+
+_SEPARATORS = re.compile(r'[-\s]')
+
+if NUMPY_AVAILABLE:
+    _PESEL_WEIGHTS = np.array([1, 3, 7, 9, 1, 3, 7, 9, 1, 3], dtype=np.int64)
+    _NIP_WEIGHTS = np.array([6, 5, 7, 2, 3, 4, 5, 6, 7], dtype=np.int64)
+    _REGON_WEIGHTS = np.array([8, 9, 2, 3, 4, 5, 6, 7], dtype=np.int64)
+
+
+def _digit_groups(
+    candidates: Sequence[str],
+    lengths: Tuple[int, ...],
+    scalar_validator: Callable[[str], bool],
+    strip_separators: bool = False
+) -> Tuple[List[bool], Iterator[Tuple[List[int], "np.ndarray"]]]:
+    """
+    Przygotowuje kandydatów do walidacji wektorowej.
+    
+    Kandydaci z samych cyfr ASCII o dozwolonej długości są grupowani po
+    długości w macierze cyfr (jeden wiersz na kandydata). Pozostali są
+    od razu odrzucani, a nietypowe cyfry Unicode trafiają do walidatora
+    skalarnego. Bez NumPy wszyscy kandydaci są walidowani skalarnie.
+    
+    Returns:
+        Tuple (wstępna maska wyników, generator (pozycje, macierz cyfr)).
+    """
+    result = [False] * len(candidates)
+    
+    if not NUMPY_AVAILABLE:
+        for i, candidate in enumerate(candidates):
+            result[i] = _safe_validate(scalar_validator, candidate)
+        return result, iter(())
+    
+    grouped: Dict[int, Tuple[List[int], List[str]]] = {}
+    for i, candidate in enumerate(candidates):
+        digits = _SEPARATORS.sub('', candidate) if strip_separators else candidate
+        if len(digits) not in lengths or not digits.isdigit():
+            continue
+        if not digits.isascii():
+            result[i] = _safe_validate(scalar_validator, candidate)
+            continue
+        
+        positions, values = grouped.setdefault(len(digits), ([], []))
+        positions.append(i)
+        values.append(digits)
+    
+    def groups() -> Iterator[Tuple[List[int], "np.ndarray"]]:
+        for length, (positions, values) in grouped.items():
+            raw = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8)
+            yield positions, raw.reshape(-1, length).astype(np.int64) - ord("0")
+    
+    return result, groups()
+
+
+def _scatter(result: List[bool], positions: List[int], valid: "np.ndarray") -> None:
+    """Wpisuje wyniki walidacji grupy z powrotem na pozycje kandydatów."""
+    for position, is_valid in zip(positions, valid.tolist()):
+        result[position] = is_valid
+
+
+def _safe_validate(validator: Callable[[str], bool], candidate: str) -> bool:
+    """Walidacja skalarna - błąd (np. nietypowa cyfra) oznacza niepoprawny numer."""
+    try:
+        return validator(candidate)
+    except Exception:
+        return False
 
 
 def get_patterns_for_entity_type(entity_type: str) -> Dict[str, re.Pattern]:
@@ -200,3 +397,539 @@ def get_patterns_for_entity_type(entity_type: str) -> Dict[str, re.Pattern]:
     }
     
     return patterns_map.get(entity_type, {})
+
+
+class PatternEntry(NamedTuple):
+    """Pojedynczy wzorzec w zestawie wzorców."""
+    
+    entity_type: str
+    name: str
+    pattern: re.Pattern
+    builtin: bool = False
+    requires: int = 0  # Cechy tekstu wymagane do dopasowania (maska FEATURE_*)
+
+
+class PatternMatch(NamedTuple):
+    """Dopasowanie zwrócone przez zestaw wzorców."""
+    
+    entry: PatternEntry
+    start: int
+    end: int
+    text: str
+
+
+# Wzorce z wstecznymi odwołaniami lub nazwanymi grupami nie mogą być
+# bezpiecznie sklejone w jedną alternatywę (numeracja grup się przesuwa)
+_UNSAFE_TO_COMBINE = re.compile(r'\\\d|\(\?P[<=]')
+
+# Warunek wstępny dla wbudowanych wzorców: każdy z nich zaczyna się od cyfry,
+# "+" (telefon), "h" (URL) albo na granicy słowa. Sprawdzany raz na pozycję
+# pozwala pominąć środek słów bez próbowania każdej alternatywy z osobna.
+_BUILTIN_GUARD = r'(?=[\d+h]|\b[\w.%+-])'
+
+
+def _source(pattern: re.Pattern) -> str:
+    """Zwraca źródło wzorca jako str (także dla wzorców bajtowych)."""
+    source = pattern.pattern
+    return source.decode("ascii") if isinstance(source, bytes) else source
+
+
+class PatternSet:
+    """
+    Skompilowany zestaw wzorców skanowany w jednym przebiegu.
+    
+    Wszystkie wzorce są sklejane w jedną alternatywę z grupą na wzorzec,
+    więc tekst jest przeglądany raz, a typ dopasowania odczytywany jest
+    z numeru grupy. Kolejność wzorców wyznacza priorytet - przy kilku
+    dopasowaniach w tej samej pozycji wygrywa wcześniejszy wzorzec,
+    tak jak w deduplikacji encji o równej pewności.
+    
+    Wzorce, których nie da się bezpiecznie skleić (flagi, nazwane grupy,
+    wsteczne odwołania), skanowane są osobno.
+    """
+    
+    def __init__(self, entries: Iterable[PatternEntry]):
+        """
+        Inicjalizacja zestawu wzorców.
+        
+        Args:
+            entries: Wzorce w kolejności priorytetu.
+        """
+        self.entries: List[PatternEntry] = list(entries)
+        self._combined_entries: List[PatternEntry] = []
+        self._standalone_entries: List[PatternEntry] = []
+        
+        for entry in self.entries:
+            if self._can_combine(entry.pattern):
+                self._combined_entries.append(entry)
+            else:
+                self._standalone_entries.append(entry)
+        
+        self._combined: Optional[re.Pattern] = None
+        self._group_to_index: Dict[int, int] = {}
+        if self._combined_entries:
+            self._compile_combined()
+        
+        # Cechy tekstu, od których zależy którykolwiek wzorzec
+        self.required_features = 0
+        for entry in self.entries:
+            self.required_features |= entry.requires
+        
+        # Podzbiory wzorców dla masek cech (patrz for_features)
+        self._subsets: Dict[int, "PatternSet"] = {}
+    
+    @staticmethod
+    def _can_combine(pattern: re.Pattern) -> bool:
+        """Sprawdza czy wzorzec można dołączyć do wspólnej alternatywy."""
+        if pattern.flags & ~re.UNICODE:
+            return False
+        return not _UNSAFE_TO_COMBINE.search(_source(pattern))
+    
+    def _compile_combined(self) -> None:
+        """Kompiluje wspólną alternatywę dla sklejanych wzorców."""
+        parts = []
+        builtin_run: List[str] = []
+        
+        def flush_builtin_run() -> None:
+            if builtin_run:
+                parts.append(f"{_BUILTIN_GUARD}(?:{'|'.join(builtin_run)})")
+                builtin_run.clear()
+        
+        for i, entry in enumerate(self._combined_entries):
+            group = f"(?P<p{i}>{_source(entry.pattern)})"
+            if entry.builtin:
+                builtin_run.append(group)
+            else:
+                flush_builtin_run()
+                parts.append(group)
+        flush_builtin_run()
+        
+        combined = "|".join(parts)
+        if isinstance(self._combined_entries[0].pattern.pattern, bytes):
+            combined = combined.encode("ascii")
+        
+        try:
+            self._combined = re.compile(combined)
+        except re.error:
+            # Awaryjnie skanuj wszystko osobno
+            self._standalone_entries = self.entries
+            self._combined_entries = []
+            return
+        
+        self._group_to_index = {
+            self._combined.groupindex[f"p{i}"]: i
+            for i in range(len(self._combined_entries))
+        }
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def to_bytes(self) -> "PatternSet":
+        """
+        Zwraca ten sam zestaw skompilowany dla danych binarnych (bytes, mmap).
+        
+        Klasy znaków (\\d, \\w, \\s, \\b) obejmują wtedy tylko ASCII -
+        dopasowania w tekście UTF-8 są takie same jak w str, dopóki nie
+        sąsiadują ze znakami spoza ASCII (patrz core.mapped).
+        
+        Returns:
+            Zestaw wzorców bajtowych (te same nazwy, typy i priorytety).
+        
+        Raises:
+            ValueError: Gdy któryś wzorzec zawiera znaki spoza ASCII.
+        """
+        entries = []
+        for entry in self.entries:
+            source = _source(entry.pattern)
+            if not source.isascii():
+                raise ValueError(f"Wzorzec {entry.name} zawiera znaki spoza ASCII")
+            entries.append(entry._replace(
+                pattern=re.compile(source.encode("ascii"), entry.pattern.flags & ~re.UNICODE)
+            ))
+        return PatternSet(entries)
+    
+    def for_features(self, features: int) -> "PatternSet":
+        """
+        Zwraca podzbiór wzorców, które mogą pasować do tekstu o danych cechach.
+        
+        Podzbiory są kompilowane raz na maskę i zapamiętywane.
+        
+        Args:
+            features: Maska cech tekstu (z utils.prefilter.compute_features).
+            
+        Returns:
+            Zestaw wzorców bez rodzin, którym brakuje wymaganych cech.
+        """
+        key = features & self.required_features
+        subset = self._subsets.get(key)
+        
+        if subset is None:
+            active = [e for e in self.entries if e.requires & key == e.requires]
+            subset = self if len(active) == len(self.entries) else PatternSet(active)
+            self._subsets[key] = subset
+        
+        return subset
+    
+    def scan(
+        self,
+        text: str,
+        validate: Optional[Callable[[str, str], bool]] = None,
+        validate_batch: Optional[Callable[[List[PatternMatch]], List[bool]]] = None
+    ) -> List[PatternMatch]:
+        """
+        Skanuje tekst wszystkimi wzorcami.
+        
+        Args:
+            text: Tekst do analizy.
+            validate: Opcjonalna funkcja (typ, tekst) -> bool. Jeśli dopasowanie
+                nie przejdzie walidacji, w tej samej pozycji próbowane są
+                wzorce o niższym priorytecie.
+            validate_batch: Opcjonalna funkcja walidująca listę dopasowań naraz
+                (zwraca maskę logiczną). Wymaga `validate` - kandydaci są wtedy
+                zbierani jednym skanem i walidowani wsadowo, a `validate` służy
+                tylko do naprawy okolic odrzuconych kandydatów.
+            
+        Returns:
+            Lista dopasowań.
+        """
+        if validate is not None and validate_batch is not None:
+            return self._scan_with_batch_validation(text, validate, validate_batch)
+        
+        matches, _ = self._scan_combined(text, validate)
+        
+        for entry in self._standalone_entries:
+            for match in entry.pattern.finditer(text):
+                matched_text = match.group(0)
+                if validate is None or validate(entry.entity_type, matched_text):
+                    matches.append(PatternMatch(entry, match.start(), match.end(), matched_text))
+        
+        return matches
+    
+    def _scan_combined(
+        self,
+        text: str,
+        validate: Optional[Callable[[str, str], bool]],
+        pos: int = 0
+    ) -> Tuple[List[PatternMatch], List[int]]:
+        """
+        Skanuje tekst wspólną alternatywą.
+        
+        Returns:
+            Tuple (dopasowania, indeksy wzorców dopasowań).
+        """
+        matches: List[PatternMatch] = []
+        indexes: List[int] = []
+        
+        if self._combined is None:
+            return matches, indexes
+        
+        entries = self._combined_entries
+        group_to_index = self._group_to_index
+        search = self._combined.search
+        
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            
+            index = group_to_index[match.lastindex]
+            entry = entries[index]
+            matched_text = match.group()
+            start = match.start()
+            
+            if validate is None or validate(entry.entity_type, matched_text):
+                matches.append(PatternMatch(entry, start, match.end(), matched_text))
+                indexes.append(index)
+                # Puste dopasowanie nie może zatrzymać skanowania
+                pos = match.end() if match.end() > start else start + 1
+                continue
+            
+            fallback = self._match_fallback(text, start, index + 1, validate)
+            if fallback is not None:
+                matches.append(fallback)
+                indexes.append(entries.index(fallback.entry, index + 1))
+                pos = fallback.end if fallback.end > start else start + 1
+            else:
+                # Niepoprawne dopasowanie nie "zjada" tekstu - inne wzorce
+                # mogą zaczynać się wewnątrz niego
+                pos = start + 1
+        
+        return matches, indexes
+    
+    def _scan_with_batch_validation(
+        self,
+        text: str,
+        validate: Callable[[str, str], bool],
+        validate_batch: Callable[[List[PatternMatch]], List[bool]]
+    ) -> List[PatternMatch]:
+        """
+        Skanuje tekst, walidując kandydatów wsadowo.
+        
+        Faza 1 zbiera kandydatów bez walidacji, faza 2 waliduje ich naraz.
+        Odrzucony kandydat "zjadł" w fazie 1 tekst, w którym mogły zaczynać
+        się inne dopasowania - dlatego od jego pozycji skan jest powtarzany
+        z walidacją skalarną, aż natrafi na początek kandydata z fazy 1.
+        Od tego miejsca oba skany są identyczne, więc wynik jest taki sam
+        jak przy walidacji w trakcie skanowania.
+        """
+        candidates, indexes = self._scan_combined(text, None)
+        
+        standalone = [
+            PatternMatch(entry, match.start(), match.end(), match.group(0))
+            for entry in self._standalone_entries
+            for match in entry.pattern.finditer(text)
+        ]
+        
+        valid = validate_batch(candidates + standalone) if candidates or standalone else []
+        
+        combined_valid = valid[:len(candidates)]
+        if all(combined_valid):
+            matches = candidates
+        else:
+            matches = self._repair_rejected(text, candidates, indexes, combined_valid, validate)
+        
+        matches.extend(m for m, ok in zip(standalone, valid[len(candidates):]) if ok)
+        return matches
+    
+    def _repair_rejected(
+        self,
+        text: str,
+        candidates: List[PatternMatch],
+        indexes: List[int],
+        valid: List[bool],
+        validate: Callable[[str, str], bool]
+    ) -> List[PatternMatch]:
+        """Odtwarza wynik skanu sekwencyjnego wokół odrzuconych kandydatów."""
+        entries = self._combined_entries
+        group_to_index = self._group_to_index
+        search = self._combined.search
+        starts = [candidate.start for candidate in candidates]
+        
+        matches: List[PatternMatch] = []
+        i = 0
+        
+        while i < len(candidates):
+            candidate = candidates[i]
+            if valid[i]:
+                matches.append(candidate)
+                i += 1
+                continue
+            
+            # Odrzucony kandydat - wzorce o niższym priorytecie w tej samej pozycji
+            fallback = self._match_fallback(text, candidate.start, indexes[i] + 1, validate)
+            if fallback is not None:
+                matches.append(fallback)
+                pos = max(fallback.end, candidate.start + 1)
+            else:
+                pos = candidate.start + 1
+            i += 1
+            
+            # Skan sekwencyjny do synchronizacji z kandydatami z fazy 1
+            while True:
+                match = search(text, pos)
+                if match is None:
+                    return matches
+                
+                start = match.start()
+                i = bisect_left(starts, start, i)
+                if i < len(candidates) and starts[i] == start:
+                    break
+                
+                index = group_to_index[match.lastindex]
+                entry = entries[index]
+                matched_text = match.group()
+                
+                if validate(entry.entity_type, matched_text):
+                    matches.append(PatternMatch(entry, start, match.end(), matched_text))
+                    pos = max(match.end(), start + 1)
+                    continue
+                
+                fallback = self._match_fallback(text, start, index + 1, validate)
+                if fallback is not None:
+                    matches.append(fallback)
+                    pos = max(fallback.end, start + 1)
+                else:
+                    pos = start + 1
+        
+        return matches
+    
+    def match_at(
+        self,
+        text: str,
+        pos: int,
+        validate: Callable[[str, str], bool]
+    ) -> Optional[PatternMatch]:
+        """
+        Zwraca dopasowanie zaczynające się dokładnie w danej pozycji.
+        
+        Priorytety i walidacja jak w scan() - gdy wzorce skanują tekst
+        od tej pozycji, to dopasowanie zostałoby wybrane jako pierwsze.
+        
+        Args:
+            text: Tekst do analizy.
+            pos: Pozycja początku dopasowania.
+            validate: Funkcja (typ, tekst) -> bool.
+            
+        Returns:
+            Dopasowanie lub None.
+        """
+        if self._combined is None:
+            return None
+        
+        match = self._combined.match(text, pos)
+        if match is None:
+            return None
+        
+        index = self._group_to_index[match.lastindex]
+        entry = self._combined_entries[index]
+        if validate(entry.entity_type, match.group()):
+            return PatternMatch(entry, pos, match.end(), match.group())
+        return self._match_fallback(text, pos, index + 1, validate)
+    
+    def _match_fallback(
+        self,
+        text: str,
+        pos: int,
+        first_index: int,
+        validate: Callable[[str, str], bool]
+    ) -> Optional[PatternMatch]:
+        """Szuka poprawnego dopasowania wzorca o niższym priorytecie w danej pozycji."""
+        for entry in self._combined_entries[first_index:]:
+            match = entry.pattern.match(text, pos)
+            if match and validate(entry.entity_type, match.group(0)):
+                return PatternMatch(entry, match.start(), match.end(), match.group(0))
+        return None
+
+
+def build_pattern_set(
+    entity_types: Iterable[str],
+    custom_patterns: Optional[Dict[str, str]] = None
+) -> PatternSet:
+    """
+    Buduje zestaw wzorców dla podanych typów encji.
+    
+    Args:
+        entity_types: Typy encji (z EntityType enum) w kolejności priorytetu.
+        custom_patterns: Własne wzorce użytkownika (typ -> regex).
+        
+    Returns:
+        Skompilowany zestaw wzorców.
+    """
+    custom_patterns = custom_patterns or {}
+    entries = []
+    
+    for entity_type in entity_types:
+        type_value = getattr(entity_type, "value", entity_type)
+        
+        for pattern_name, pattern in get_patterns_for_entity_type(type_value).items():
+            entries.append(PatternEntry(
+                entity_type,
+                pattern_name,
+                pattern,
+                builtin=True,
+                requires=PATTERN_REQUIREMENTS.get(pattern_name, 0)
+            ))
+        
+        if type_value in custom_patterns:
+            entries.append(PatternEntry(
+                entity_type,
+                f"custom_{type_value}",
+                re.compile(custom_patterns[type_value])
+            ))
+    
+    return PatternSet(entries)
+
+
+# Współdzielony (w procesie) cache zestawów wzorców: odcisk -> PatternSet
+_PATTERN_SET_CACHE: "OrderedDict[str, PatternSet]" = OrderedDict()
+_PATTERN_SET_CACHE_SIZE = 64
+_PATTERN_SET_LOCK = Lock()
+
+
+def pattern_set_fingerprint(
+    entity_types: Iterable[str],
+    custom_patterns: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Zwraca stabilny odcisk opcji wpływających na zestaw wzorców.
+    
+    Kolejność typów encji jest zachowana (wyznacza priorytet wzorców),
+    kolejność własnych wzorców nie ma znaczenia.
+    
+    Args:
+        entity_types: Typy encji w kolejności priorytetu.
+        custom_patterns: Własne wzorce użytkownika (typ -> regex).
+        
+    Returns:
+        Skrót SHA-256 (hex).
+    """
+    payload = json.dumps(
+        [
+            [getattr(t, "value", t) for t in entity_types],
+            sorted((custom_patterns or {}).items()),
+        ],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_pattern_set(
+    entity_types: Iterable[str],
+    custom_patterns: Optional[Dict[str, str]] = None
+) -> PatternSet:
+    """
+    Zwraca skompilowany zestaw wzorców, budując go raz na konfigurację.
+    
+    Zestawy są współdzielone przez wszystkie detektory (i anonimizery)
+    w procesie o tym samym odcisku - kolejne instancje nie kompilują
+    ponownie wzorców wbudowanych ani własnych.
+    
+    Args:
+        entity_types: Typy encji (z EntityType enum) w kolejności priorytetu.
+        custom_patterns: Własne wzorce użytkownika (typ -> regex).
+        
+    Returns:
+        Skompilowany zestaw wzorców.
+    """
+    entity_types = list(entity_types)
+    key = pattern_set_fingerprint(entity_types, custom_patterns)
+    
+    with _PATTERN_SET_LOCK:
+        pattern_set = _PATTERN_SET_CACHE.get(key)
+        if pattern_set is not None:
+            _PATTERN_SET_CACHE.move_to_end(key)
+            return pattern_set
+    
+    # Kompilacja poza blokadą - w najgorszym razie dwa wątki zbudują ten sam zestaw
+    pattern_set = build_pattern_set(entity_types, custom_patterns)
+    
+    with _PATTERN_SET_LOCK:
+        pattern_set = _PATTERN_SET_CACHE.setdefault(key, pattern_set)
+        while len(_PATTERN_SET_CACHE) > _PATTERN_SET_CACHE_SIZE:
+            _PATTERN_SET_CACHE.popitem(last=False)
+    
+    return pattern_set
+
+
+def warm_pattern_cache(*configs) -> None:
+    """
+    Kompiluje z wyprzedzeniem zestawy wzorców dla podanych konfiguracji.
+    
+    Przydatne przy starcie serwera API - pierwsze żądanie nie płaci
+    kosztu kompilacji.
+    
+    Args:
+        configs: Obiekty AnonymizationConfig (domyślna konfiguracja, gdy brak).
+    """
+    if not configs:
+        from dane_bez_twarzy.core.config import AnonymizationConfig
+        configs = (AnonymizationConfig(),)
+    
+    for config in configs:
+        get_pattern_set(config.entities, config.custom_patterns)
+
+
+def clear_pattern_cache() -> None:
+    """Czyści współdzielony cache zestawów wzorców."""
+    with _PATTERN_SET_LOCK:
+        _PATTERN_SET_CACHE.clear()
@@ -0,0 +1,106 @@
+"""
+Tani filtr wstępny - pomija rodziny wzorców, które nie mogą pasować do tekstu.
+"""
+
+import re
+from typing import Dict
+
+
+# Cechy tekstu (bity maski)
+FEATURE_DIGIT = 1 << 0  # Co najmniej jedna cyfra
+FEATURE_DIGIT_RUN = 1 << 1  # Ciąg co najmniej 9 cyfr
+FEATURE_AT = 1 << 2  # Znak "@"
+FEATURE_URL = 1 << 3  # "://"
+FEATURE_BRACKET = 1 << 4  # Znak "["
+FEATURE_UPPER_RUN = 1 << 5  # Co najmniej 2 wielkie litery (A-Z) pod rząd
+FEATURE_ADDRESS = 1 << 6  # Słowa kluczowe adresu (ul., ulica, os., al., ...)
+
+ALL_FEATURES = (
+    FEATURE_DIGIT | FEATURE_DIGIT_RUN | FEATURE_AT | FEATURE_URL
+    | FEATURE_BRACKET | FEATURE_UPPER_RUN | FEATURE_ADDRESS
+)
+
+# Wyzwalacze cech FEATURE_BRACKET i FEATURE_ADDRESS - wspólne ze skanowaniem
+# bajtów w core.mapped (LINE_TRIGGERS), więc obie ścieżki sprawdzają te same linie
+BRACKET_TRIGGER = "["
+ADDRESS_TRIGGER = r'ul\.|ulica|os\.|osiedle|al\.|aleja'  # Bez rozróżniania wielkości liter
+
+_DIGIT = re.compile(r'\d')
+_DIGIT_RUN = re.compile(r'\d{9}')
+_UPPER_RUN = re.compile(r'[A-Z]{2}')
+_ADDRESS = re.compile(ADDRESS_TRIGGER, re.IGNORECASE)
+
+# Cechy wymagane przez wbudowane wzorce (nazwy jak w get_patterns_for_entity_type).
+# Wzorzec jest pomijany, jeśli tekstowi brakuje którejkolwiek z jego cech.
+PATTERN_REQUIREMENTS: Dict[str, int] = {
+    "pesel": FEATURE_DIGIT_RUN,
+    "nip": FEATURE_DIGIT,
+    "regon": FEATURE_DIGIT_RUN,
+    "id_card": FEATURE_UPPER_RUN | FEATURE_DIGIT,
+    "passport": FEATURE_UPPER_RUN | FEATURE_DIGIT,
+    "license_plate": FEATURE_UPPER_RUN,
+    "phone": FEATURE_DIGIT,
+    "email": FEATURE_AT,
+    "url": FEATURE_URL,
+    "ip": FEATURE_DIGIT,
+    "credit_card": FEATURE_DIGIT,
+    "bank_account": FEATURE_DIGIT,
+    "date": FEATURE_DIGIT,
+}
+
+
+def compute_features(text: str, wanted: int = ALL_FEATURES) -> int:
+    """
+    Oblicza maskę cech tekstu.
+    
+    Każda cecha to jedno szybkie wyszukiwanie w C (operator "in" lub prosty
+    regex), znacznie tańsze od pełnego zestawu wzorców.
+    
+    Args:
+        text: Tekst (lub fragment) do analizy.
+        wanted: Maska cech do obliczenia - pozostałe bity będą zerowe.
+    
+    Returns:
+        Maska bitowa cech FEATURE_*.
+    """
+    features = 0
+    
+    if wanted & (FEATURE_DIGIT | FEATURE_DIGIT_RUN) and _DIGIT.search(text):
+        features |= FEATURE_DIGIT
+        if wanted & FEATURE_DIGIT_RUN and _DIGIT_RUN.search(text):
+            features |= FEATURE_DIGIT_RUN
+    if wanted & FEATURE_AT and "@" in text:
+        features |= FEATURE_AT
+    if wanted & FEATURE_URL and "://" in text:
+        features |= FEATURE_URL
+    if wanted & FEATURE_BRACKET and BRACKET_TRIGGER in text:
+        features |= FEATURE_BRACKET
+    if wanted & FEATURE_UPPER_RUN and _UPPER_RUN.search(text):
+        features |= FEATURE_UPPER_RUN
+    if wanted & FEATURE_ADDRESS and _ADDRESS.search(text):
+        features |= FEATURE_ADDRESS
+    
+    return features
+
+
+class PrefilterStats:
+    """Liczniki skanów wykonanych i pominiętych przez filtr wstępny."""
+    
+    def __init__(self) -> None:
+        self.texts = 0
+        self.scans_run = 0
+        self.scans_skipped = 0
+    
+    def record(self, run: int, skipped: int) -> None:
+        """Rejestruje wynik filtra dla jednego tekstu."""
+        self.texts += 1
+        self.scans_run += run
+        self.scans_skipped += skipped
+    
+    def as_dict(self) -> Dict[str, int]:
+        """Zwraca liczniki jako słownik."""
+        return {
+            "texts": self.texts,
+            "scans_run": self.scans_run,
+            "scans_skipped": self.scans_skipped,
+        }
@@ -0,0 +1,96 @@
+"""
+Testy dla zwartej reprezentacji encji (EntityBatch).
+"""
+
+import pickle
+
+import pytest
+
+from dane_bez_twarzy.core.batch import EntityBatch
+from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
+from dane_bez_twarzy.core.detector import Entity, EntityDetector
+from dane_bez_twarzy.core.spans import resolve_overlaps
+from dane_bez_twarzy.strategies import MaskStrategy
+
+
+TEXT = "Kontakt: [name], jan@example.com, ul. Polna 5, PESEL 44051401359, anna@firma.pl"
+
+
+def _found(entities):
+    return [(e.type, e.text, e.start, e.end, e.confidence) for e in entities]
+
+
+def test_entity_has_slots():
+    """Entity nie ma słownika na instancję i daje się serializować."""
+    entity = Entity(text="Jan", type=EntityType.PERSON, start=0, end=3)
+    
+    assert not hasattr(entity, "__dict__")
+    assert pickle.loads(pickle.dumps(entity)) == entity
+    assert "Jan" in repr(entity)
+
+
+def test_batch_round_trip():
+    """Widok zgodności odtwarza te same encje."""
+    entities = EntityDetector(AnonymizationConfig()).detect(TEXT)
+    batch = EntityBatch.from_entities(TEXT, entities)
+    
+    assert len(batch) == len(entities)
+    assert batch.to_entities() == entities
+    assert batch[-1] == entities[-1]
+
+
+def test_batch_shares_metadata():
+    """Encje o identycznych metadanych współdzielą jeden słownik."""
+    entities = EntityDetector(AnonymizationConfig()).detect(TEXT)
+    batch = EntityBatch.from_entities(TEXT, entities)
+    emails = [e for e in batch if e.type == EntityType.EMAIL]
+    
+    assert len(emails) == 2
+    assert emails[0].metadata is emails[1].metadata
+    assert batch.detector(0) == "placeholder"
+
+
+def test_batch_keeps_text_different_from_source():
+    """Tekst encji różny od wycinka źródła jest zachowany."""
+    batch = EntityBatch("abcdef")
+    batch.append(0, 3, EntityType.PERSON, text="XYZ")
+    batch.append(3, 6, EntityType.PERSON)
+    
+    assert [batch.text(i) for i in range(len(batch))] == ["XYZ", "def"]
+    assert batch.select([1, 0]).text(1) == "XYZ"
+
+
+def test_batch_resolve_overlaps_matches_list_version():
+    """Deduplikacja na tablicach daje ten sam wynik co na liście encji."""
+    source = "x" * 40
+    entities = [
+        Entity(source[s:e], EntityType.PERSON, s, e, c)
+        for s, e, c in [(0, 10, 0.6), (5, 15, 0.7), (12, 20, 0.8), (18, 30, 0.8), (31, 35, 0.5)]
+    ]
+    
+    batch = EntityBatch.from_entities(source, entities).resolve_overlaps()
+    
+    assert batch.to_entities() == resolve_overlaps(entities)
+
+
+def test_detect_batch_matches_detect():
+    """detect_batch zwraca te same encje co detect."""
+    config = AnonymizationConfig(exclusions=["firma.pl"])
+    detector = EntityDetector(config)
+    
+    assert _found(detector.detect_batch(TEXT)) == _found(detector.detect(TEXT))
+    assert len(detector.detect_batch("")) == 0
+
+
+def test_strategy_accepts_batch():
+    """Strategie przyjmują EntityBatch zamiast listy encji."""
+    detector = EntityDetector(AnonymizationConfig())
+    strategy = MaskStrategy(AnonymizationConfig())
+    
+    expected = strategy.anonymize(TEXT, detector.detect(TEXT))
+    
+    assert strategy.anonymize(TEXT, detector.detect_batch(TEXT)) == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
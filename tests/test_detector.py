@@ -0,0 +1,158 @@
+"""
+Testy dla modułu wykrywania encji.
+"""
+
+import pytest
+
+from dane_bez_twarzy.core.anonymizer import Anonymizer
+from dane_bez_twarzy.core.cache import DetectionCache
+from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
+from dane_bez_twarzy.core.detector import EntityDetector
+from dane_bez_twarzy.utils.exclusions import ExclusionMatcher
+
+
+TEXT = "Kontakt: [name], jan@example.com, ul. Polna 5, PESEL 44051401359"
+
+
+def _found(entities):
+    return [(e.type, e.text, e.start, e.end) for e in entities]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_detectors_match_sequential(executor):
+    """Tryb równoległy daje ten sam wynik co sekwencyjny."""
+    sequential = EntityDetector(AnonymizationConfig())
+    parallel = EntityDetector(AnonymizationConfig(
+        parallel_detectors=True,
+        detector_executor=executor,
+        detector_workers=2
+    ))
+    
+    try:
+        assert _found(parallel.detect(TEXT)) == _found(sequential.detect(TEXT))
+    finally:
+        parallel.close()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_anonymizer_context_closes_detector_pool(executor):
+    """Wyjście z bloku with zamyka pulę detektorów anonimizera."""
+    config = AnonymizationConfig(
+        method="redact",
+        parallel_detectors=True,
+        detector_executor=executor,
+        detector_workers=2
+    )
+    
+    with Anonymizer(config) as anonymizer:
+        anonymizer.anonymize_text(TEXT)
+        pool = anonymizer.detector._executor
+        assert pool is not None
+    
+    assert anonymizer.detector._executor is None
+    with pytest.raises(RuntimeError):
+        pool.submit(len, "")
+
+
+def test_invalid_detector_executor():
+    """Test walidacji rodzaju puli."""
+    with pytest.raises(ValueError):
+        AnonymizationConfig(detector_executor="gpu")
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("Urząd Skarbowy", True),          # wykluczenie jest fragmentem tekstu
+    ("Skarbowy", True),                # tekst jest fragmentem wykluczenia
+    ("SĄD REJONOWY w Poznaniu", True),  # bez rozróżniania wielkości liter
+    ("Jan Kowalski", False),
+])
+def test_exclusion_matcher(text, expected):
+    """Test dwukierunkowego sprawdzania wykluczeń."""
+    matcher = ExclusionMatcher(["urząd skarbowy", "Sąd Rejonowy"])
+    
+    assert matcher.is_excluded(text) is expected
+
+
+def test_exclusion_matcher_case_sensitive():
+    """Test wykluczeń z rozróżnianiem wielkości liter."""
+    matcher = ExclusionMatcher(["ZUS"], case_sensitive=True)
+    
+    assert matcher.is_excluded("ZUS Oddział")
+    assert not matcher.is_excluded("zus")
+
+
+def test_detector_applies_exclusions():
+    """Wykluczone encje nie trafiają do wyniku."""
+    config = AnonymizationConfig(exclusions=["example.com"])
+    detector = EntityDetector(config)
+    
+    texts = [e.text for e in detector.detect("jan@example.com, anna@firma.pl")]
+    
+    assert texts == ["anna@firma.pl"]
+
+
+def test_detection_cache_hit_skips_detectors(monkeypatch):
+    """Powtórzony tekst jest obsługiwany z cache bez uruchamiania detektorów."""
+    detector = EntityDetector(AnonymizationConfig())
+    first = detector.detect(TEXT)
+    
+    def fail(text):
+        raise AssertionError("detektor nie powinien zostać uruchomiony")
+    
+    monkeypatch.setattr(detector.regex_detector, "detect", fail)
+    second = detector.detect(TEXT)
+    
+    assert _found(second) == _found(first)
+    stats = detector.get_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_detection_cache_disabled():
+    """detection_cache_size=0 wyłącza cache."""
+    detector = EntityDetector(AnonymizationConfig(detection_cache_size=0))
+    
+    detector.detect(TEXT)
+    
+    assert detector.detection_cache is None
+    assert detector.get_cache_stats() == {}
+
+
+def test_detection_cache_lru_eviction():
+    """Cache usuwa najdawniej używane wpisy po przekroczeniu limitów."""
+    cache = DetectionCache(max_entries=2)
+    cache.put("a", [])
+    cache.put("b", [])
+    cache.get("a")
+    cache.put("c", [])
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+    assert cache.stats()["evictions"] == 1
+    
+    small = DetectionCache(max_entries=100, max_bytes=1000)
+    for key in range(10):
+        small.put(key, [])
+    
+    assert small.stats()["bytes"] <= 1000
+    assert len(small) < 10
+
+
+def test_detection_fingerprint():
+    """Odcisk zależy tylko od opcji detekcji."""
+    base = AnonymizationConfig()
+    
+    assert base.detection_fingerprint() == AnonymizationConfig(method="redact").detection_fingerprint()
+    assert base.detection_fingerprint() != AnonymizationConfig(exclusions=["x"]).detection_fingerprint()
+
+
+def test_detection_fingerprint_keeps_entity_order():
+    """Kolejność typów encji (priorytet wzorców) zmienia odcisk."""
+    first = AnonymizationConfig(entities=[EntityType.PHONE, EntityType.PESEL])
+    second = AnonymizationConfig(entities=[EntityType.PESEL, EntityType.PHONE])
+    
+    assert first.detection_fingerprint() != second.detection_fingerprint()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,142 @@
+"""
+Testy anonimizacji plików tabelarycznych (CSV).
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from dane_bez_twarzy.core.anonymizer import Anonymizer
+from dane_bez_twarzy.core.config import AnonymizationConfig
+from dane_bez_twarzy.processors import ExcelProcessor
+
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows, columns=["kontakt", "miasto", "kwota"]).to_csv(path, index=False)
+
+
+def test_column_values_are_detected_once(tmp_path, monkeypatch):
+    """Powtarzające się wartości kolumny przechodzą przez detekcję raz."""
+    source = tmp_path / "crm.csv"
+    _write_csv(source, [
+        [f"jan{i % 3}@example.com", "Kraków", i] for i in range(300)
+    ] + [[None, None, 0]])
+    anonymizer = Anonymizer(AnonymizationConfig(method="pseudonymize", detection_cache_size=0))
+    
+    detected = []
+    detect = anonymizer.detector.detect
+    monkeypatch.setattr(
+        anonymizer.detector, "detect",
+        lambda text, use_cache=True: detected.append(text) or detect(text, use_cache)
+    )
+    
+    output = anonymizer.anonymize_file(source, tmp_path / "wynik.csv")
+    result = pd.read_csv(output)
+    
+    assert sorted(detected) == ["Kraków", "jan0@example.com", "jan1@example.com", "jan2@example.com"]
+    assert result["kontakt"].nunique() == 3
+    assert "jan0@example.com" not in set(result["kontakt"].dropna())
+    assert result["kontakt"][0] == result["kontakt"][3]
+    assert pd.isna(result["kontakt"].iloc[-1])
+    assert list(result["kwota"]) == list(range(300)) + [0]
+
+
+def test_column_engine_matches_row_by_row(tmp_path):
+    """Wynik i raport są takie same jak przy anonimizacji komórka po komórce."""
+    source = tmp_path / "crm.csv"
+    rows = [[f"tel. 123-456-78{i % 4}, anna{i % 5}@example.com", "Gdańsk", i] for i in range(40)]
+    _write_csv(source, rows)
+    
+    anonymizer = Anonymizer(AnonymizationConfig(method="pseudonymize"))
+    result = anonymizer.anonymize_file(source, tmp_path / "wynik.csv", return_result=True)
+    
+    reference = Anonymizer(AnonymizationConfig(method="pseudonymize"))
+    expected = [reference.anonymize_text(row[0]) for row in rows]
+    
+    assert list(pd.read_csv(result.output_path)["kontakt"]) == expected
+    assert len(result.entities) == 80
+    assert result.segment_count == 80
+
+
+def test_object_column_values_equal_as_numbers_stay_distinct():
+    """Wartości 1, 1.0 i True w kolumnie object są anonimizowane jak osobne komórki."""
+    column = pd.Series([1, 1.0, True, None, "jan@example.com", 1], dtype=object)
+    anonymizer = Anonymizer(AnonymizationConfig(method="redact"))
+    
+    result = ExcelProcessor()._anonymize_column(column, anonymizer)
+    
+    assert list(result[:3]) == ["1", "1.0", "True"]
+    assert pd.isna(result[3])
+    assert list(result[4:]) == ["[USUNIĘTO]", "1"]
+
+
+@pytest.mark.parametrize("method", ["pseudonymize", "hash"])
+def test_csv_chunks_match_whole_file(tmp_path, method):
+    """Plik CSV czytany fragmentami daje ten sam wynik co w całości (spójne pseudonimy)."""
+    source = tmp_path / "crm.csv"
+    _write_csv(source, [
+        [f"jan{i % 7}@example.com, tel. 123-456-78{i % 3}", f"Miasto {i % 4}", i] for i in range(250)
+    ])
+    
+    whole = Anonymizer(AnonymizationConfig(method=method, stream_threshold=None))
+    chunked = Anonymizer(AnonymizationConfig(method=method, stream_threshold=0, stream_csv_rows=40))
+    
+    expected = whole.anonymize_file(source, tmp_path / "whole.csv")
+    output = chunked.anonymize_file(source, tmp_path / "chunked.csv", return_result=True)
+    
+    assert output.output_path.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+    assert len(output.entities) == 500
+
+
+def test_csv_chunks_keep_column_types_across_chunks(tmp_path):
+    """Kolumna z samymi cyframi w pierwszym fragmencie jest anonimizowana we wszystkich."""
+    source = tmp_path / "kadry.csv"
+    _write_csv(source, [["44051401359", "Kraków", i] for i in range(40)] + [
+        ["tel. 123-456-789", "Kraków", i] for i in range(40, 80)
+    ])
+    
+    whole = Anonymizer(AnonymizationConfig(method="redact", stream_threshold=None))
+    chunked = Anonymizer(AnonymizationConfig(method="redact", stream_threshold=0, stream_csv_rows=40))
+    
+    expected = whole.anonymize_file(source, tmp_path / "whole.csv")
+    output = chunked.anonymize_file(source, tmp_path / "chunked.csv")
+    
+    assert "44051401359" not in output.read_text(encoding="utf-8")
+    assert output.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+
+
+def test_column_profile_skips_pii_free_columns(tmp_path, monkeypatch):
+    """Profil kolumn: kolumna bez encji jest pomijana, kolumna e-maili sprawdzana samym wzorcem."""
+    source = tmp_path / "kadry.csv"
+    pd.DataFrame({
+        "email": [f"jan{i}@example.com" for i in range(60)],
+        "status": ["aktywny", "zamknięty", "zawieszony"] * 20,
+        "notatka": [f"Kontakt: tel. 600-100-{i:03d}" for i in range(60)],
+    }).to_csv(source, index=False)
+    
+    anonymizer = Anonymizer(AnonymizationConfig(
+        method="redact", profile_columns=True, profile_sample_rows=10, detection_cache_size=0
+    ))
+    detected = []
+    detect = anonymizer.detector.detect
+    monkeypatch.setattr(
+        anonymizer.detector, "detect",
+        lambda text, use_cache=True: detected.append(text) or detect(text, use_cache)
+    )
+    
+    result = anonymizer.anonymize_file(source, tmp_path / "wynik.csv", return_result=True)
+    output = pd.read_csv(result.output_path)
+    profiles = {p["column"]: p for p in anonymizer.report_from_result(result)["column_profiles"]}
+    
+    assert profiles["email"]["kind"] == "uniform" and profiles["email"]["entity_type"] == "EMAIL"
+    assert profiles["status"]["kind"] == "pii_free"
+    assert profiles["notatka"]["kind"] == "free_text"
+    # Poza próbką detekcja działa tylko dla kolumny z tekstem
+    assert len(detected) == 3 * 10 + 60
+    assert set(output["email"]) == {"[USUNIĘTO]"}
+    assert list(output["status"]) == ["aktywny", "zamknięty", "zawieszony"] * 20
+    assert output["notatka"][0] == "Kontakt: tel. [USUNIĘTO]"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
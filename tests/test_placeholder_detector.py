@@ -0,0 +1,44 @@
+"""
+Testy dla detektora placeholderów.
+"""
+
+import pytest
+
+from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
+from dane_bez_twarzy.detectors.placeholder_detector import PlaceholderDetector
+
+
+def test_detects_placeholder_variants():
+    """Test wykrywania wariantów placeholderów (wielkość liter, separatory)."""
+    detector = PlaceholderDetector(AnonymizationConfig())
+    text = "[Credit Card Number] [e_mail] [first name] [nieznany]"
+    
+    found = [(e.type, e.text) for e in detector.detect(text)]
+    
+    assert found == [
+        (EntityType.CREDIT_CARD, "[Credit Card Number]"),
+        (EntityType.EMAIL, "[e_mail]"),
+        (EntityType.PERSON, "[first name]"),
+    ]
+
+
+def test_respects_configured_entities():
+    """Test pomijania placeholderów typów spoza konfiguracji."""
+    detector = PlaceholderDetector(AnonymizationConfig(entities=[EntityType.PESEL]))
+    
+    entities = detector.detect("[name] [pesel] [email]")
+    
+    assert [e.text for e in entities] == ["[pesel]"]
+    assert entities[0].metadata["pattern"] == r"\[pesel\]"
+
+
+def test_matcher_is_shared_between_detectors():
+    """Wyrażenie jest kompilowane raz dla danego zestawu typów."""
+    first = PlaceholderDetector(AnonymizationConfig())
+    second = PlaceholderDetector(AnonymizationConfig())
+    
+    assert first._regex is second._regex
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,176 @@
+"""
+Testy dla detektora regex.
+"""
+
+import pytest
+
+from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
+from dane_bez_twarzy.detectors.regex_detector import RegexDetector
+from dane_bez_twarzy.utils.patterns import (
+    ValidationPatterns,
+    build_pattern_set,
+    clear_pattern_cache,
+    get_pattern_set,
+    pattern_set_fingerprint,
+    warm_pattern_cache,
+)
+from dane_bez_twarzy.utils.prefilter import (
+    FEATURE_AT,
+    FEATURE_DIGIT,
+    FEATURE_DIGIT_RUN,
+    compute_features,
+)
+
+
+def _found(entities):
+    return [(e.type, e.text) for e in entities]
+
+
+def test_single_pass_detects_multiple_types():
+    """Test wykrywania wielu typów jednym skanem."""
+    config = AnonymizationConfig(
+        entities=[EntityType.EMAIL, EntityType.PESEL, EntityType.URL]
+    )
+    detector = RegexDetector(config)
+    text = "Email: jan@example.com, PESEL: 44051401359, strona https://example.com"
+    
+    found = _found(detector.detect(text))
+    
+    assert (EntityType.EMAIL, "jan@example.com") in found
+    assert (EntityType.PESEL, "44051401359") in found
+    assert (EntityType.URL, "https://example.com") in found
+
+
+def test_invalid_match_does_not_hide_other_patterns():
+    """Niepoprawny NIP nie może zasłonić telefonu zaczynającego się w jego środku."""
+    detector = RegexDetector(AnonymizationConfig())
+    
+    found = _found(detector.detect("NIP 779 100 77 71 tel"))
+    
+    assert (EntityType.PHONE, "79 100 77 71") in found
+    assert all(entity_type != EntityType.NIP for entity_type, _ in found)
+
+
+def test_custom_patterns_are_part_of_pattern_set():
+    """Test własnych wzorców użytkownika."""
+    config = AnonymizationConfig(
+        entities=[EntityType.USERNAME, EntityType.SECRET],
+        custom_patterns={
+            "USERNAME": r"@[a-z]+",
+            "SECRET": r"(?i)haslo=\S+",
+        }
+    )
+    detector = RegexDetector(config)
+    
+    found = _found(detector.detect("konto @kowalski, HASLO=tajne123"))
+    
+    assert found == [
+        (EntityType.USERNAME, "@kowalski"),
+        (EntityType.SECRET, "HASLO=tajne123"),
+    ]
+
+
+def test_pattern_set_priority_follows_entity_order():
+    """Przy dopasowaniach w tej samej pozycji wygrywa wcześniejszy typ."""
+    pattern_set = build_pattern_set(["PHONE", "PESEL"])
+    
+    matches = pattern_set.scan("44051401359")
+    
+    assert [m.entry.entity_type for m in matches] == ["PHONE"]
+
+
+def test_compute_features():
+    """Test maski cech tekstu."""
+    features = compute_features("tel 123 456 789, jan@example.com")
+    
+    assert features & FEATURE_DIGIT
+    assert features & FEATURE_AT
+    assert not features & FEATURE_DIGIT_RUN
+
+
+def test_prefilter_skips_families_without_features():
+    """Tekst bez cyfr i "@" nie jest skanowany wzorcami cyfrowymi ani emailem."""
+    config = AnonymizationConfig(entities=[EntityType.EMAIL, EntityType.PESEL, EntityType.PHONE])
+    detector = RegexDetector(config)
+    
+    assert detector.detect("Zwykły akapit bez danych osobowych.") == []
+    assert detector.prefilter_stats.as_dict() == {
+        "texts": 1,
+        "scans_run": 0,
+        "scans_skipped": 3,
+    }
+    
+    found = _found(detector.detect("mail: jan@example.com"))
+    assert found == [(EntityType.EMAIL, "jan@example.com")]
+    assert detector.prefilter_stats.scans_skipped == 5
+
+
+@pytest.mark.parametrize("entity_type,candidates", [
+    ("PESEL", ["44051401359", "44051401358", "4405140135", "4405140135a"]),
+    ("NIP", ["526-000-12-46", "5260001246", "526 000 12 47", "123"]),
+    ("REGON", ["123456785", "123456786", "12345678512347", "12345678"]),
+    ("CREDIT_CARD", ["4111 1111 1111 1111", "4111-1111-1111-1112", "4111111111111", "41"]),
+])
+def test_batch_validation_matches_scalar(entity_type, candidates):
+    """Walidacja wsadowa daje te same wyniki co walidacja pojedyncza."""
+    scalar = {
+        "PESEL": ValidationPatterns.validate_pesel,
+        "NIP": ValidationPatterns.validate_nip,
+        "REGON": ValidationPatterns.validate_regon,
+        "CREDIT_CARD": ValidationPatterns.validate_credit_card,
+    }[entity_type]
+    
+    expected = [scalar(c) for c in candidates]
+    
+    assert ValidationPatterns.validate_batch(entity_type, candidates) == expected
+    assert any(expected) and not all(expected)
+
+
+def test_batch_validation_without_validator_accepts_all():
+    """Typy bez walidatora są zawsze akceptowane."""
+    assert ValidationPatterns.validate_batch("EMAIL", ["a@b.pl", "x"]) == [True, True]
+
+
+def test_bulk_validation_scan_matches_inline_validation():
+    """Skan z walidacją wsadową daje ten sam wynik co walidacja w trakcie skanu."""
+    detector = RegexDetector(AnonymizationConfig())
+    text = "NIP 779 100 77 71 tel, PESEL 44051401359, 44051401358, karta 4111 1111 1111 1111"
+    
+    inline = detector.pattern_set.scan(text, detector._validate)
+    bulk = detector.pattern_set.scan(text, detector._validate, detector._validate_batch)
+    
+    assert bulk == inline
+
+
+def test_pattern_set_shared_between_detectors():
+    """Detektory o tej samej konfiguracji współdzielą skompilowany zestaw wzorców."""
+    config = AnonymizationConfig(custom_patterns={"USERNAME": r"@\w+"})
+    
+    first = RegexDetector(config)
+    second = RegexDetector(AnonymizationConfig(custom_patterns={"USERNAME": r"@\w+"}))
+    
+    assert first.pattern_set is second.pattern_set
+    assert RegexDetector(AnonymizationConfig()).pattern_set is not first.pattern_set
+
+
+def test_pattern_set_fingerprint_respects_priority():
+    """Odcisk zależy od kolejności typów, ale nie od kolejności własnych wzorców."""
+    assert pattern_set_fingerprint(["PHONE", "PESEL"]) != pattern_set_fingerprint(["PESEL", "PHONE"])
+    assert (
+        pattern_set_fingerprint(["PHONE"], {"A": "a", "B": "b"})
+        == pattern_set_fingerprint(["PHONE"], {"B": "b", "A": "a"})
+    )
+
+
+def test_warm_pattern_cache():
+    """Rozgrzanie cache kompiluje zestaw przed pierwszym użyciem."""
+    clear_pattern_cache()
+    config = AnonymizationConfig(entities=[EntityType.EMAIL])
+    
+    warm_pattern_cache(config)
+    
+    assert RegexDetector(config).pattern_set is get_pattern_set(config.entities)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
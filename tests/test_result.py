@@ -0,0 +1,51 @@
+"""
+Testy wyniku anonimizacji (AnonymizationResult) i raportu bez ponownej detekcji.
+"""
+
+import pytest
+
+from dane_bez_twarzy.core.anonymizer import Anonymizer
+from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
+from dane_bez_twarzy.core.result import AnonymizationResult
+
+
+TEXT = "Kontakt:\nemail: jan@example.com, tel. 123-456-789"
+
+
+def test_anonymize_text_returns_result():
+    """Wynik zawiera zanonimizowany tekst i wykryte encje."""
+    anonymizer = Anonymizer(AnonymizationConfig(method="redact"))
+    
+    result = anonymizer.anonymize_text(TEXT, return_result=True)
+    
+    assert isinstance(result, AnonymizationResult)
+    assert result.text == anonymizer.anonymize_text(TEXT)
+    assert EntityType.EMAIL in {entity.type for entity in result.entities}
+    
+    email = next(r for r in result.entity_records() if r["type"] == "EMAIL")
+    assert (email["line"], email["column"]) == (2, 8)
+
+
+def test_report_from_file_result_skips_detection(tmp_path, monkeypatch):
+    """Raport z wyniku anonymize_file nie uruchamia detekcji ponownie."""
+    source = tmp_path / "akta.txt"
+    source.write_text(TEXT, encoding="utf-8")
+    anonymizer = Anonymizer(AnonymizationConfig())
+    
+    result = anonymizer.anonymize_file(source, return_result=True)
+    
+    def fail(text):
+        raise AssertionError("detekcja nie powinna zostać uruchomiona")
+    
+    monkeypatch.setattr(anonymizer.detector, "detect", fail)
+    report = anonymizer.report_from_result(result, tmp_path / "raport.json", execution_time=0.5)
+    
+    assert result.output_path.exists()
+    assert report["file_stats"] == {"filename": "akta.txt", "line_count": 2, "character_count": len(TEXT)}
+    assert report["total_entities"] == len(result.entities)
+    assert report["entities_by_type"]["EMAIL"] == 1
+    assert (tmp_path / "raport.json").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
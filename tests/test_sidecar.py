@@ -0,0 +1,128 @@
+"""
+Testy zapisu detekcji (wykryj raz, renderuj wielokrotnie).
+"""
+
+import pytest
+
+from dane_bez_twarzy.core.anonymizer import Anonymizer
+from dane_bez_twarzy.core.config import AnonymizationConfig, EntityType
+from dane_bez_twarzy.core.detector import Entity
+from dane_bez_twarzy.core.sidecar import DetectionSidecar, DetectionStore, file_sha256
+
+
+TEXT = "Kontakt: jan@example.com, tel. 123-456-789"
+
+
+def test_sidecar_round_trip(tmp_path):
+    """Zapisane encje są odtwarzane z pliku bez zmian."""
+    entities = [
+        Entity("jan@example.com", EntityType.EMAIL, 9, 24, 1.0, {"detector": "regex", "pattern": "email"}),
+        Entity("123-456-789", EntityType.PHONE, 31, 42, 0.9, {"detector": "regex", "pattern": "phone"}),
+    ]
+    sidecar = DetectionSidecar("abc")
+    sidecar.record(TEXT, entities)
+    
+    loaded = DetectionSidecar.load(sidecar.save(tmp_path / "abc.detections.json"))
+    
+    assert loaded.entities_for(TEXT) == entities
+    assert loaded.entities_for(TEXT)[1].metadata == {"detector": "regex", "pattern": "phone"}
+    assert loaded.entities_for("inny tekst") is None
+
+
+def test_store_is_content_addressed(tmp_path):
+    """Zapis jest wyszukiwany po skrócie treści, nie po nazwie pliku."""
+    first = tmp_path / "a.txt"
+    second = tmp_path / "b.txt"
+    first.write_text(TEXT, encoding="utf-8")
+    second.write_text(TEXT, encoding="utf-8")
+    store = DetectionStore(tmp_path / "detekcje")
+    fingerprint = AnonymizationConfig().detection_fingerprint()
+    
+    store.save(DetectionSidecar(file_sha256(first), fingerprint))
+    
+    assert store.load(file_sha256(second), fingerprint) is not None
+    assert store.load("0" * 64, fingerprint) is None
+    # Inne opcje detekcji - inny zapis
+    assert store.load(file_sha256(second), "0" * 64) is None
+
+
+def test_second_render_skips_detection(tmp_path, monkeypatch):
+    """Kolejna metoda anonimizacji tego samego pliku nie uruchamia detekcji."""
+    source = tmp_path / "akta.txt"
+    source.write_text(TEXT + "\n\nE-mail: anna@example.com", encoding="utf-8")
+    store = str(tmp_path / "detekcje")
+    
+    masked = Anonymizer(
+        AnonymizationConfig(method="mask", detection_store=store)
+    ).anonymize_file(source, tmp_path / "mask.txt")
+    
+    anonymizer = Anonymizer(AnonymizationConfig(method="redact", detection_store=store))
+    
+    def fail(text):
+        raise AssertionError("detekcja nie powinna zostać uruchomiona")
+    
+    monkeypatch.setattr(anonymizer.detector, "detect", fail)
+    redacted = anonymizer.anonymize_file(source, tmp_path / "redact.txt")
+    
+    assert "jan@example.com" not in masked.read_text(encoding="utf-8")
+    assert redacted.read_text(encoding="utf-8") == (
+        "Kontakt: [USUNIĘTO], tel. [USUNIĘTO]\n\nE-mail: [USUNIĘTO]"
+    )
+
+
+def test_changed_exclusions_are_not_replayed(tmp_path):
+    """Wykluczenie dodane po zapisie detekcji jest respektowane."""
+    source = tmp_path / "akta.txt"
+    source.write_text(TEXT, encoding="utf-8")
+    store = str(tmp_path / "detekcje")
+    
+    Anonymizer(AnonymizationConfig(method="redact", detection_store=store)).anonymize_file(
+        source, tmp_path / "pierwszy.txt"
+    )
+    output = Anonymizer(AnonymizationConfig(
+        method="redact", detection_store=store, exclusions=["jan@example.com"]
+    )).anonymize_file(source, tmp_path / "drugi.txt")
+    
+    assert output.read_text(encoding="utf-8") == "Kontakt: jan@example.com, tel. [USUNIĘTO]"
+
+
+def test_changed_custom_patterns_are_not_replayed(tmp_path):
+    """Własny wzorzec dodany po zapisie detekcji jest stosowany."""
+    source = tmp_path / "akta.txt"
+    source.write_text(TEXT + ", sygn. AKT-2024-17", encoding="utf-8")
+    store = str(tmp_path / "detekcje")
+    
+    Anonymizer(AnonymizationConfig(method="redact", detection_store=store)).anonymize_file(
+        source, tmp_path / "pierwszy.txt"
+    )
+    output = Anonymizer(AnonymizationConfig(
+        method="redact", detection_store=store, custom_patterns={"SECRET": r"AKT-\d{4}-\d+"}
+    )).anonymize_file(source, tmp_path / "drugi.txt")
+    
+    assert output.read_text(encoding="utf-8") == (
+        "Kontakt: [USUNIĘTO], tel. [USUNIĘTO], sygn. [USUNIĘTO]"
+    )
+
+
+def test_llm_toggle_is_not_replayed(tmp_path, monkeypatch):
+    """Zapis bez detektora LLM nie jest odtwarzany, gdy anonimizer ma LLM włączony."""
+    source = tmp_path / "akta.txt"
+    source.write_text(TEXT, encoding="utf-8")
+    config = AnonymizationConfig(method="redact", detection_store=str(tmp_path / "detekcje"))
+    
+    Anonymizer(config).anonymize_file(source, tmp_path / "pierwszy.txt")
+    
+    anonymizer = Anonymizer(config, use_llm=True, llm_model_name="model")
+    detected = []
+    monkeypatch.setattr(
+        anonymizer.detector, "detect",
+        lambda text, use_cache=True: detected.append(text) or []
+    )
+    anonymizer.anonymize_file(source, tmp_path / "drugi.txt")
+    
+    assert detected == [TEXT]
+    assert anonymizer.detector.fingerprint != Anonymizer(config).detector.fingerprint
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
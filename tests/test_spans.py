@@ -0,0 +1,94 @@
+"""
+Testy dla indeksu przedziałów encji.
+"""
+
+import random
+
+import pytest
+
+from dane_bez_twarzy.core import spans
+from dane_bez_twarzy.core.config import EntityType
+from dane_bez_twarzy.core.detector import Entity
+from dane_bez_twarzy.core.spans import LineIndex, SpanIndex, replace_spans, resolve_overlaps
+
+
+def _entity(start, end, confidence=1.0, entity_type=EntityType.PERSON):
+    return Entity(text="x" * (end - start), type=entity_type, start=start, end=end,
+                  confidence=confidence)
+
+
+def test_resolve_overlaps_handles_chains():
+    """Łańcuch nakładań nie usuwa encji, która nie koliduje ze zwycięzcą."""
+    a = _entity(0, 10, 0.6)
+    b = _entity(5, 15, 0.7)
+    c = _entity(12, 20, 0.8)
+    
+    assert resolve_overlaps([a, b, c]) == [a, c]
+
+
+def test_resolve_overlaps_prefers_earlier_on_equal_confidence():
+    """Przy równej pewności wygrywa wcześniejsza encja (potem kolejność wejściowa)."""
+    phone = _entity(0, 9, entity_type=EntityType.PHONE)
+    pesel = _entity(0, 11, entity_type=EntityType.PESEL)
+    later = _entity(5, 20)
+    
+    assert resolve_overlaps([phone, pesel, later]) == [phone]
+
+
+def test_resolve_overlap_indices_across_blocks(monkeypatch):
+    """Wynik nie zależy od podziału przyjętych przedziałów na bloki."""
+    monkeypatch.setattr(spans, "_OVERLAP_BLOCK", 2)
+    rng = random.Random(7)
+    starts = [rng.randrange(300) for _ in range(200)]
+    ends = [start + rng.randint(1, 12) for start in starts]
+    confidences = [rng.choice([0.5, 0.7, 0.9, 1.0]) for _ in starts]
+    
+    # Zachłanny wybór sprawdzający wszystkie przyjęte przedziały
+    expected = []
+    for i in sorted(range(len(starts)), key=lambda i: (-confidences[i], starts[i], i)):
+        if all(ends[j] <= starts[i] or ends[i] <= starts[j] for j in expected):
+            expected.append(i)
+    expected.sort(key=lambda i: starts[i])
+    
+    assert spans.resolve_overlap_indices(starts, ends, confidences) == expected
+
+
+def test_span_index_queries():
+    """Test zapytań o encje pokrywające offset i zakres."""
+    outer = _entity(0, 100)
+    inner = _entity(10, 20)
+    tail = _entity(90, 120)
+    index = SpanIndex([tail, inner, outer])
+    
+    assert index.covering(15) == [outer, inner]
+    assert index.covering(95) == [outer, tail]
+    assert index.covering(100) == [tail]
+    assert index.covering(120) == []
+    assert index.overlapping(20, 90) == [outer]
+    assert index.overlapping(19, 91) == [outer, inner, tail]
+
+
+def test_replace_spans_single_pass():
+    """Zamiana przedziałów w dowolnej kolejności, z pominięciem nakładających się."""
+    text = "Jan Kowalski, tel. 123456789"
+    
+    result = replace_spans(text, [(19, 28, "[TEL]"), (0, 12, "[OSOBA]"), (4, 8, "x")])
+    
+    assert result == "[OSOBA], tel. [TEL]"
+    assert replace_spans(text, []) == text
+
+
+def test_line_index_matches_naive_position():
+    """Pozycje z indeksu linii są takie same jak liczone przez dzielenie tekstu."""
+    text = "Jan Kowalski\n\nPESEL: 44051401359\nul. Długa 5\n"
+    index = LineIndex(text)
+    
+    for offset in range(len(text) + 1):
+        lines = text[:offset].split("\n")
+        assert index.position(offset) == (len(lines), len(lines[-1]) + 1)
+    
+    assert index.line_count == text.count("\n") + 1
+    assert LineIndex("").line_count == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
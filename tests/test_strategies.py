@@ -0,0 +1,299 @@
+"""
+Testy dla strategii anonimizacji.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+from pathlib import Path
+import sqlite3
+
+import pytest
+
+from dane_bez_twarzy.core.config import AnonymizationConfig, AnonymizationMethod, EntityType
+from dane_bez_twarzy.core.detector import Entity
+from dane_bez_twarzy.core.anonymizer import Anonymizer
+from dane_bez_twarzy.strategies import (
+    AnonymizationStrategy,
+    EncryptStrategy,
+    EntityStrategy,
+    HashStrategy,
+    MaskStrategy,
+    PseudonymizeStrategy,
+    RedactStrategy,
+    StrategyPlan,
+    get_strategy,
+)
+from dane_bez_twarzy.strategies.deterministic import KeyedPseudonymizer
+from dane_bez_twarzy.strategies.vault import PseudonymVault
+from dane_bez_twarzy.utils.patterns import ValidationPatterns
+
+
+TEXT = "Jan Kowalski, tel. 123-456-789, Jan Kowalski"
+
+
+def _entities():
+    return [
+        Entity("Jan Kowalski", EntityType.PERSON, 0, 12),
+        Entity("123-456-789", EntityType.PHONE, 19, 30),
+        Entity("Jan Kowalski", EntityType.PERSON, 32, 44),
+    ]
+
+
+def test_mask_strategy():
+    """Maskowanie zachowuje strukturę tekstu."""
+    result = MaskStrategy(AnonymizationConfig()).anonymize(TEXT, _entities())
+    
+    assert result == "*** ********, tel. ***-***-***, *** ********"
+
+
+def test_replacement_is_keyed_by_span():
+    """Zamiennik zależy od pozycji encji, nie tylko od jej tekstu."""
+    entities = _entities()
+    entities[2].metadata = {"placeholder_name": "[name]"}
+    
+    result = EntityStrategy(AnonymizationConfig()).anonymize(TEXT, entities)
+    
+    assert result == "[name] [surname], tel. [phone], [name]"
+
+
+def test_unsorted_entities():
+    """Kolejność encji na wejściu nie wpływa na wynik."""
+    strategy = RedactStrategy(AnonymizationConfig())
+    
+    result = strategy.anonymize(TEXT, list(reversed(_entities())))
+    
+    assert result == "[USUNIĘTO], tel. [USUNIĘTO], [USUNIĘTO]"
+
+
+def test_strategy_requires_replacer():
+    """Strategia musi implementować replacer() - korzystają z niego partie i plan strategii."""
+    class OnlyAnonymize(AnonymizationStrategy):
+        def anonymize(self, text, entities):
+            return text
+    
+    with pytest.raises(TypeError):
+        OnlyAnonymize(AnonymizationConfig())
+
+
+def test_pseudonym_vault_persists_between_runs(tmp_path):
+    """Pseudonimy z magazynu są takie same w kolejnych uruchomieniach."""
+    config = AnonymizationConfig(method="pseudonymize", pseudonym_vault=str(tmp_path / "vault.db"))
+    
+    first = PseudonymizeStrategy(config).anonymize(TEXT, _entities())
+    second = PseudonymizeStrategy(config).anonymize("Ala Nowak", [
+        Entity("Ala Nowak", EntityType.PERSON, 0, 9)
+    ])
+    third = PseudonymizeStrategy(config).anonymize(TEXT, _entities())
+    
+    assert first == "[PERSON_1], tel. [PHONE_1], [PERSON_1]"
+    assert second == "[PERSON_2]"
+    assert third == first
+
+
+def test_anonymizer_close_closes_vault(tmp_path):
+    """Wyjście z bloku with zamyka połączenie z magazynem pseudonimów (także w planie)."""
+    config = AnonymizationConfig(
+        method="mask",
+        strategy_plan={"PERSON": "pseudonymize"},
+        pseudonym_vault=str(tmp_path / "vault.db")
+    )
+    
+    with Anonymizer(config) as anonymizer:
+        vault = anonymizer.strategy.plan[EntityType.PERSON].vault
+        assert len(vault) == 0
+    
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(vault)
+
+
+def _vault_worker(path, values):
+    vault = PseudonymVault(path, cache_size=10)
+    result = {}
+    for value in values:
+        result.update(vault.get_or_create([(value, "PERSON")]))
+    vault.close()
+    return result
+
+
+def test_pseudonym_vault_is_consistent_across_processes(tmp_path):
+    """Równoległe procesy przydzielają spójne i unikalne pseudonimy."""
+    path = str(tmp_path / "vault.db")
+    PseudonymVault(path).close()
+    values = [f"Osoba {i}" for i in range(40)]
+    
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            _vault_worker,
+            [path] * 4,
+            [values, values[::-1], values[10:], values[:30]]
+        ))
+    
+    merged = {}
+    for result in results:
+        for value, pseudonym in result.items():
+            assert merged.setdefault(value, pseudonym) == pseudonym
+    
+    assert len(set(merged.values())) == len(values)
+    assert len(PseudonymVault(path)) == len(values)
+
+
+def test_hmac_pseudonyms_are_deterministic():
+    """Niezależne instancje z tym samym kluczem dają identyczne pseudonimy."""
+    config = AnonymizationConfig(method="pseudonymize", pseudonym_mode="hmac", pseudonym_key="k")
+    
+    first = PseudonymizeStrategy(config).anonymize(TEXT, _entities())
+    second = PseudonymizeStrategy(config).anonymize(TEXT, _entities())
+    other_key = PseudonymizeStrategy(
+        AnonymizationConfig(method="pseudonymize", pseudonym_mode="hmac", pseudonym_key="x")
+    ).anonymize(TEXT, _entities())
+    
+    assert first == second
+    assert first != other_key
+    assert first.startswith("Osoba_")
+    assert first.split(", ")[0] == first.split(", ")[-1]
+
+
+def test_hmac_pseudonyms_have_valid_formats():
+    """Fałszywe numery mają poprawne sumy kontrolne."""
+    pseudonymizer = KeyedPseudonymizer("k")
+    
+    for i in range(200):
+        assert ValidationPatterns.validate_pesel(pseudonymizer.pseudonym(str(i), EntityType.PESEL))
+        assert ValidationPatterns.validate_nip(pseudonymizer.pseudonym(str(i), EntityType.NIP))
+        assert ValidationPatterns.validate_regon(pseudonymizer.pseudonym(str(i), EntityType.REGON))
+    
+    assert pseudonymizer.pseudonym("x", EntityType.IP_ADDRESS).startswith("[IP_ADDRESS_")
+    assert pseudonymizer.collision_probability(1000, EntityType.PERSON) < 1e-6
+
+
+def test_hmac_mode_requires_key():
+    """Tryb HMAC wymaga klucza lub seeda."""
+    with pytest.raises(ValueError):
+        AnonymizationConfig(pseudonym_mode="hmac")
+    
+    AnonymizationConfig(pseudonym_mode="hmac", seed=42)
+
+
+KEY = "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg="
+
+
+def test_encrypt_round_trip():
+    """Szyfrowanie jest odwracalne; identyczne wartości mają jeden token."""
+    strategy = EncryptStrategy(AnonymizationConfig(method="encrypt", encryption_key=KEY))
+    
+    encrypted = strategy.anonymize(TEXT, _entities())
+    
+    assert encrypted == "[ENC:000001], tel. [ENC:000002], [ENC:000001]"
+    assert len(strategy.tokens) == 2
+    assert strategy.decrypt(encrypted) == TEXT
+
+
+def test_encrypt_sidecar_restores_file(tmp_path):
+    """Plik tokenów pozwala odtworzyć dokument w nowym procesie."""
+    source = tmp_path / "akta.txt"
+    source.write_text("Kontakt: jan@example.com, PESEL 44051401359", encoding="utf-8")
+    config = AnonymizationConfig(method="encrypt", encryption_key=KEY)
+    
+    encrypted = Anonymizer(config).anonymize_file(source)
+    
+    assert "jan@example.com" not in encrypted.read_text(encoding="utf-8")
+    assert Path(f"{encrypted}.enc.json").exists()
+    
+    restored = Anonymizer(config).decrypt_file(encrypted)
+    
+    assert restored.read_text(encoding="utf-8") == source.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("algorithm", ["sha256", "md5", "blake2b", "hmac-sha256"])
+def test_hash_strategy_is_consistent(algorithm):
+    """Ta sama wartość ma ten sam skrót; wartości są haszowane raz."""
+    strategy = HashStrategy(AnonymizationConfig(
+        method="hash", hash_algorithm=algorithm, hash_key="klucz"
+    ))
+    
+    result = strategy.anonymize(TEXT, _entities())
+    parts = result.split(", ")
+    
+    assert parts[0] == parts[-1]
+    assert len(parts[0]) == HashStrategy.DIGEST_LENGTH
+    assert strategy._hash_text.cache_info().misses == 2
+
+
+def test_hash_key_changes_digest():
+    """Tryby z kluczem dają różne skróty dla różnych kluczy."""
+    def digest(key):
+        config = AnonymizationConfig(method="hash", hash_algorithm="blake2b", hash_key=key)
+        return HashStrategy(config).hash_values(["Jan Kowalski"])["Jan Kowalski"]
+    
+    assert digest("a") != digest("b")
+    
+    with pytest.raises(ValueError):
+        AnonymizationConfig(method="hash", hash_algorithm="hmac-sha256")
+
+
+@pytest.mark.parametrize("options,expected", [
+    ({}, "Łódź: ****-***, ***"),
+    ({"mask_char": "#"}, "Łódź: ####-###, ###"),
+    ({"preserve_structure": False}, "Łódź: ********, ***"),
+    ({"preserve_length": False}, "Łódź: ***, ***"),
+])
+def test_mask_options(options, expected):
+    """Maskowanie zgodnie z opcjami konfiguracji (także znaki spoza ASCII)."""
+    text = "Łódź: Żółć-123, 東京都"
+    entities = [
+        Entity("Żółć-123", EntityType.ADDRESS, 6, 14),
+        Entity("東京都", EntityType.LOCATION, 16, 19),
+    ]
+    
+    assert MaskStrategy(AnonymizationConfig(**options)).anonymize(text, entities) == expected
+
+
+def test_strategy_plan_per_entity_type():
+    """Każdy typ encji jest zamieniany metodą z planu, pozostałe - metodą domyślną."""
+    config = AnonymizationConfig(
+        method="redact",
+        strategy_plan={"PERSON": "pseudonymize", "PHONE": "mask"}
+    )
+    strategy = get_strategy(config.method, config)
+    
+    assert isinstance(strategy, StrategyPlan)
+    assert strategy.anonymize(TEXT, _entities()) == "[PERSON_1], tel. ***-***-***, [PERSON_1]"
+    
+    text = TEXT + ", jan@example.com"
+    entities = _entities() + [Entity("jan@example.com", EntityType.EMAIL, 46, 61)]
+    assert strategy.anonymize(text, entities).endswith(", [USUNIĘTO]")
+
+
+def test_strategy_plan_shares_strategy_instances():
+    """Typy przypisane do tej samej metody współdzielą jedną strategię (i jej cache)."""
+    config = AnonymizationConfig(strategy_plan={"EMAIL": "hash", "PHONE": "hash", "PERSON": "hash"})
+    strategy = StrategyPlan(config)
+    
+    assert strategy.plan[EntityType.EMAIL] is strategy.plan[EntityType.PHONE]
+    assert set(strategy.strategies) == {AnonymizationMethod.HASH, AnonymizationMethod.MASK}
+
+
+def test_strategy_plan_from_json_config(tmp_path):
+    """Plan strategii można podać w pliku konfiguracyjnym JSON."""
+    from dane_bez_twarzy.cli import load_config
+    
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "method": "mask",
+        "strategy_plan": {"EMAIL": "hash", "PERSON": "pseudonymize"}
+    }), encoding="utf-8")
+    
+    config = load_config(str(path), None)
+    
+    assert config.strategy_plan == {
+        EntityType.EMAIL: AnonymizationMethod.HASH,
+        EntityType.PERSON: AnonymizationMethod.PSEUDONYMIZE,
+    }
+    
+    with pytest.raises(ValueError):
+        AnonymizationConfig(strategy_plan={"EMAIL": "rot13"})
+    with pytest.raises(ValueError):
+        AnonymizationConfig(strategy_plan={"EMAIL": "encrypt"})
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
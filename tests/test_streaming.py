@@ -0,0 +1,106 @@
+"""
+Testy strumieniowej anonimizacji dużych plików tekstowych.
+"""
+
+import pytest
+
+from dane_bez_twarzy.core.anonymizer import Anonymizer
+from dane_bez_twarzy.core.config import AnonymizationConfig
+from dane_bez_twarzy.core.mapped import LINE_TRIGGERS
+from dane_bez_twarzy.utils.prefilter import FEATURE_ADDRESS, FEATURE_BRACKET, compute_features
+
+
+LINES = [
+    f"Wpis {i}: email jan{i}@example.com, PESEL 44051401359, tel. 123-456-789"
+    for i in range(200)
+]
+TEXT = "\n".join(LINES) + "\n"
+
+
+def _anonymizer(**options):
+    return Anonymizer(AnonymizationConfig(method="redact", detection_cache_size=0, **options))
+
+
+@pytest.mark.parametrize("window,overlap", [(97, 40), (1000, 120), (5000, 0)])
+def test_stream_matches_whole_text(tmp_path, window, overlap):
+    """Wynik strumieniowy jest taki sam jak dla całego tekstu, z pozycjami globalnymi."""
+    source = tmp_path / "log.txt"
+    source.write_text(TEXT, encoding="utf-8")
+    
+    whole = _anonymizer(stream_threshold=None).anonymize_file(
+        source, tmp_path / "whole.txt", return_result=True
+    )
+    streamed = _anonymizer(
+        stream_threshold=0, stream_window_size=window, stream_overlap=overlap
+    ).anonymize_file(source, tmp_path / "stream.txt", return_result=True)
+    
+    if overlap:
+        assert streamed.output_path.read_text(encoding="utf-8") == whole.output_path.read_text(encoding="utf-8")
+        assert streamed.entity_records() == whole.entity_records()
+    assert streamed.line_count == whole.line_count
+    assert streamed.character_count == len(TEXT)
+
+
+def test_stream_entities_are_not_duplicated_at_seams():
+    """Encja na styku okien jest zamieniana raz, w całości."""
+    text = "x" * 50 + " jan@example.com " + "y" * 50
+    anonymizer = _anonymizer(stream_overlap=30)
+    
+    blocks = [text[i:i + 10] for i in range(0, len(text), 10)]
+    
+    assert "".join(anonymizer.anonymize_stream(blocks)) == anonymizer.anonymize_text(text)
+
+
+MIXED = "".join(
+    f"Wpis {i}: [name] mieszka przy ul. Źródlanej {i}, e-mail łódź{i}@example.com "
+    f"lub anna{i}@example.com, tel.\u00a0123-456-789, PESEL 44051401359ż\n"
+    for i in range(100)
+)
+
+
+@pytest.mark.parametrize("window,overlap", [(97, 60), (2000, 200)])
+def test_mapped_matches_whole_text(tmp_path, window, overlap):
+    """Odczyt przez mmap daje ten sam wynik i te same pozycje co cały tekst."""
+    source = tmp_path / "akta.txt"
+    source.write_text(MIXED, encoding="utf-8")
+    
+    whole = _anonymizer(stream_threshold=None).anonymize_file(
+        source, tmp_path / "whole.txt", return_result=True
+    )
+    mapped = _anonymizer(
+        stream_threshold=0, mmap_input=True, stream_window_size=window, stream_overlap=overlap
+    ).anonymize_file(source, tmp_path / "mapped.txt", return_result=True)
+    
+    assert mapped.output_path.read_bytes() == whole.output_path.read_bytes()
+    assert mapped.entity_records() == whole.entity_records()
+    assert mapped.character_count == len(MIXED)
+
+
+@pytest.mark.parametrize("name, feature", [
+    ("placeholder", FEATURE_BRACKET),
+    ("polish", FEATURE_ADDRESS),
+])
+def test_mapped_line_triggers_match_prefilter(name, feature):
+    """Linie sprawdzane na bajtach to te same, które filtr wstępny przepuszcza na str."""
+    lines = ["ul. Polna 5", "ULICA Długa", "Al. Jerozolimskie", "os. Kolorowe", "[name]", "Ulm 3", "tel. 123"]
+    
+    for line in lines:
+        on_bytes = LINE_TRIGGERS[name].search(line.encode("utf-8")) is not None
+        assert on_bytes == bool(compute_features(line, feature)), line
+
+
+def test_mapped_falls_back_to_stream_for_custom_patterns(tmp_path):
+    """Własne wzorce wymagają tekstu - plik jest przetwarzany strumieniowo."""
+    source = tmp_path / "akta.txt"
+    source.write_text("Sygnatura: ABC/123 i ABC/456\n", encoding="utf-8")
+    anonymizer = _anonymizer(
+        stream_threshold=0, mmap_input=True, custom_patterns={"SECRET": r"ABC/\d+"}
+    )
+    
+    output = anonymizer.anonymize_file(source, tmp_path / "wynik.txt")
+    
+    assert output.read_text(encoding="utf-8") == "Sygnatura: [USUNIĘTO] i [USUNIĘTO]\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])